@@ -0,0 +1,84 @@
+"""Add hazard taxonomy and normalized hazard columns
+
+Revision ID: 0b7c3e58a219
+Revises: f2a86d4c1b07
+Create Date: 2026-10-19 13:58:12.376051
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0b7c3e58a219'
+down_revision: Union[str, Sequence[str], None] = 'f2a86d4c1b07'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+risk_level = postgresql.ENUM('UNKNOWN', 'LOW', 'MEDIUM', 'HIGH', 'CRITICAL', name='risklevel', create_type=False)
+
+# Mirrors app/services/hazard_taxonomy.TAXONOMY at the time of this revision
+SEED = [
+    ('impalement', 'Impalement / exposed rebar', 'HIGH'),
+    ('electrical', 'Electrical', 'HIGH'),
+    ('excavation', 'Excavation / trench collapse', 'HIGH'),
+    ('struck_by', 'Struck by object or plant', 'HIGH'),
+    ('confined_space', 'Confined space', 'HIGH'),
+    ('fire', 'Fire / hot work', 'HIGH'),
+    ('hazardous_substances', 'Hazardous substances', 'MEDIUM'),
+    ('fall_from_height', 'Fall from height', 'HIGH'),
+    ('ppe', 'Missing or improper PPE', 'MEDIUM'),
+    ('housekeeping', 'Housekeeping / slips and trips', 'LOW'),
+    ('other', 'Other', 'MEDIUM'),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    risk_level.create(op.get_bind(), checkfirst=True)
+
+    hazardtype = op.create_table(
+        'hazardtype',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('slug', sqlmodel.sql.sqltypes.AutoString(length=64), nullable=False),
+        sa.Column('name', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column('default_risk', risk_level, nullable=True),
+        sa.Column('created_at', sa.DateTime(), server_default=sa.func.now(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index(op.f('ix_hazardtype_slug'), 'hazardtype', ['slug'], unique=True)
+    op.bulk_insert(hazardtype, [{'slug': s, 'name': n, 'default_risk': r} for s, n, r in SEED])
+
+    op.add_column('assessmenthazard', sa.Column('project_id', sa.Integer(), nullable=True))
+    op.add_column('assessmenthazard', sa.Column('hazard_type_id', sa.Integer(), nullable=True))
+    op.add_column('assessmenthazard', sa.Column('risk', risk_level, nullable=True))
+    op.create_foreign_key('fk_assessmenthazard_project_id', 'assessmenthazard', 'project', ['project_id'], ['id'])
+    op.create_foreign_key('fk_assessmenthazard_hazard_type_id', 'assessmenthazard', 'hazardtype', ['hazard_type_id'], ['id'])
+
+    # Denormalize the project onto existing hazards; type/risk are filled by backfill_hazard_taxonomy.py
+    op.execute(
+        "UPDATE assessmenthazard SET project_id = assessmentresult.project_id "
+        "FROM assessmentresult WHERE assessmenthazard.assessment_id = assessmentresult.id"
+    )
+
+    op.create_index('ix_assessmenthazard_project_type_risk_created', 'assessmenthazard', ['project_id', 'hazard_type_id', 'risk', 'created_at'], unique=False)
+    op.create_index('ix_assessmenthazard_type_risk_created', 'assessmenthazard', ['hazard_type_id', 'risk', 'created_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_assessmenthazard_type_risk_created', table_name='assessmenthazard')
+    op.drop_index('ix_assessmenthazard_project_type_risk_created', table_name='assessmenthazard')
+    op.drop_constraint('fk_assessmenthazard_hazard_type_id', 'assessmenthazard', type_='foreignkey')
+    op.drop_constraint('fk_assessmenthazard_project_id', 'assessmenthazard', type_='foreignkey')
+    op.drop_column('assessmenthazard', 'risk')
+    op.drop_column('assessmenthazard', 'hazard_type_id')
+    op.drop_column('assessmenthazard', 'project_id')
+    op.drop_index(op.f('ix_hazardtype_slug'), table_name='hazardtype')
+    op.drop_table('hazardtype')
+    risk_level.drop(op.get_bind(), checkfirst=True)
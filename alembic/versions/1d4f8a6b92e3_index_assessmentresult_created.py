@@ -0,0 +1,28 @@
+"""Index AssessmentResult by creation time for portfolio-wide history
+
+Revision ID: 1d4f8a6b92e3
+Revises: 0b7c3e58a219
+Create Date: 2026-10-19 14:20:05.661842
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '1d4f8a6b92e3'
+down_revision: Union[str, Sequence[str], None] = '0b7c3e58a219'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_assessmentresult_created', 'assessmentresult', ['created_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_assessmentresult_created', table_name='assessmentresult')
@@ -0,0 +1,55 @@
+"""Add trend points and rollups
+
+Revision ID: 2c8e5f1a7d94
+Revises: 1d4f8a6b92e3
+Create Date: 2026-10-19 14:47:30.284519
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = '2c8e5f1a7d94'
+down_revision: Union[str, Sequence[str], None] = '1d4f8a6b92e3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'trendpoint',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('project_id', sa.Integer(), nullable=False),
+        sa.Column('metric', sqlmodel.sql.sqltypes.AutoString(length=64), nullable=False),
+        sa.Column('ts', sa.DateTime(), nullable=False),
+        sa.Column('value', sa.Float(), nullable=False),
+        sa.ForeignKeyConstraint(['project_id'], ['project.id'], ),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_trendpoint_project_metric_ts', 'trendpoint', ['project_id', 'metric', 'ts'], unique=False)
+
+    op.create_table(
+        'trendrollup',
+        sa.Column('project_id', sa.Integer(), nullable=False),
+        sa.Column('metric', sqlmodel.sql.sqltypes.AutoString(length=64), nullable=False),
+        sa.Column('resolution', sqlmodel.sql.sqltypes.AutoString(length=4), nullable=False),
+        sa.Column('bucket', sa.DateTime(), nullable=False),
+        sa.Column('count', sa.Integer(), nullable=False),
+        sa.Column('sum', sa.Float(), nullable=False),
+        sa.Column('min', sa.Float(), nullable=False),
+        sa.Column('max', sa.Float(), nullable=False),
+        sa.ForeignKeyConstraint(['project_id'], ['project.id'], ),
+        sa.PrimaryKeyConstraint('project_id', 'metric', 'resolution', 'bucket'),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('trendrollup')
+    op.drop_index('ix_trendpoint_project_metric_ts', table_name='trendpoint')
+    op.drop_table('trendpoint')
@@ -0,0 +1,32 @@
+"""Add blob hash and size to ProjectDocument
+
+Revision ID: 3c7e1a9d52b4
+Revises: ee98b58425f6
+Create Date: 2026-10-19 09:12:41.208113
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3c7e1a9d52b4'
+down_revision: Union[str, Sequence[str], None] = 'ee98b58425f6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('projectdocument', sa.Column('content_sha256', sa.String(length=64), nullable=True))
+    op.add_column('projectdocument', sa.Column('size_bytes', sa.Integer(), nullable=True))
+    op.create_index(op.f('ix_projectdocument_content_sha256'), 'projectdocument', ['content_sha256'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_projectdocument_content_sha256'), table_name='projectdocument')
+    op.drop_column('projectdocument', 'size_bytes')
+    op.drop_column('projectdocument', 'content_sha256')
@@ -0,0 +1,34 @@
+"""Add portfolio dashboard snapshot
+
+Revision ID: 3e9a1c6d5b70
+Revises: 2c8e5f1a7d94
+Create Date: 2026-10-19 15:12:48.907316
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3e9a1c6d5b70'
+down_revision: Union[str, Sequence[str], None] = '2c8e5f1a7d94'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'portfoliosnapshot',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('metrics', sa.JSON(), nullable=False),
+        sa.Column('computed_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('portfoliosnapshot')
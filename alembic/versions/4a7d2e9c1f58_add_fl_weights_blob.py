@@ -0,0 +1,31 @@
+"""Add binary FL weight columns
+
+Revision ID: 4a7d2e9c1f58
+Revises: 3e9a1c6d5b70
+Create Date: 2026-10-19 16:02:11.418203
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4a7d2e9c1f58'
+down_revision: Union[str, Sequence[str], None] = '3e9a1c6d5b70'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Readers accept either column; migrate_fl_weights.py converts the JSON rows
+    op.add_column('fl_global_model', sa.Column('weights_blob', sa.LargeBinary(), nullable=True))
+    op.add_column('fl_weights_upload', sa.Column('weights_blob', sa.LargeBinary(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('fl_weights_upload', 'weights_blob')
+    op.drop_column('fl_global_model', 'weights_blob')
@@ -0,0 +1,30 @@
+"""Add at-rest compression info to ProjectDocument
+
+Revision ID: 5a9e3f17c0d2
+Revises: 8f04d6b2e1a7
+Create Date: 2026-10-19 11:26:08.731402
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5a9e3f17c0d2'
+down_revision: Union[str, Sequence[str], None] = '8f04d6b2e1a7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('projectdocument', sa.Column('stored_size', sa.Integer(), nullable=True))
+    op.add_column('projectdocument', sa.Column('compression', sa.String(length=16), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('projectdocument', 'compression')
+    op.drop_column('projectdocument', 'stored_size')
@@ -0,0 +1,40 @@
+"""Add FL round accumulator
+
+Revision ID: 5b8e3f0a2d61
+Revises: 4a7d2e9c1f58
+Create Date: 2026-10-19 16:41:27.530912
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5b8e3f0a2d61'
+down_revision: Union[str, Sequence[str], None] = '4a7d2e9c1f58'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'fl_round_accumulator',
+        sa.Column('experiment_id', sa.Integer(), nullable=False),
+        sa.Column('round', sa.Integer(), nullable=False),
+        sa.Column('weighted_sum', sa.LargeBinary(), nullable=True),
+        sa.Column('total_samples', sa.Integer(), nullable=False),
+        sa.Column('contributors', sa.Integer(), nullable=False),
+        sa.Column('version', sa.Integer(), nullable=False),
+        sa.Column('closed_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['experiment_id'], ['flexperiment.id'], ),
+        sa.PrimaryKeyConstraint('experiment_id', 'round'),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('fl_round_accumulator')
@@ -0,0 +1,34 @@
+"""Add FL upload encoding and compression ratio
+
+Revision ID: 6c1f4a8e3b92
+Revises: 5b8e3f0a2d61
+Create Date: 2026-10-19 17:20:04.116385
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6c1f4a8e3b92'
+down_revision: Union[str, Sequence[str], None] = '5b8e3f0a2d61'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        'fl_weights_upload',
+        sa.Column('encoding', sqlmodel.sql.sqltypes.AutoString(length=16), nullable=False, server_default='dense'),
+    )
+    op.add_column('fl_weights_upload', sa.Column('compression_ratio', sa.Float(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('fl_weights_upload', 'compression_ratio')
+    op.drop_column('fl_weights_upload', 'encoding')
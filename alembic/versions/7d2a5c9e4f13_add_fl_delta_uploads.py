@@ -0,0 +1,35 @@
+"""Add FL global model checksum and delta upload flag
+
+Revision ID: 7d2a5c9e4f13
+Revises: 6c1f4a8e3b92
+Create Date: 2026-10-19 17:58:36.702441
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7d2a5c9e4f13'
+down_revision: Union[str, Sequence[str], None] = '6c1f4a8e3b92'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Existing models get their checksum computed on read (fl_tensor_codec.model_checksum)
+    op.add_column('fl_global_model', sa.Column('checksum', sqlmodel.sql.sqltypes.AutoString(length=64), nullable=True))
+    op.add_column(
+        'fl_weights_upload',
+        sa.Column('is_delta', sa.Boolean(), nullable=False, server_default=sa.false()),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('fl_weights_upload', 'is_delta')
+    op.drop_column('fl_global_model', 'checksum')
@@ -0,0 +1,56 @@
+"""Add FL round state and round events
+
+Revision ID: 8e3b6d0f5a24
+Revises: 7d2a5c9e4f13
+Create Date: 2026-10-19 18:44:51.239870
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8e3b6d0f5a24'
+down_revision: Union[str, Sequence[str], None] = '7d2a5c9e4f13'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        'flexperiment',
+        sa.Column('round_state', sqlmodel.sql.sqltypes.AutoString(length=16), nullable=False, server_default='OPEN'),
+    )
+    op.add_column('flexperiment', sa.Column('round_opened_at', sa.DateTime(), nullable=True))
+    op.add_column('flexperiment', sa.Column('round_state_changed_at', sa.DateTime(), nullable=True))
+    # Running experiments start their deadline from now
+    op.execute(
+        "UPDATE flexperiment SET round_opened_at = now() AT TIME ZONE 'utc' "
+        "WHERE status IN ('STARTED', 'TRAINING')"
+    )
+
+    op.create_table(
+        'fl_round_event',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('experiment_id', sa.Integer(), nullable=False),
+        sa.Column('round', sa.Integer(), nullable=False),
+        sa.Column('event', sqlmodel.sql.sqltypes.AutoString(length=32), nullable=False),
+        sa.Column('details', sa.JSON(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['experiment_id'], ['flexperiment.id'], ),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_fl_round_event_experiment_id', 'fl_round_event', ['experiment_id', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_fl_round_event_experiment_id', table_name='fl_round_event')
+    op.drop_table('fl_round_event')
+    op.drop_column('flexperiment', 'round_state_changed_at')
+    op.drop_column('flexperiment', 'round_opened_at')
+    op.drop_column('flexperiment', 'round_state')
@@ -0,0 +1,28 @@
+"""Index ProjectDocument for keyset-paginated listings
+
+Revision ID: 8f04d6b2e1a7
+Revises: 3c7e1a9d52b4
+Create Date: 2026-10-19 10:03:17.554920
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8f04d6b2e1a7'
+down_revision: Union[str, Sequence[str], None] = '3c7e1a9d52b4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_projectdocument_project_created', 'projectdocument', ['project_id', 'created_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_projectdocument_project_created', table_name='projectdocument')
@@ -0,0 +1,37 @@
+"""Add score_count to the project assessment rollup
+
+Revision ID: a0c5d8f2e7b1
+Revises: 9f4b7e1a6c35
+Create Date: 2026-10-20 09:14:02.671385
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a0c5d8f2e7b1'
+down_revision: Union[str, Sequence[str], None] = '9f4b7e1a6c35'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        'projectassessmentrollup',
+        sa.Column('score_count', sa.Integer(), nullable=False, server_default='0'),
+    )
+    # Existing rows: count the scored assessments of each project
+    op.execute(
+        "UPDATE projectassessmentrollup r SET score_count = s.n "
+        "FROM (SELECT project_id, count(score) AS n FROM assessmentresult GROUP BY project_id) s "
+        "WHERE s.project_id = r.project_id"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('projectassessmentrollup', 'score_count')
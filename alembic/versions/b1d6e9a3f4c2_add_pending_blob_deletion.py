@@ -0,0 +1,36 @@
+"""Add pending blob deletions
+
+Revision ID: b1d6e9a3f4c2
+Revises: a0c5d8f2e7b1
+Create Date: 2026-10-20 11:02:45.318920
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b1d6e9a3f4c2'
+down_revision: Union[str, Sequence[str], None] = 'a0c5d8f2e7b1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'pending_blob_deletion',
+        sa.Column('sha256', sqlmodel.sql.sqltypes.AutoString(length=64), nullable=False),
+        sa.Column('queued_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('sha256'),
+    )
+    op.create_index(op.f('ix_pending_blob_deletion_queued_at'), 'pending_blob_deletion', ['queued_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_pending_blob_deletion_queued_at'), table_name='pending_blob_deletion')
+    op.drop_table('pending_blob_deletion')
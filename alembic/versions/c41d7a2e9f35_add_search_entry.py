@@ -0,0 +1,55 @@
+"""Add search_entry full-text index
+
+Revision ID: c41d7a2e9f35
+Revises: 5a9e3f17c0d2
+Create Date: 2026-10-19 12:04:51.220913
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c41d7a2e9f35'
+down_revision: Union[str, Sequence[str], None] = '5a9e3f17c0d2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'search_entry',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('project_id', sa.Integer(), nullable=True),
+        sa.Column('source_type', sqlmodel.sql.sqltypes.AutoString(length=32), nullable=False),
+        sa.Column('source_id', sa.Integer(), nullable=False),
+        sa.Column('title', sqlmodel.sql.sqltypes.AutoString(), nullable=True),
+        sa.Column('body', sa.Text(), server_default='', nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['project_id'], ['project.id'], ),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('source_type', 'source_id', name='uq_search_entry_source'),
+    )
+    op.create_index('ix_search_entry_project_created', 'search_entry', ['project_id', 'created_at'], unique=False)
+
+    if op.get_bind().dialect.name == 'postgresql':
+        # Title weighs more than body; kept out of the SQLModel model on purpose
+        op.execute(
+            "ALTER TABLE search_entry ADD COLUMN tsv tsvector GENERATED ALWAYS AS ("
+            "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+            "setweight(to_tsvector('english', body), 'B')) STORED"
+        )
+        op.execute("CREATE INDEX ix_search_entry_tsv ON search_entry USING gin (tsv)")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute("DROP INDEX IF EXISTS ix_search_entry_tsv")
+    op.drop_index('ix_search_entry_project_created', table_name='search_entry')
+    op.drop_table('search_entry')
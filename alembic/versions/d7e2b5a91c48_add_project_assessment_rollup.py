@@ -0,0 +1,39 @@
+"""Add per-project assessment rollup
+
+Revision ID: d7e2b5a91c48
+Revises: c41d7a2e9f35
+Create Date: 2026-10-19 12:41:17.503628
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd7e2b5a91c48'
+down_revision: Union[str, Sequence[str], None] = 'c41d7a2e9f35'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'projectassessmentrollup',
+        sa.Column('project_id', sa.Integer(), nullable=False),
+        sa.Column('assessment_count', sa.Integer(), nullable=False),
+        sa.Column('score_sum', sa.Float(), nullable=False),
+        sa.Column('critical_count', sa.Integer(), nullable=False),
+        sa.Column('compliant_count', sa.Integer(), nullable=False),
+        sa.Column('last_assessed_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['project_id'], ['project.id'], ),
+        sa.PrimaryKeyConstraint('project_id'),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('projectassessmentrollup')
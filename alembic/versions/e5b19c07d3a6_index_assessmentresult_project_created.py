@@ -0,0 +1,30 @@
+"""Index AssessmentResult by project and creation time
+
+Revision ID: e5b19c07d3a6
+Revises: d7e2b5a91c48
+Create Date: 2026-10-19 13:02:44.118390
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5b19c07d3a6'
+down_revision: Union[str, Sequence[str], None] = 'd7e2b5a91c48'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_assessmentresult_project_created', 'assessmentresult', ['project_id', 'created_at', 'id'], unique=False)
+    op.create_index('ix_assessmenthazard_assessment_id', 'assessmenthazard', ['assessment_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_assessmenthazard_assessment_id', table_name='assessmenthazard')
+    op.drop_index('ix_assessmentresult_project_created', table_name='assessmentresult')
@@ -0,0 +1,37 @@
+"""Add ingest-time classification labels to AssessmentResult
+
+Revision ID: f2a86d4c1b07
+Revises: e5b19c07d3a6
+Create Date: 2026-10-19 13:25:36.904472
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f2a86d4c1b07'
+down_revision: Union[str, Sequence[str], None] = 'e5b19c07d3a6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('assessmentresult', sa.Column('critical', sa.Boolean(), nullable=True))
+    op.add_column('assessmentresult', sa.Column('compliant', sa.Boolean(), nullable=True))
+    op.add_column('assessmentresult', sa.Column('classifier_version', sqlmodel.sql.sqltypes.AutoString(length=16), nullable=True))
+    op.create_index(op.f('ix_assessmentresult_critical'), 'assessmentresult', ['critical'], unique=False)
+    op.create_index(op.f('ix_assessmentresult_compliant'), 'assessmentresult', ['compliant'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_assessmentresult_compliant'), table_name='assessmentresult')
+    op.drop_index(op.f('ix_assessmentresult_critical'), table_name='assessmentresult')
+    op.drop_column('assessmentresult', 'classifier_version')
+    op.drop_column('assessmentresult', 'compliant')
+    op.drop_column('assessmentresult', 'critical')
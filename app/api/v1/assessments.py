@@ -1,11 +1,16 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import Any
+from typing import Any, List, Optional
+from datetime import datetime, timezone
 
 from app.core.database import get_session
 from app.core.security import get_current_user
-from app.services.gemini_service import analyze_assessment, archive_assessment, log_trend
-from app.schemas.assessments import AnalyzeRequest, AnalyzeResponse, ArchiveRequest, TrendLogRequest
+from app.models.user import Role
+from app.services.assessment_service import list_assessment_history
+from app.services.gemini_service import analyze_assessment, archive_assessment
+from app.services.trend_store import RESOLUTIONS, log_trend, naive_utc, query_trend
+from app.services.project_service import check_ownership, get_project, owned_project_ids
+from app.schemas.assessments import AnalyzeRequest, AnalyzeResponse, ArchiveRequest, TrendLogRequest, AssessmentHistoryPage
 
 router = APIRouter(prefix="/assessments", tags=["assessments"]) 
 
@@ -31,5 +36,83 @@ async def archive(payload: ArchiveRequest, session: AsyncSession = Depends(get_s
 
 @router.post("/trends/log")
 async def trends_log(payload: TrendLogRequest, session: AsyncSession = Depends(get_session), user=Depends(get_current_user)):
-    res = await log_trend(payload.project_id, payload.metric, payload.value, timestamp=payload.timestamp)
+    # Checked here: a point for a missing project would fail its whole flush batch
+    if not await get_project(session, payload.project_id):
+        raise HTTPException(status_code=404, detail="Project not found")
+    try:
+        res = await log_trend(payload.project_id, payload.metric, payload.value, timestamp=payload.timestamp)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid timestamp; expected ISO-8601")
     return res
+
+
+@router.get("/trends")
+async def trends_query(
+    project_id: int,
+    metric: str,
+    start: datetime,
+    end: Optional[datetime] = None,
+    resolution: str = Query("auto", description="auto, raw, " + ", ".join(RESOLUTIONS)),
+    max_points: Optional[int] = None,
+    session: AsyncSession = Depends(get_session),
+    user=Depends(get_current_user),
+):
+    """
+    Trend series for one metric over [start, end). With resolution=auto the
+    finest rollup that fits `max_points` buckets is used, so long ranges read
+    pre-aggregated 1h/1d buckets rather than raw points.
+    """
+    if resolution != "auto" and resolution != "raw" and resolution not in RESOLUTIONS:
+        raise HTTPException(status_code=400, detail="Unknown resolution")
+    project = await get_project(session, project_id)
+    if not project:
+        raise HTTPException(status_code=404, detail="Project not found")
+    if user.role != Role.GOVERNMENT and not await check_ownership(session, project, user):
+        raise HTTPException(status_code=403, detail="Not owner")
+
+    end = end or datetime.now(timezone.utc)
+    if naive_utc(end) <= naive_utc(start):
+        raise HTTPException(status_code=400, detail="end must be after start")
+    return await query_trend(session, project_id, metric, start, end, resolution=resolution, max_points=max_points)
+
+
+@router.get("/history", response_model=AssessmentHistoryPage)
+async def assessment_history(
+    project_id: Optional[int] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    min_score: Optional[float] = None,
+    max_score: Optional[float] = None,
+    hazard_type: Optional[List[str]] = Query(None, description="Hazard taxonomy slug(s), e.g. fall_from_height"),
+    include_gemini_response: bool = False,
+    cursor: Optional[str] = None,
+    limit: int = 50,
+    session: AsyncSession = Depends(get_session),
+    user=Depends(get_current_user),
+):
+    """
+    Page through assessments newest first. Filters: created_at in
+    [start, end), score range and hazard type. Pass `next_cursor` back as
+    `cursor` for the next page; the Gemini payload is only included when
+    `include_gemini_response` is set.
+    """
+    project_ids = await owned_project_ids(session, user)
+    if project_id is not None:
+        if project_ids is not None and project_id not in project_ids:
+            raise HTTPException(status_code=403, detail="Not owner")
+        project_ids = [project_id]
+
+    items, next_cursor = await list_assessment_history(
+        session,
+        project_ids=project_ids,
+        # Query datetimes may carry an offset; created_at is naive UTC
+        start=naive_utc(start) if start else None,
+        end=naive_utc(end) if end else None,
+        min_score=min_score,
+        max_score=max_score,
+        hazard_types=hazard_type,
+        include_gemini_response=include_gemini_response,
+        cursor=cursor,
+        limit=limit,
+    )
+    return {"items": items, "next_cursor": next_cursor}
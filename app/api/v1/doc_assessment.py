@@ -13,6 +13,8 @@ from app.core.security import get_current_user
 from app.models.project import Project
 from app.models.assessment_result import AssessmentResult
 from app.schemas.assessments import AssessmentResponse
+from app.services.assessment_service import assessment_summary, list_assessment_notes, save_assessment
+from app.services.gemini_response import normalize_gemini_response
 from app.services.gemini_service import _call_gemini  # We'll use your existing helper
 
 router = APIRouter(prefix="/safety", tags=["safety"])
@@ -21,29 +23,6 @@ UPLOAD_DIR = "uploads/documents"
 os.makedirs(UPLOAD_DIR, exist_ok=True)
 
 
-def serialize_gemini_response(response) -> dict:
-    """
-    Convert Gemini response to JSON-serializable dict
-    """
-    if isinstance(response, dict):
-        return response
-    if hasattr(response, "output_text"):
-        return {"text": response.output_text}
-    # fallback: convert __dict__ attributes
-    result = {}
-    for attr in dir(response):
-        if attr.startswith("_"):
-            continue
-        try:
-            value = getattr(response, attr)
-            import json
-            json.dumps(value)  # check if serializable
-            result[attr] = value
-        except Exception:
-            result[attr] = str(value)
-    return result
-
-
 async def extract_text_from_file(file_path: str, content_type: str) -> str:
     """
     Extract text from PDF, DOCX, or fallback for unsupported files
@@ -108,12 +87,10 @@ async def assess_document(
         score=score,
         notes=context_text or "Document analyzed by AI",
         image_path=file_path,  # we store file path in the existing column
-        gemini_response=serialize_gemini_response(gemini_response),
+        gemini_response=normalize_gemini_response(gemini_response),
         created_at=datetime.utcnow()
     )
-    session.add(assessment)
-    await session.commit()
-    await session.refresh(assessment)
+    await save_assessment(session, assessment)
 
     return {
         "assessment": assessment,
@@ -122,17 +99,18 @@ async def assess_document(
 
 
 
-from fastapi import HTTPException
-from sqlalchemy import select
-
 @router.get("/projects/{project_id}/documents/aggregate")
 async def get_project_document_assessments_aggregate(
     project_id: int,
+    cursor: Optional[str] = None,
+    limit: int = 50,
     session: AsyncSession = Depends(get_session),
     user=Depends(get_current_user),
 ):
     """
     Aggregate all document assessments for a project into a single summary.
+    Scores are computed in SQL; notes and their files come back one page at
+    a time (pass `next_cursor` back as `cursor`).
     """
 
     # Validate project exists
@@ -140,32 +118,17 @@ async def get_project_document_assessments_aggregate(
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
 
-    # Fetch all document assessments for this project
-    result = await session.execute(
-        select(AssessmentResult)
-        .where(AssessmentResult.project_id == project_id)
-    )
-    assessments = result.scalars().all()
-
-    if not assessments:
+    summary = await assessment_summary(session, project_id)
+    if not summary["total_assessments"]:
         return {"project_id": project_id, "aggregated": {}}
 
-    # Combine Gemini text responses
-    combined_gemini_text = " ".join(
-        a.gemini_response.get("text", "") for a in assessments if a.gemini_response
-    )
-
-    avg_score = sum(a.score for a in assessments) / len(assessments)
-
-    # List of uploaded document paths (optional)
-    all_files = [a.image_path for a in assessments]
+    notes, next_cursor = await list_assessment_notes(session, project_id, cursor=cursor, limit=limit)
 
     return {
         "project_id": project_id,
         "aggregated": {
-            "average_score": avg_score,
-            "combined_notes": combined_gemini_text,
-            "total_assessments": len(assessments),
-            "files": all_files,
+            **summary,
+            "notes": notes,
+            "next_cursor": next_cursor,
         }
     }
@@ -1,14 +1,19 @@
-from typing import List, Dict, Any
-from fastapi import APIRouter, Depends, HTTPException
+from typing import List, Dict, Any, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import JSONResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func, and_
 
 from app.schemas.fl import (
+    EncodingNegotiation,
     EnvoyTrainRequest,
     FLExperimentCreate,
     FLExperimentRead,
     FLInferenceRequest,
     FLInferenceResponse,
+    FLRoundEventPage,
+    FLTrainingJobRead,
+    FLTrainingJobResult,
     JoinExperimentRequest,
     JoinExperimentResponse,
     WeightsUploadRequest,
@@ -25,13 +30,16 @@ from app.services.fl_service import (
     get_experiment,
     get_uploads,
     start_experiment,
-    envoy_train,
-    aggregate_round,
     get_global_model,
-    
+    negotiate_encoding,
 )
 from app.models.fl_participant import FLParticipant
-from app.models.fl_weights_upload import FLWeightsUpload
+from app.services.blob_download import etag_matches
+from app.services.fl_inference_batcher import inference_batcher
+from app.services.fl_model_cache import global_model_cache
+from app.services.fl_rounds import list_events, request_close
+from app.services.fl_tensor_codec import encode_state, load_weights, model_checksum, state_to_json
+from app.services.fl_training_jobs import SUCCEEDED, get_training_job, submit_training_job
 
 
 
@@ -53,12 +61,15 @@ async def api_create_experiment(
     session: AsyncSession = Depends(get_session),
     user=Depends(get_current_user)
 ):
-    exp = await create_experiment(
-        session,
-        name=payload.name,
-        params=payload.params or {},
-        participant_threshold=payload.participant_threshold
-    )
+    try:
+        exp = await create_experiment(
+            session,
+            name=payload.name,
+            params=payload.params or {},
+            participant_threshold=payload.participant_threshold
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     return exp
 
 
@@ -156,30 +167,48 @@ async def api_start_experiment(experiment_id: int, session: AsyncSession = Depen
 # Envoy Local Training
 # -----------------------------
 
-@router.post("/experiments/{experiment_id}/envoy/train")
+@router.post("/experiments/{experiment_id}/envoy/train", response_model=FLTrainingJobRead, status_code=202)
 async def api_envoy_train(
     experiment_id: int,
     payload: EnvoyTrainRequest,
     session: AsyncSession = Depends(get_session)
 ):
     """
-    Trigger local training for a participant (envoy) on AssessmentResult dataset
-    and immediately aggregate into global model.
+    Queue local training for a participant (envoy) on AssessmentResult dataset.
+    The trained weights are uploaded when the job finishes; poll
+    /fl/jobs/{job_id} for its status and /fl/jobs/{job_id}/result for the metrics.
     """
     try:
-        result = await envoy_train(
-            session=session,
+        return await submit_training_job(
+            session,
             experiment_id=experiment_id,
             participant_id=payload.participant_id,
             project_id=payload.project_id,
             epochs=payload.epochs,
             lr=payload.lr,
         )
-        return result
     except ValueError as e:
+        if str(e) in ("too many training jobs", "training queue full"):
+            raise HTTPException(status_code=429, detail=str(e))
         raise HTTPException(status_code=404, detail=str(e))
-    except PermissionError as e:
-        raise HTTPException(status_code=403, detail=str(e))
+
+
+@router.get("/jobs/{job_id}", response_model=FLTrainingJobRead)
+async def api_get_training_job(job_id: int, session: AsyncSession = Depends(get_session)):
+    job = await get_training_job(session, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
+@router.get("/jobs/{job_id}/result", response_model=FLTrainingJobResult)
+async def api_get_training_job_result(job_id: int, session: AsyncSession = Depends(get_session)):
+    job = await get_training_job(session, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if job.status != SUCCEEDED:
+        raise HTTPException(status_code=409, detail=job.error or f"Job is {job.status}")
+    return FLTrainingJobResult(job_id=job.id, status=job.status, result=job.result or {})
 
 # -----------------------------
 # Upload Weights (optional)
@@ -214,7 +243,10 @@ async def api_upload_weights(
             payload.experiment_id,
             participant.id,
             weights=payload.weights,
-            dataset_size=len(payload.weights)
+            dataset_size=len(payload.weights),
+            encoding=payload.encoding,
+            delta=payload.delta,
+            base_checksum=payload.base_checksum
         )
 
         logger.info(
@@ -226,15 +258,23 @@ async def api_upload_weights(
             upload_id=upload.id,
             experiment_id=upload.experiment_id,
             uploader_id=upload.uploader_id,
+            encoding=upload.encoding,
+            compression_ratio=upload.compression_ratio,
             created_at=upload.created_at
         )
 
     except ValueError as e:
         logger.warning(
-            f"Weights upload failed: experiment not found | user_id={user_id} | "
+            f"Weights upload failed | user_id={user_id} | "
             f"experiment_id={payload.experiment_id} | error={str(e)}"
         )
-        raise HTTPException(status_code=404, detail="Experiment not found")
+        if str(e) == "experiment not found":
+            raise HTTPException(status_code=404, detail="Experiment not found")
+        if str(e) == "stale base model":
+            raise HTTPException(status_code=409, detail="Stale base model; fetch the current global model and retrain")
+        if str(e) in ("round closing", "round already aggregated"):
+            raise HTTPException(status_code=409, detail="Round is closing; upload to the next round")
+        raise HTTPException(status_code=400, detail=str(e))
 
     except PermissionError as e:
         logger.warning(
@@ -246,6 +286,68 @@ async def api_upload_weights(
 
 
 
+@router.get("/experiments/{experiment_id}/encodings", response_model=EncodingNegotiation)
+async def api_negotiate_encoding(
+    experiment_id: int,
+    accept: Optional[str] = Query(None, description="Comma-separated encodings the client can send"),
+    session: AsyncSession = Depends(get_session),
+    user=Depends(get_current_user)
+):
+    accepted = [e.strip() for e in accept.split(",") if e.strip()] if accept else None
+    try:
+        return await negotiate_encoding(session, experiment_id, accepted)
+    except ValueError as e:
+        if str(e) == "experiment not found":
+            raise HTTPException(status_code=404, detail="Experiment not found")
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get("/experiments/{experiment_id}/global-model")
+async def api_get_global_model(
+    experiment_id: int,
+    request: Request,
+    format: str = Query("binary", description="binary (fl_tensor_codec blob) or json"),
+    session: AsyncSession = Depends(get_session),
+    user=Depends(get_current_user)
+):
+    """
+    Current global model for envoys. The checksum (also the ETag) is the
+    base_checksum delta uploads must quote.
+    """
+    if format not in ("binary", "json"):
+        raise HTTPException(status_code=400, detail="format must be binary or json")
+
+    global_model = await get_global_model(session, experiment_id)
+    state = load_weights(global_model) if global_model else None
+    if not state:
+        raise HTTPException(status_code=404, detail="Global model not available yet")
+
+    checksum = model_checksum(global_model)
+    headers = {
+        "ETag": f'"{checksum}"',
+        "X-Model-Round": str(global_model.round),
+        "X-Model-Checksum": checksum,
+    }
+    if etag_matches(request.headers.get("if-none-match"), headers["ETag"]):
+        return Response(status_code=304, headers=headers)
+
+    if format == "json":
+        return JSONResponse(
+            {
+                "experiment_id": experiment_id,
+                "round": global_model.round,
+                "checksum": checksum,
+                "weights": state_to_json(state),
+            },
+            headers=headers,
+        )
+    return Response(
+        content=global_model.weights_blob or encode_state(state),
+        media_type="application/octet-stream",
+        headers=headers,
+    )
+
+
 @router.get("/experiments/{experiment_id}/uploads")
 async def api_get_uploads(experiment_id: int, session: AsyncSession = Depends(get_session)):
     return await get_uploads(session, experiment_id)
@@ -255,34 +357,41 @@ async def api_get_uploads(experiment_id: int, session: AsyncSession = Depends(ge
 # Aggregation Endpoint
 # -----------------------------
 
-@router.post("/experiments/{experiment_id}/aggregate")
+@router.post("/experiments/{experiment_id}/aggregate", status_code=202)
 async def api_aggregate_round(experiment_id: int, session: AsyncSession = Depends(get_session)):
+    """
+    Close the current round now instead of waiting for the participant
+    threshold or deadline. Aggregation runs in the round scheduler; follow
+    it through the events endpoint.
+    """
     try:
-        # Find latest round with uploads
-        stmt = select(FLWeightsUpload.round).where(
-            FLWeightsUpload.experiment_id == experiment_id,
-            FLWeightsUpload.weights != None
-        ).order_by(FLWeightsUpload.round.desc())
-
-        res = await session.execute(stmt)
-        latest_round = res.scalars().first()
-
-        if latest_round is None:
-            raise HTTPException(status_code=400, detail="No uploads found to aggregate")
+        return await request_close(session, experiment_id)
+    except ValueError as e:
+        if str(e) == "experiment not found":
+            raise HTTPException(status_code=404, detail="Experiment not found")
+        raise HTTPException(status_code=400, detail=str(e))
 
-        # Aggregate that round
-        result = await aggregate_round(session, experiment_id, round_override=latest_round)
 
-        logger.info(
-            f"Aggregated experiment {experiment_id} | round={latest_round} "
-            f"| contributors={result['contributors']} | rejected={result['rejected_uploads']}"
-        )
-
-        return result
+@router.get("/experiments/{experiment_id}/events", response_model=FLRoundEventPage)
+async def api_round_events(
+    experiment_id: int,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = None,
+    session: AsyncSession = Depends(get_session),
+):
+    exp = await get_experiment(session, experiment_id)
+    if not exp:
+        raise HTTPException(status_code=404, detail="Experiment not found")
+    page = await list_events(session, experiment_id, cursor=cursor, limit=limit)
+    return FLRoundEventPage(
+        experiment_id=experiment_id,
+        round=exp.current_round,
+        round_state=exp.round_state,
+        items=page["items"],
+        has_more=page["has_more"],
+        next_cursor=page["next_cursor"],
+    )
 
-    except ValueError as e:
-        raise HTTPException(status_code=400, detail=str(e))
-    
 # -----------------------------
 # Global Model Inference (FIXED)
 # -----------------------------
@@ -297,11 +406,16 @@ async def api_infer(
     session: AsyncSession = Depends(get_session),
 ):
     import torch
-    import torch.nn as nn
 
-    # Fetch global model
-    global_model = await get_global_model(session, experiment_id)
-    if not global_model:
+    # Ready-to-run module for the latest round, cached per worker
+    try:
+        cached = await global_model_cache.get(session, experiment_id)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed to load global model weights: {str(e)}"
+        )
+    if not cached:
         raise HTTPException(
             status_code=404,
             detail="Global model not available yet"
@@ -313,68 +427,33 @@ async def api_infer(
             detail="Input batch cannot be empty"
         )
 
-    # --- Determine model input dimension from global weights ---
-    if "linear.weight" in global_model.weights:
-        input_dim = torch.tensor(global_model.weights["linear.weight"]).shape[1]
-    else:
-        # Combine all layers as before
-        combined_weight = None
-        for v in global_model.weights.values():
-            layer_tensor = torch.tensor(v, dtype=torch.float32)
-            if layer_tensor.ndim > 1 and layer_tensor.shape[0] == 1:
-                layer_tensor = layer_tensor.squeeze(0)
-            combined_weight = layer_tensor if combined_weight is None else combined_weight + layer_tensor
-        input_dim = combined_weight.numel()
-
-    # --- Model architecture MUST match training ---
-    class InferenceModel(nn.Module):
-        def __init__(self, input_dim: int):
-            super().__init__()
-            self.linear = nn.Linear(input_dim, 1)
-
-        def forward(self, x):
-            return self.linear(x)
-
-    model = InferenceModel(input_dim=input_dim)
-
-    # --- Load weights ---
-    state_dict = {}
     try:
-        if "linear.weight" in global_model.weights and "linear.bias" in global_model.weights:
-            state_dict["linear.weight"] = torch.tensor(global_model.weights["linear.weight"], dtype=torch.float32)
-            state_dict["linear.bias"] = torch.tensor(global_model.weights["linear.bias"], dtype=torch.float32)
-        else:
-            # Combine all layers into linear.weight
-            combined_weight = None
-            for v in global_model.weights.values():
-                layer_tensor = torch.tensor(v, dtype=torch.float32)
-                if layer_tensor.ndim > 1 and layer_tensor.shape[0] == 1:
-                    layer_tensor = layer_tensor.squeeze(0)
-                combined_weight = layer_tensor if combined_weight is None else combined_weight + layer_tensor
-            state_dict["linear.weight"] = combined_weight.unsqueeze(0)
-            state_dict["linear.bias"] = torch.zeros(1)
-        model.load_state_dict(state_dict)
-    except Exception as e:
+        x = torch.tensor(payload.inputs, dtype=torch.float32)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="All inputs must have the same length")
+    if x.shape[1] != cached.input_dim:
         raise HTTPException(
-            status_code=500,
-            detail=f"Failed to load global model weights: {str(e)}"
+            status_code=400,
+            detail=f"Input dimension {x.shape[1]} does not match model input {cached.input_dim}"
         )
 
-    model.eval()
-
-    # --- Run inference ---
-    with torch.no_grad():
-        x = torch.tensor(payload.inputs, dtype=torch.float32)
-        # Ensure x matches input_dim
-        if x.shape[1] != input_dim:
-            raise HTTPException(
-                status_code=400,
-                detail=f"Input dimension {x.shape[1]} does not match model input {input_dim}"
-            )
-        outputs = model(x).squeeze(dim=-1)
+    # Shares one forward pass with concurrent requests for the same model
+    outputs = (await inference_batcher.predict(cached.module, x)).squeeze(dim=-1)
 
     return FLInferenceResponse(
         predictions=outputs.tolist(),
-        model_round=global_model.round,
+        model_round=cached.round,
         experiment_id=experiment_id
     )
+
+
+@router.get("/inference/cache")
+async def api_inference_cache_stats(user=Depends(get_current_user)):
+    """Hit / miss counters of this worker's inference model cache."""
+    return global_model_cache.stats()
+
+
+@router.get("/inference/batching")
+async def api_inference_batching_stats(user=Depends(get_current_user)):
+    """How many /infer requests this worker has served per forward pass."""
+    return inference_batcher.stats()
@@ -1,17 +1,13 @@
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form
+from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form, Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlmodel import Session
-from sqlalchemy import func, select
+from sqlalchemy import select
 
 from app.core.database import get_session
-from app.models.assessment_result import AssessmentResult
 from app.models.contractor import Contractor
-from app.models.fl_experiment import FLExperiment
-from app.models.labor import Labor
-from app.models.project import Project, ProjectStatus
+from app.models.project import Project
 from app.models.project_document import ProjectDocument
-from app.models.tax import TaxStatus, TaxSubmission
 from app.schemas.project_read import DashboardProjectStatsRead, DashboardProjectRead
 from app.services.project_service import (
     create_project,
@@ -29,7 +25,14 @@ from app.services.project_service import (
     get_project_ownership,
     list_projects_with_ownership,
     list_project_documents_with_ownership,
+    list_document_metadata,
+    get_document,
+    get_download_url_for_doc,
+    complete_signed_upload,
+    document_storage_stats,
 )
+from app.services.blob_store import get_blob_store
+from app.services.blob_download import build_blob_response
 from app.schemas.domain import (
     ProjectCreate,
     ProjectRead,
@@ -40,7 +43,9 @@ from app.schemas.domain import (
 from app.schemas.project_read import DashboardProjectRead
 from app.core.security import get_current_user
 from app.models.user import Role
-from app.services.project_stats import compute_stats
+from app.services.assessment_service import get_rollup
+from app.services.portfolio_dashboard import portfolio_dashboard
+from app.services.project_stats import rollup_stats
 from app.services.project_service import fetch_project
 
 router = APIRouter(prefix="/projects", tags=["projects"]) 
@@ -104,9 +109,10 @@ async def get_project_ownership_endpoint(project_id: int, session: AsyncSession
 
 
 @router.get("/{project_id}/documents-with-ownership", response_model=ProjectDocumentsWithOwnershipRead)
-async def get_project_documents_with_ownership(project_id: int, session: AsyncSession = Depends(get_session), user=Depends(get_current_user)):
-    """Get all documents associated with a project, including project owner information"""
-    data = await list_project_documents_with_ownership(session, project_id)
+async def get_project_documents_with_ownership(project_id: int, cursor: Optional[str] = None, limit: int = 50, session: AsyncSession = Depends(get_session), user=Depends(get_current_user)):
+    """Get a page of document metadata for a project, including project owner information.
+    Pass `next_cursor` back as `cursor` to fetch the next page."""
+    data = await list_project_documents_with_ownership(session, project_id, cursor=cursor, limit=limit)
     if not data:
         raise HTTPException(status_code=404, detail="Project not found")
     
@@ -178,6 +184,51 @@ async def create_doc(
     return DocumentRead.from_orm(doc)
 
 
+@router.post("/{project_id}/docs/complete", response_model=DocumentRead)
+async def complete_doc_upload(
+    project_id: int,
+    payload: DocumentCreate,
+    session: AsyncSession = Depends(get_session),
+    user=Depends(get_current_user)
+):
+    """
+    Completion callback for signed-URL uploads: registers the ProjectDocument
+    once the client has PUT the bytes directly to the storage endpoint.
+    """
+    project = await get_project(session, project_id)
+    if not project:
+        raise HTTPException(status_code=404, detail="Project not found")
+    if user.role != Role.GOVERNMENT:
+        is_owner = await check_ownership(session, project, user)
+        if not is_owner:
+            raise HTTPException(status_code=403, detail="Not owner")
+    if not payload.storage_key.startswith(f"projects/{project_id}/"):
+        raise HTTPException(status_code=400, detail="Storage key does not belong to this project")
+
+    doc = await complete_signed_upload(session, project_id, payload.doc_type, payload.filename, payload.storage_key)
+    if not doc:
+        raise HTTPException(status_code=409, detail="Upload not found for storage key")
+    return DocumentRead.from_orm(doc)
+
+
+@router.get("/{project_id}/docs/{record_id}/download-url")
+async def get_doc_download_url(project_id: int, record_id: int, session: AsyncSession = Depends(get_session), user=Depends(get_current_user)):
+    """Signed, expiring URL to fetch the document directly from the storage endpoint."""
+    project = await get_project(session, project_id)
+    if not project:
+        raise HTTPException(status_code=404, detail="Project not found")
+    if user.role != Role.GOVERNMENT:
+        is_owner = await check_ownership(session, project, user)
+        if not is_owner:
+            raise HTTPException(status_code=403, detail="Not owner")
+    doc = await get_document(session, project_id, record_id)
+    if not doc:
+        raise HTTPException(status_code=404, detail="Document not found")
+    if not doc.content_sha256:
+        raise HTTPException(status_code=409, detail="Document has not been migrated to the blob store")
+    return get_download_url_for_doc(doc)
+
+
 @router.delete("/{project_id}/docs/{record_id}")
 async def delete_doc(project_id: int, record_id: int, session: AsyncSession = Depends(get_session), user=Depends(get_current_user)):
     project = await get_project(session, project_id)
@@ -195,30 +246,72 @@ async def delete_doc(project_id: int, record_id: int, session: AsyncSession = De
 
 @router.get("/docs", response_model=List[DocumentRead])
 async def list_my_documents(
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = 50,
     session: AsyncSession = Depends(get_session),
     user=Depends(get_current_user),
 ):
     """
-    Return all documents accessible to the logged-in user. 
+    Return a page of document metadata accessible to the logged-in user. 
     - Government users see all documents
     - Non-government users see documents only for projects they own. 
+    The cursor for the next page is returned in the X-Next-Cursor header.
     """
 
-    if user.role == Role.GOVERNMENT:
-        # Government: fetch all documents 
-        result = await session.execute(select(ProjectDocument))
-        docs = result.scalars().all()
-    else:
-        #Non-government: fetch only documents for projects they own 
-        result = await session.execute(
-            select(ProjectDocument)
-            .join(Project, ProjectDocument.project_id == Project.id)
-            .where(Project.contractor_id ==user.id)
-        )
-        docs = result.scalars().all()
+    docs, next_cursor = await list_document_metadata(
+        session,
+        owner_id=None if user.role == Role.GOVERNMENT else user.id,
+        cursor=cursor,
+        limit=limit,
+    )
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
 
     # Return using the Pyndatic schema 
-    return [DocumentRead.from_orm(doc) for doc in docs]
+    return [DocumentRead(**doc) for doc in docs]
+
+
+@router.get("/docs/storage-stats")
+async def get_document_storage_stats(
+    project_id: Optional[int] = None,
+    session: AsyncSession = Depends(get_session),
+    user=Depends(get_current_user),
+):
+    """
+    Report bytes saved by at-rest document compression, optionally for one project.
+    Counts are per document row; deduplicated blobs are counted for each row.
+    """
+    return await document_storage_stats(
+        session,
+        project_id=project_id,
+        owner_id=None if user.role == Role.GOVERNMENT else user.id,
+    )
+
+
+@router.get("/{project_id}/docs/{record_id}/download")
+async def download_doc(project_id: int, record_id: int, request: Request, session: AsyncSession = Depends(get_session), user=Depends(get_current_user)):
+    """
+    Stream a document or video from the blob store. Supports Range requests
+    (206) for seeking, and a strong ETag (the SHA-256) with If-None-Match 304s.
+    """
+    project = await get_project(session, project_id)
+    if not project:
+        raise HTTPException(status_code=404, detail="Project not found")
+    if user.role != Role.GOVERNMENT:
+        is_owner = await check_ownership(session, project, user)
+        if not is_owner:
+            raise HTTPException(status_code=403, detail="Not owner")
+    doc = await get_document(session, project_id, record_id)
+    if not doc:
+        raise HTTPException(status_code=404, detail="Document not found")
+
+    if doc.content_sha256:
+        return build_blob_response(request, get_blob_store(), doc.content_sha256, doc.size_bytes, doc.content_type, filename=doc.filename)
+
+    # Legacy row not yet migrated out of the database: no ETag/Range support
+    await session.refresh(doc, attribute_names=["content"])
+    return Response(content=doc.content or b"", media_type=doc.content_type or "application/octet-stream", headers={"Content-Disposition": f'attachment; filename="{doc.filename}"'})
 
 
 
@@ -268,14 +361,8 @@ async def get_dashboard_project(
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
 
-    result = await session.execute(
-        select(AssessmentResult).where(
-            AssessmentResult.project_id == project_id
-        )
-    )
-    assessments = result.scalars().all()
-
-    stats = compute_stats(assessments)
+    # One row, maintained on every assessment insert (assessment_service.bump_rollup)
+    stats = rollup_stats(await get_rollup(session, project_id))
 
     return DashboardProjectRead(
         id=project.id,
@@ -305,67 +392,9 @@ async def admin_projects_dashboard(
 ):
     """
     System-level metrics for admin dashboard. This is separate from the /projects/{id} endpoint which is more project-focused.
+    Served from a snapshot refreshed in the background; `computedAt` says how fresh it is.
     """
-
-    #----Projects----#
-    total_projects = await session.scalar(
-        select(func.count(Project.id))
-    ) or 1 # avoid division by zero
-
-    active_projects = await session.scalar(
-        select(func.count(Project.id))
-        .where(Project.status == ProjectStatus.ACTIVE)
-    ) or 0 
-
-    #----Labor----#
-    total_labor_active = await session.scalar(
-        select(func.count(Labor.id))
-        .join(Project, Labor.project_id == Project.id)
-        .where(Project.status == ProjectStatus.ACTIVE)
-    ) or 0
-
-    labor_force_index = (
-        total_labor_active / active_projects
-        if active_projects > 0
-        else 0.0
-    )
-
-
-    #----FL Experiments----#
-    total_fl_experiments = await session.scalar(
-        select(func.count(FLExperiment.id))
-    ) or 0
-
-    fl_model_drift = total_fl_experiments / total_projects 
-
-
-    #----Tax Risk----#
-    total_tax_submissions = await session.scalar(
-        select(func.count(TaxSubmission.id))
-    ) or 0
-
-    risky_tax_submissions = await session.scalar(
-        select(func.count(TaxSubmission.id))
-        .where(TaxSubmission.status != TaxStatus.VALIDATED)
-    ) or 0
-
-    financial_risk_score = (
-        risky_tax_submissions / total_tax_submissions
-        if total_tax_submissions > 0
-        else 0.0
-    )
-
-
-    #----Response----#
-    return {
-        "projects": {
-            "total": total_projects,
-            "active": active_projects,
-        },
-        "laborForceIndex": round(labor_force_index, 2),
-        "flModelDrift": round(fl_model_drift, 2),
-        "financialRiskScore": round(financial_risk_score, 2),
-    }
+    return await portfolio_dashboard.get(session)
 
 
 
@@ -1,16 +1,26 @@
-from sqlalchemy import select
 from fastapi import APIRouter, UploadFile, File, Depends, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import datetime
 import os, shutil, re
+from typing import Optional
 
 from app.core.database import get_session
 from app.core.security import get_current_user
+from app.models.hazard_type import RiskLevel
 from app.models.project import Project
 from app.models.assessment_result import AssessmentResult
-from app.models.assessment_hazard import AssessmentHazard
 from app.schemas.assessments import AssessmentResponse
+from app.services.assessment_service import (
+    assessment_summary,
+    hazard_breakdown,
+    hazard_heatmap,
+    list_assessment_notes,
+    save_assessment,
+)
+from app.services.gemini_response import normalize_gemini_response
+from app.services.trend_store import naive_utc
 from app.services.gemini_service import analyze_image, analyze_assessment
+from app.services.project_service import owned_project_ids
 
 router = APIRouter(prefix="/safety", tags=["safety"])
 
@@ -33,12 +43,6 @@ def parse_gemini_hazards(text: str):
         })
     return hazards
 
-def serialize_gemini_response(response: dict) -> dict:
-    serializable = {}
-    for key, value in response.items():
-        serializable[key] = str(value) if hasattr(value, "__dict__") else value
-    return serializable
-
 @router.post("/projects/{project_id}/image-assessment", response_model=AssessmentResponse)
 async def assess_project_image(
     project_id: int,
@@ -85,25 +89,11 @@ async def assess_project_image(
         score=score,
         notes=context_text or analysis["response"]["text"],
         image_path=image_path,
-        gemini_response=serialize_gemini_response(vision_result),
+        gemini_response=normalize_gemini_response(vision_result),
         created_at=datetime.utcnow()
     )
-    session.add(assessment)
-    await session.commit()
-    await session.refresh(assessment)
-
-    # Save hazards
-    for h in hazards:
-        session.add(
-            AssessmentHazard(
-                assessment_id=assessment.id,
-                hazard_type=h["hazard_type"],
-                location=h["location"],
-                risk_level=h["risk_level"],
-                recommendations=h["recommendations"],
-            )
-        )
-    await session.commit()
+    # Save assessment + hazards (and index them for search)
+    await save_assessment(session, assessment, hazards)
 
     return {
         "assessment": assessment,
@@ -115,11 +105,15 @@ async def assess_project_image(
 @router.get("/projects/{project_id}/assessments/aggregate")
 async def get_project_assessments_aggregate(
     project_id: int,
+    cursor: Optional[str] = None,
+    limit: int = 50,
     session: AsyncSession = Depends(get_session),
     user=Depends(get_current_user),
 ):
     """
     Aggregate all image assessments for a project into a single summary.
+    Scores and hazard counts are computed in SQL; notes come back one page
+    at a time (pass `next_cursor` back as `cursor`).
     """
 
     # Validate project exists
@@ -127,47 +121,50 @@ async def get_project_assessments_aggregate(
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
 
-    # Fetch all assessments for this project
-    result = await session.execute(
-        select(AssessmentResult)
-        .where(AssessmentResult.project_id == project_id)
-    )
-    assessments = result.scalars().all()
-
-    if not assessments:
+    summary = await assessment_summary(session, project_id)
+    if not summary["total_assessments"]:
         return {"project_id": project_id, "aggregated": {}}
 
-    assessment_ids = [a.id for a in assessments]
-
-    # Fetch hazards for all assessments
-    hazard_result = await session.execute(
-        select(AssessmentHazard).where(
-            AssessmentHazard.assessment_id.in_(assessment_ids)
-        )
-    )
-    hazards = hazard_result.scalars().all()
-
-    # Aggregate
-    combined_gemini_text = " ".join(
-        a.gemini_response.get("text", "") for a in assessments if a.gemini_response
-    )
-    all_hazards = [
-        {
-            "hazard_type": h.hazard_type,
-            "location": h.location,
-            "risk_level": h.risk_level,
-            "recommendations": h.recommendations,
-        }
-        for h in hazards
-    ]
-    avg_score = sum(a.score for a in assessments) / len(assessments)
+    notes, next_cursor = await list_assessment_notes(session, project_id, cursor=cursor, limit=limit)
 
     return {
         "project_id": project_id,
         "aggregated": {
-            "average_score": avg_score,
-            "combined_notes": combined_gemini_text,
-            "all_hazards": all_hazards,
-            "total_assessments": len(assessments),
+            **summary,
+            "hazards_by_type": await hazard_breakdown(session, project_id),
+            "notes": [{k: n[k] for k in ("id", "score", "notes", "text", "created_at")} for n in notes],
+            "next_cursor": next_cursor,
         }
     }
+
+
+@router.get("/hazards/heatmap")
+async def get_hazard_heatmap(
+    project_id: Optional[int] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    by_project: bool = False,
+    session: AsyncSession = Depends(get_session),
+    user=Depends(get_current_user),
+):
+    """
+    Hazard counts by canonical type and risk level across the portfolio
+    (government) or the caller's own projects (contractors). Set
+    `by_project` to break the cells down per project.
+    """
+    project_ids = await owned_project_ids(session, user)
+
+    if project_id is not None:
+        if project_ids is not None and project_id not in project_ids:
+            raise HTTPException(status_code=403, detail="Not owner")
+        project_ids = [project_id]
+
+    # Query datetimes may carry an offset; created_at is naive UTC
+    since = naive_utc(since) if since else None
+    until = naive_utc(until) if until else None
+    cells = await hazard_heatmap(session, project_ids=project_ids, since=since, until=until, by_project=by_project)
+    return {
+        "cells": cells,
+        "risk_levels": [r.value for r in RiskLevel],
+        "total": sum(c["count"] for c in cells),
+    }
@@ -0,0 +1,41 @@
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import get_session
+from app.core.security import get_current_user
+from app.schemas.search import SearchResults
+from app.services.project_service import owned_project_ids
+from app.services.search_service import SOURCE_TYPES, search
+
+router = APIRouter(prefix="/search", tags=["search"])
+
+
+@router.get("", response_model=SearchResults)
+async def search_endpoint(
+    q: str = Query(..., min_length=1),
+    project_id: Optional[int] = None,
+    types: Optional[List[str]] = Query(None, description=f"Any of: {', '.join(SOURCE_TYPES)}"),
+    cursor: Optional[str] = None,
+    limit: int = 20,
+    session: AsyncSession = Depends(get_session),
+    user=Depends(get_current_user),
+):
+    """
+    Ranked full-text search over document text, transcripts, research logs,
+    assessment notes and hazards. Government users search every project;
+    contractors only the projects they own. Pass `next_cursor` back as
+    `cursor` to fetch the next page.
+    """
+    if types and not set(types) <= set(SOURCE_TYPES):
+        raise HTTPException(status_code=400, detail=f"Unknown type; expected any of {', '.join(SOURCE_TYPES)}")
+
+    project_ids = await owned_project_ids(session, user)
+
+    if project_id is not None:
+        if project_ids is not None and project_id not in project_ids:
+            raise HTTPException(status_code=403, detail="Not owner")
+        project_ids = [project_id]
+
+    results, next_cursor = await search(session, q, project_ids=project_ids, source_types=types, cursor=cursor, limit=limit)
+    return {"query": q, "results": results, "next_cursor": next_cursor}
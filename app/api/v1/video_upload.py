@@ -11,9 +11,9 @@ from fastapi import (
 from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import datetime
 from typing import Optional
-import os
-import shutil
+import asyncio
 import logging
+import os
 
 from app.core.database import get_session
 from app.core.security import get_current_user
@@ -21,9 +21,11 @@ from app.models.project import Project
 from app.models.assessment_result import AssessmentResult
 from app.models.project_document import ProjectDocument
 from app.schemas.assessments import AssessmentResponse
-from app.services.gemini_service import analyze_video
-import json
-from typing import Any
+from app.services.assessment_service import save_assessment
+from app.services.blob_store import get_blob_store
+from app.services.gemini_response import normalize_gemini_response
+from app.services.gemini_service import analyze_video_segments
+from app.services.search_service import index_document
 
 router = APIRouter(prefix="/safety", tags=["safety"])
 
@@ -33,68 +35,6 @@ logger = logging.getLogger(__name__)
 UPLOAD_PROGRESS_CHUNK_SIZE = 5 * 1024 * 1024  
 
 
-def force_json_safe(value: Any):
-    """
-    Recursively convert ANY object into JSON-safe primitives.
-    This is the nuclear option and guarantees DB safety.
-    """
-    try:
-        json.dumps(value)
-        return value
-    except TypeError:
-        pass
-
-    if isinstance(value, dict):
-        return {k: force_json_safe(v) for k, v in value.items()}
-
-    if isinstance(value, list):
-        return [force_json_safe(v) for v in value]
-
-    if hasattr(value, "__dict__"):
-        return force_json_safe(vars(value))
-
-    return str(value)
-
-
-def serialize_gemini_response(response) -> dict:
-    """
-    Final, DB-safe Gemini serializer.
-    """
-
-    # Best case: Gemini text output
-    if hasattr(response, "text") and isinstance(response.text, str):
-        return {"text": response.text}
-
-    if hasattr(response, "output_text") and isinstance(response.output_text, str):
-        return {"text": response.output_text}
-
-    # Controlled extraction
-    payload = {}
-
-    if hasattr(response, "candidates"):
-        payload["candidates"] = []
-        for c in response.candidates:
-            parts = []
-            if hasattr(c, "content") and hasattr(c.content, "parts"):
-                for p in c.content.parts:
-                    if hasattr(p, "text"):
-                        parts.append(p.text)
-            payload["candidates"].append({"text": "\n".join(parts)})
-
-    if hasattr(response, "usage_metadata"):
-        payload["usage"] = {
-            "prompt_tokens": getattr(response.usage_metadata, "prompt_token_count", None),
-            "candidates_tokens": getattr(response.usage_metadata, "candidates_token_count", None),
-            "total_tokens": getattr(response.usage_metadata, "total_token_count", None),
-        }
-
-    if not payload:
-        payload["raw"] = str(response)
-
-    # 🔒 GUARANTEE JSON SAFETY
-    return force_json_safe(payload)
-
-
 @router.post(
     "/projects/{project_id}/video/upload",
     response_model=AssessmentResponse,
@@ -103,6 +43,7 @@ async def assess_uploaded_video(
     project_id: int,
     video: UploadFile = File(...),
     context_text: Optional[str] = Form(None),
+    duration_seconds: Optional[float] = Form(None),
     session: AsyncSession = Depends(get_session),
     user=Depends(get_current_user),
 ):
@@ -124,64 +65,76 @@ async def assess_uploaded_video(
         )
 
     # ---------------------------------------------------
-    # 1️⃣ STREAM READ WITH PROGRESS LOGGING
+    # 1️⃣ STREAM INTO BLOB STORE WITH PROGRESS LOGGING
     # ---------------------------------------------------
+    store = get_blob_store()
+    writer = store.writer(video.content_type)
     total_read = 0
-    video_chunks: list[bytes] = []
-
-    while True:
-        chunk = await video.read(UPLOAD_PROGRESS_CHUNK_SIZE)
-        if not chunk:
-            break
-
-        video_chunks.append(chunk)
-        total_read += len(chunk)
 
-        logger.info(
-            "Video upload progress | project_id=%s | filename=%s | bytes_read=%s",
-            project_id,
-            video.filename,
-            total_read,
-        )
+    try:
+        while True:
+            chunk = await video.read(UPLOAD_PROGRESS_CHUNK_SIZE)
+            if not chunk:
+                break
+
+            await asyncio.to_thread(writer.write, chunk)
+            total_read += len(chunk)
+
+            logger.info(
+                "Video upload progress | project_id=%s | filename=%s | bytes_read=%s",
+                project_id,
+                video.filename,
+                total_read,
+            )
+    except Exception:
+        writer.abort()
+        raise
 
     if total_read == 0:
+        writer.abort()
         raise HTTPException(status_code=400, detail="Empty video file")
 
-    video_bytes = b"".join(video_chunks)
+    blob = await asyncio.to_thread(writer.commit)
 
     logger.info(
-        "Video upload completed | project_id=%s | filename=%s | total_bytes=%s",
+        "Video upload completed | project_id=%s | filename=%s | total_bytes=%s | sha256=%s",
         project_id,
         video.filename,
         total_read,
+        blob.sha256,
     )
 
     # ---------------------------------------------------
-    # 2️⃣ STORE VIDEO IN DB
+    # 2️⃣ REGISTER VIDEO DOCUMENT
     # ---------------------------------------------------
     document = ProjectDocument(
         project_id=project_id,
         type="video",
         filename=video.filename,
-        content=video_bytes,
         content_type=video.content_type,
+        content_sha256=blob.sha256,
+        size_bytes=blob.size,
+        stored_size=blob.stored_size,
+        compression=blob.codec,
         storage_key=f"project_{project_id}/videos/{video.filename}",
         created_at=datetime.utcnow(),
     )
 
     session.add(document)
+    await session.flush()
+    await index_document(session, document)
     await session.commit()
     await session.refresh(document)
 
     logger.info(
-        "Video persisted to DB | project_id=%s | document_id=%s | size_bytes=%s",
+        "Video document registered | project_id=%s | document_id=%s | size_bytes=%s",
         project_id,
         document.id,
-        len(video_bytes),
+        blob.size,
     )
 
     # ---------------------------------------------------
-    # 3️⃣ GEMINI ANALYSIS
+    # 3️⃣ GEMINI ANALYSIS (SEGMENT-PARALLEL)
     # ---------------------------------------------------
     prompt = context_text or (
         "Analyze this construction site video for safety hazards, "
@@ -194,23 +147,64 @@ async def assess_uploaded_video(
         document.id,
     )
 
-    gemini_raw_response = await analyze_video(
-        project_id=project_id,
-        video_bytes=document.content,
-        prompt=prompt,
-        mime_type=document.content_type,
-    )
+    # An identical earlier upload may be stored compressed; Gemini needs the raw bytes
+    found = await asyncio.to_thread(store.locate, blob.sha256)
+    if found is None:
+        raise HTTPException(status_code=500, detail="Stored video not found")
+    video_path, codec = found
+    exported = await asyncio.to_thread(store.export, blob.sha256) if codec else None
+
+    try:
+        analysis = await analyze_video_segments(
+            project_id=project_id,
+            video_path=exported or str(video_path),
+            prompt=prompt,
+            mime_type=document.content_type,
+            duration_seconds=duration_seconds,
+        )
+    finally:
+        if exported:
+            await asyncio.to_thread(os.remove, exported)
+
+    if analysis.get("error"):
+        # No assessment for a video that was never analyzed
+        logger.error(
+            "Gemini analysis failed | project_id=%s | document_id=%s | error=%s",
+            project_id,
+            document.id,
+            analysis["error"],
+        )
+        raise HTTPException(status_code=502, detail=analysis["text"])
 
     logger.info(
-        "Gemini analysis completed | project_id=%s | document_id=%s",
+        "Gemini analysis completed | project_id=%s | document_id=%s | segments=%s | failed=%s | hazards=%s",
         project_id,
         document.id,
+        len(analysis["segments"]),
+        analysis.get("failed_segments", 0),
+        len(analysis["timeline"]),
     )
 
-    gemini_response = serialize_gemini_response(gemini_raw_response)
+    gemini_response = {
+        **normalize_gemini_response(analysis),
+        "duration_seconds": analysis.get("duration_seconds"),
+        "segments": analysis["segments"],
+        "failed_segments": analysis.get("failed_segments", 0),
+        "timeline": analysis["timeline"],
+    }
+
+    hazards = [
+        {
+            "hazard_type": h["hazard_type"],
+            "location": ", ".join(h["locations"]),
+            "risk_level": h["risk_level"],
+            "recommendations": h["recommendations"],
+        }
+        for h in analysis["timeline"]
+    ]
 
     # ---------------------------------------------------
-    # 4️⃣ PERSIST ASSESSMENT
+    # 4️⃣ PERSIST ASSESSMENT + HAZARD TIMELINE
     # ---------------------------------------------------
     assessment = AssessmentResult(
         project_id=project_id,
@@ -221,9 +215,7 @@ async def assess_uploaded_video(
         created_at=datetime.utcnow(),
     )
 
-    session.add(assessment)
-    await session.commit()
-    await session.refresh(assessment)
+    await save_assessment(session, assessment, hazards)
 
     logger.info(
         "Video assessment pipeline completed | assessment_id=%s | document_id=%s",
@@ -233,5 +225,5 @@ async def assess_uploaded_video(
 
     return {
         "assessment": assessment,
-        "hazards": [],
+        "hazards": hazards,
     }
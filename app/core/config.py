@@ -23,6 +23,68 @@ class Settings(BaseSettings):
     UPLOAD_DIR: str = "./uploads"
     MAX_FILE_SIZE: int = 50 * 1024 * 1024  # 50MB
 
+    # Document blob storage
+    BLOB_STORE_BACKEND: str = "local"
+    BLOB_STORE_DIR: str = "./uploads/blobs"
+    # Unreferenced blobs are removed by a periodic sweep (services/blob_gc.py),
+    # only once nothing has uploaded the same content for this long
+    BLOB_GC_GRACE_SECONDS: int = 2 * 3600
+    BLOB_GC_INTERVAL_SECONDS: float = 300.0
+
+    # Signed URLs served by the storage endpoint (app/storage_server.py)
+    STORAGE_PUBLIC_URL: str = "http://localhost:8081"
+    STORAGE_SIGNING_KEY: Optional[str] = None
+    STORAGE_URL_EXPIRE_SECONDS: int = 3600
+
+    # Full-text search
+    SEARCH_MAX_BODY_CHARS: int = 200_000
+
+    # Assessment classification (substring, case-insensitive); re-run
+    # reclassify_assessments.py after changing these
+    CRITICAL_KEYWORDS: List[str] = ["fall", "missing harness", "exposed rebar", "impalement"]
+    NON_COMPLIANT_KEYWORDS: List[str] = ["recommended", "unable"]
+
+    # Trend time-series (buffered writes, see services/trend_store.py)
+    TREND_FLUSH_INTERVAL_SECONDS: float = 2.0
+    TREND_BUFFER_MAX_POINTS: int = 1000
+    TREND_MAX_POINTS_PER_QUERY: int = 500
+
+    # Government portfolio dashboard (services/portfolio_dashboard.py)
+    PORTFOLIO_REFRESH_SECONDS: int = 60
+    PORTFOLIO_DIRTY_CHECK_SECONDS: float = 5.0
+    PORTFOLIO_CACHE_SECONDS: float = 5.0
+
+    # Federated learning: storage precision of uploaded weights ("float32" or
+    # "float16"); aggregated global models are always stored as float32
+    FL_UPLOAD_WEIGHTS_DTYPE: str = "float32"
+    # Rounds are averaged from a running accumulator (services/fl_accumulator.py);
+    # the raw upload weights are only kept for audit when this is on
+    FL_KEEP_RAW_UPLOADS: bool = True
+    # Round scheduler (services/fl_round_scheduler.py); experiments can override
+    # the deadline with params["round_deadline_seconds"]
+    FL_ROUND_DEADLINE_SECONDS: int = 3600
+    FL_SCHEDULER_INTERVAL_SECONDS: float = 5.0
+    FL_AGGREGATION_TIMEOUT_SECONDS: int = 600
+    # Failed aggregations reopen the round and retry with exponential backoff;
+    # after FL_AGGREGATION_MAX_ATTEMPTS the round is parked as FAILED
+    FL_AGGREGATION_RETRY_BACKOFF_SECONDS: float = 30.0
+    FL_AGGREGATION_MAX_ATTEMPTS: int = 5
+    # Envoy training process pool, per API worker (services/fl_training_executor.py);
+    # 0 torch threads = CPUs / workers. Experiments can override the job cap with
+    # params["max_concurrent_jobs"]
+    FL_TRAINING_WORKERS: int = 2
+    FL_TRAINING_TORCH_THREADS: int = 0
+    FL_TRAINING_MAX_PENDING: int = 16
+    FL_MAX_JOBS_PER_EXPERIMENT: int = 2
+    FL_TRAINING_JOB_TIMEOUT_SECONDS: int = 900
+    FL_TRAINING_JOB_SWEEP_SECONDS: float = 60.0
+    # Global models kept loaded for inference, per API worker (services/fl_model_cache.py)
+    FL_MODEL_CACHE_SIZE: int = 32
+    # Concurrent /infer calls for the same model share one forward pass
+    # (services/fl_inference_batcher.py); a wait of 0 disables batching
+    FL_INFERENCE_BATCH_MAX_WAIT_MS: float = 2.0
+    FL_INFERENCE_BATCH_MAX_ROWS: int = 256
+
     # Auth
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60
     ALGORITHM: str = "HS256"
@@ -32,6 +94,12 @@ class Settings(BaseSettings):
     GOOGLE_API_KEY: Optional[str] = None
     GOOGLE_SEARCH_CX: Optional[str] = None
 
+    # Video analysis
+    VIDEO_SEGMENT_SECONDS: int = 300
+    VIDEO_ANALYSIS_CONCURRENCY: int = 4
+    VIDEO_TIMELINE_MERGE_GAP_SECONDS: float = 5.0
+    VIDEO_UPLOAD_PROCESSING_TIMEOUT_SECONDS: float = 300.0
+
     # Email
     EMAIL_ADDRESS: str
     EMAIL_PASSWORD: str
@@ -0,0 +1,32 @@
+import hashlib
+import hmac
+import time
+from typing import Optional
+from urllib.parse import quote, urlencode
+
+from app.core.config import settings
+
+
+def _signing_key() -> bytes:
+    return (settings.STORAGE_SIGNING_KEY or settings.SECRET_KEY).encode()
+
+
+def sign_storage_path(method: str, path: str, expires_at: int) -> str:
+    """HMAC-SHA256 over the method, the unquoted URL path and the expiry."""
+    message = f"{method.upper()}\n{path}\n{expires_at}".encode()
+    return hmac.new(_signing_key(), message, hashlib.sha256).hexdigest()
+
+
+def build_signed_url(method: str, path: str, expires_seconds: Optional[int] = None) -> dict:
+    """Return a signed, expiring URL on the storage endpoint for `path`."""
+    expires_at = int(time.time()) + (expires_seconds or settings.STORAGE_URL_EXPIRE_SECONDS)
+    query = urlencode({"exp": expires_at, "sig": sign_storage_path(method, path, expires_at)})
+    url = f"{settings.STORAGE_PUBLIC_URL.rstrip('/')}{quote(path)}?{query}"
+    return {"url": url, "method": method.upper(), "expires_at": expires_at}
+
+
+def verify_storage_signature(method: str, path: str, expires_at: int, signature: str) -> bool:
+    if expires_at < int(time.time()):
+        return False
+    expected = sign_storage_path(method, path, expires_at)
+    return hmac.compare_digest(expected, signature)
@@ -50,6 +50,7 @@ from app.api.v1 import safety as v1_safety
 from app.api.v1 import doc_assessment as v1_doc_assessment
 from app.api.v1 import video_upload as v1_video_upload
 from app.api.v1 import video_live as v1_video_live
+from app.api.v1 import search as v1_search
 
 # Register routers
 app.include_router(health_router, prefix="/api", tags=["health"])
@@ -71,6 +72,7 @@ app.include_router(v1_safety.router, prefix="/api/v1", tags=["safety"])
 app.include_router(v1_doc_assessment.router, prefix="/api/v1", tags=["safety"])
 app.include_router(v1_video_upload.router, prefix="/api/v1", tags=["safety"])
 app.include_router(v1_video_live.router, prefix="/api/v1", tags=["safety"])
+app.include_router(v1_search.router, prefix="/api/v1", tags=["search"])
 
 
 # Exception handlers
@@ -91,11 +93,43 @@ register_exception_handlers(app)
 #             logger.error(f"Migration failed: {e}")
 #             raise
 
+# Background jobs started/stopped with the app
+from app.core.periodic import PeriodicTask
+from app.services.blob_gc import sweep_orphan_blobs
+from app.services.fl_model_cache import global_model_cache
+from app.services.fl_round_scheduler import run_round_scheduler
+from app.services.fl_training_executor import training_executor
+from app.services.fl_training_jobs import expire_stale_jobs
+from app.services.portfolio_dashboard import portfolio_dashboard
+from app.services.trend_store import trend_buffer
+
+periodic_tasks = [
+    PeriodicTask("trend-flush", settings.TREND_FLUSH_INTERVAL_SECONDS, trend_buffer.flush),
+    PeriodicTask("portfolio-refresh", settings.PORTFOLIO_DIRTY_CHECK_SECONDS, portfolio_dashboard.refresh_if_needed),
+    PeriodicTask("fl-round-scheduler", settings.FL_SCHEDULER_INTERVAL_SECONDS, run_round_scheduler),
+    PeriodicTask("fl-training-job-sweep", settings.FL_TRAINING_JOB_SWEEP_SECONDS, expire_stale_jobs),
+    PeriodicTask("blob-gc", settings.BLOB_GC_INTERVAL_SECONDS, sweep_orphan_blobs),
+]
+
+
 @app.on_event("startup")
 async def on_startup():
     logger.info("Starting app", extra={"app": settings.APP_NAME})
+    for task in periodic_tasks:
+        task.start()
+    try:
+        loaded = await global_model_cache.warm()
+        logger.info("FL inference models warmed", extra={"models": loaded})
+    except Exception:
+        # Best effort: requests load models on demand anyway
+        logger.exception("FL inference model warm-up failed")
 
 
 @app.on_event("shutdown")
 async def on_shutdown():
     logger.info("Shutting down")
+    for task in periodic_tasks:
+        await task.stop()
+    # Don't drop trend points that are still buffered
+    await trend_buffer.flush()
+    training_executor.shutdown()
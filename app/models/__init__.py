@@ -36,3 +36,12 @@ from .assessment_result import AssessmentResult # noqa: F401
 from .assessment_hazard import AssessmentHazard # noqa: F401
 
 
+from .search_entry import SearchEntry  # noqa: F401
+from .project_assessment_rollup import ProjectAssessmentRollup  # noqa: F401
+from .hazard_type import HazardType, RiskLevel  # noqa: F401
+from .trend import TrendPoint, TrendRollup  # noqa: F401
+from .portfolio_snapshot import PortfolioSnapshot  # noqa: F401
+from .fl_round_accumulator import FLRoundAccumulator  # noqa: F401
+from .fl_round_event import FLRoundEvent  # noqa: F401
+from .fl_training_job import FLTrainingJob  # noqa: F401
+from .pending_blob_deletion import PendingBlobDeletion  # noqa: F401
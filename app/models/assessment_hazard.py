@@ -1,15 +1,27 @@
 from typing import Optional, List
 from sqlmodel import SQLModel, Field, Relationship
 from datetime import datetime
-from sqlalchemy import Column, JSON
+from sqlalchemy import Column, Enum as SAEnum, Index, JSON
+
+from app.models.hazard_type import RiskLevel
 
 
 class AssessmentHazard(SQLModel, table=True):
+    __table_args__ = (
+        Index("ix_assessmenthazard_project_type_risk_created", "project_id", "hazard_type_id", "risk", "created_at"),
+        Index("ix_assessmenthazard_type_risk_created", "hazard_type_id", "risk", "created_at"),
+    )
+
     id: Optional[int] = Field(default=None, primary_key=True)
-    assessment_id: int = Field(foreign_key="assessmentresult.id")
+    assessment_id: int = Field(foreign_key="assessmentresult.id", index=True)
     hazard_type: str
     location: str
     risk_level: str
+    # Normalized at ingest (hazard_taxonomy.normalize_hazard); project_id is
+    # denormalized from the assessment so analytics never join back to it
+    project_id: Optional[int] = Field(default=None, foreign_key="project.id")
+    hazard_type_id: Optional[int] = Field(default=None, foreign_key="hazardtype.id")
+    risk: Optional[RiskLevel] = Field(default=None, sa_column=Column(SAEnum(RiskLevel), nullable=True))
     recommendations: List[str] = Field(sa_column=Column(JSON))
     created_at: datetime = Field(default_factory=datetime.utcnow)
 
@@ -1,16 +1,25 @@
 from typing import Optional, List, Dict
 from sqlmodel import SQLModel, Field, Relationship
 from datetime import datetime
-from sqlalchemy import Column, JSON
+from sqlalchemy import Column, Index, JSON
 
 
 class AssessmentResult(SQLModel, table=True):
+    __table_args__ = (
+        Index("ix_assessmentresult_project_created", "project_id", "created_at", "id"),
+        Index("ix_assessmentresult_created", "created_at", "id"),
+    )
+
     id: Optional[int] = Field(default=None, primary_key=True)
     project_id: int = Field(foreign_key="project.id")
     score: float
     notes: Optional[str] = None
     image_path: Optional[str] = None
     gemini_response: Optional[Dict] = Field(sa_column=Column(JSON))
+    # Keyword labels set at ingest (gemini_classifier); None until classified
+    critical: Optional[bool] = Field(default=None, index=True)
+    compliant: Optional[bool] = Field(default=None, index=True)
+    classifier_version: Optional[str] = Field(default=None, max_length=16)
     created_at: datetime = Field(default_factory=datetime.utcnow)
 
     project: Optional["Project"] = Relationship(back_populates="assessments")
@@ -20,4 +20,9 @@ class FLExperiment(SQLModel, table=True):
     current_round: int = Field(default=0)
     status: str = Field(default="CREATED")  
 
+    # Current round: OPEN -> CLOSING (threshold / deadline) -> AGGREGATING -> OPEN
+    round_state: str = Field(default="OPEN", max_length=16)
+    round_opened_at: Optional[datetime] = None
+    round_state_changed_at: Optional[datetime] = None
+
     created_at: datetime = Field(default_factory=datetime.utcnow)
@@ -1,7 +1,7 @@
 from typing import Optional, Dict, Any
 from datetime import datetime
 from sqlmodel import SQLModel, Field
-from sqlalchemy import Column, JSON
+from sqlalchemy import Column, JSON, LargeBinary
 
 
 class FLGlobalModel(SQLModel, table=True):
@@ -11,6 +11,10 @@ class FLGlobalModel(SQLModel, table=True):
     experiment_id: int = Field(foreign_key="flexperiment.id", index=True)
 
     round: int
-    weights: Dict[str, Any] = Field(sa_column=Column(JSON))
+    # Legacy nested lists; new rows use weights_blob (services/fl_tensor_codec.py)
+    weights: Optional[Dict[str, Any]] = Field(default=None, sa_column=Column(JSON))
+    weights_blob: Optional[bytes] = Field(default=None, sa_column=Column(LargeBinary, nullable=True))
+    # sha256 of weights_blob; delta uploads must name it as their base
+    checksum: Optional[str] = Field(default=None, max_length=64)
 
     created_at: datetime = Field(default_factory=datetime.utcnow)
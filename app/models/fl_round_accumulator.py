@@ -0,0 +1,25 @@
+from typing import Optional
+from datetime import datetime
+from sqlmodel import SQLModel, Field
+from sqlalchemy import Column, LargeBinary
+
+
+class FLRoundAccumulator(SQLModel, table=True):
+    """
+    Running sample-weighted sum of the uploads of one round, updated in the
+    same transaction as each upload (see services/fl_accumulator.py), so
+    closing the round only has to divide by total_samples.
+    """
+    __tablename__ = "fl_round_accumulator"
+
+    experiment_id: int = Field(foreign_key="flexperiment.id", primary_key=True)
+    round: int = Field(primary_key=True)
+
+    # sum(dataset_size * weights) as a float64 tensor blob (services/fl_tensor_codec.py)
+    weighted_sum: Optional[bytes] = Field(default=None, sa_column=Column(LargeBinary, nullable=True))
+    total_samples: int = Field(default=0, nullable=False)
+    contributors: int = Field(default=0, nullable=False)
+    version: int = Field(default=0, nullable=False)
+
+    closed_at: Optional[datetime] = None
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
@@ -0,0 +1,18 @@
+from typing import Any, Dict, Optional
+from datetime import datetime
+from sqlmodel import SQLModel, Field
+from sqlalchemy import Column, Index, JSON
+
+
+class FLRoundEvent(SQLModel, table=True):
+    """Round state transitions written by services/fl_round_scheduler.py."""
+    __tablename__ = "fl_round_event"
+    __table_args__ = (Index("ix_fl_round_event_experiment_id", "experiment_id", "id"),)
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    experiment_id: int = Field(foreign_key="flexperiment.id")
+    round: int
+    # OPENED, THRESHOLD_REACHED, DEADLINE_PASSED, CLOSE_REQUESTED, AGGREGATING, AGGREGATED, FAILED
+    event: str = Field(max_length=32)
+    details: Optional[Dict[str, Any]] = Field(default=None, sa_column=Column(JSON))
+    created_at: datetime = Field(default_factory=datetime.utcnow)
@@ -0,0 +1,25 @@
+from typing import Any, Dict, Optional
+from datetime import datetime
+from sqlmodel import SQLModel, Field
+from sqlalchemy import Column, Index, JSON
+
+
+class FLTrainingJob(SQLModel, table=True):
+    """Envoy training run executed in the training process pool (services/fl_training_jobs.py)."""
+    __tablename__ = "fl_training_job"
+    __table_args__ = (Index("ix_fl_training_job_experiment_status", "experiment_id", "status"),)
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    experiment_id: int = Field(foreign_key="flexperiment.id")
+    participant_id: int = Field(foreign_key="fl_participant.id")
+    project_id: int = Field(foreign_key="project.id")
+
+    # QUEUED -> RUNNING -> SUCCEEDED | FAILED
+    status: str = Field(default="QUEUED", max_length=16)
+    params: Optional[Dict[str, Any]] = Field(default=None, sa_column=Column(JSON))
+    result: Optional[Dict[str, Any]] = Field(default=None, sa_column=Column(JSON))
+    error: Optional[str] = None
+
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
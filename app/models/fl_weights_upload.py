@@ -1,7 +1,7 @@
 from typing import Optional, Any
 from datetime import datetime
 from sqlmodel import SQLModel, Field
-from sqlalchemy import Column, JSON
+from sqlalchemy import Column, JSON, LargeBinary
 
 
 class FLWeightsUpload(SQLModel, table=True):
@@ -11,7 +11,14 @@ class FLWeightsUpload(SQLModel, table=True):
     experiment_id: int = Field(foreign_key="flexperiment.id")
     uploader_id: Optional[int] = Field(default=None, foreign_key="users.id")
     round: int
+    # Legacy nested lists; new rows use weights_blob (services/fl_tensor_codec.py)
     weights: Optional[Any] = Field(default=None, sa_column=Column(JSON))
+    weights_blob: Optional[bytes] = Field(default=None, sa_column=Column(LargeBinary, nullable=True))
     dataset_size: int = Field(default=0)
+    # Wire encoding (services/fl_update_codec.py) and dense float32 size / encoded size
+    encoding: str = Field(default="dense", max_length=16)
+    # Sent as a difference from the round's global model
+    is_delta: bool = Field(default=False)
+    compression_ratio: Optional[float] = None
     storage_key: Optional[str] = None
     created_at: datetime = Field(default_factory=datetime.utcnow)
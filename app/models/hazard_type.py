@@ -0,0 +1,22 @@
+from typing import Optional
+from datetime import datetime
+from enum import Enum
+from sqlmodel import SQLModel, Field
+from sqlalchemy import Column, Enum as SAEnum
+
+
+class RiskLevel(str, Enum):
+    UNKNOWN = "UNKNOWN"
+    LOW = "LOW"
+    MEDIUM = "MEDIUM"
+    HIGH = "HIGH"
+    CRITICAL = "CRITICAL"
+
+
+class HazardType(SQLModel, table=True):
+    """Canonical hazard category; AssessmentHazard.hazard_type keeps the raw Gemini label."""
+    id: Optional[int] = Field(default=None, primary_key=True)
+    slug: str = Field(max_length=64, unique=True, index=True)
+    name: str
+    default_risk: RiskLevel = Field(sa_column=Column(SAEnum(RiskLevel), default=RiskLevel.MEDIUM))
+    created_at: datetime = Field(default_factory=datetime.utcnow)
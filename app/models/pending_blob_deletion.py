@@ -0,0 +1,10 @@
+from datetime import datetime
+from sqlmodel import SQLModel, Field
+
+
+class PendingBlobDeletion(SQLModel, table=True):
+    """Blob whose last document was deleted; services/blob_gc.py removes it after a grace period."""
+    __tablename__ = "pending_blob_deletion"
+
+    sha256: str = Field(primary_key=True, max_length=64)
+    queued_at: datetime = Field(default_factory=datetime.utcnow, index=True)
@@ -0,0 +1,11 @@
+from typing import Optional, Dict, Any
+from datetime import datetime
+from sqlmodel import SQLModel, Field
+from sqlalchemy import JSON, Column
+
+
+class PortfolioSnapshot(SQLModel, table=True):
+    """Latest precomputed government dashboard metrics (a single row, id=1)."""
+    id: Optional[int] = Field(default=None, primary_key=True)
+    metrics: Dict[str, Any] = Field(default_factory=dict, sa_column=Column(JSON, nullable=False))
+    computed_at: datetime = Field(default_factory=datetime.utcnow)
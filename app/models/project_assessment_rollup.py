@@ -0,0 +1,19 @@
+from typing import Optional
+from datetime import datetime
+from sqlmodel import SQLModel, Field
+
+
+class ProjectAssessmentRollup(SQLModel, table=True):
+    """
+    Running assessment totals per project, bumped in the same transaction
+    as each AssessmentResult insert (see assessment_service.save_assessment).
+    """
+    project_id: int = Field(foreign_key="project.id", primary_key=True)
+    assessment_count: int = Field(default=0, nullable=False)
+    score_sum: float = Field(default=0.0, nullable=False)
+    # Assessments with a score; the average score is score_sum / score_count
+    score_count: int = Field(default=0, nullable=False)
+    critical_count: int = Field(default=0, nullable=False)
+    compliant_count: int = Field(default=0, nullable=False)
+    last_assessed_at: Optional[datetime] = None
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
@@ -1,17 +1,29 @@
 from typing import Optional
 from datetime import datetime
-from sqlmodel import LargeBinary, SQLModel, Field, Relationship
+from sqlalchemy import Column, Index, LargeBinary
+from sqlmodel import SQLModel, Field, Relationship
 
 
 class ProjectDocument(SQLModel, table=True):
+    # Serves keyset-paginated listings ordered by (created_at, id) per project
+    __table_args__ = (
+        Index("ix_projectdocument_project_created", "project_id", "created_at", "id"),
+    )
+
     id: Optional[int] = Field(default=None, primary_key=True)
     project_id: int = Field(foreign_key="project.id")
     type: str
     filename: str
 
-    content: bytes = Field(sa_column=LargeBinary)
+    # Legacy inline bytes; new documents live in the blob store (see migrate_document_blobs.py)
+    content: Optional[bytes] = Field(default=None, sa_column=Column(LargeBinary, nullable=True))
     content_type: Optional[str]
 
+    content_sha256: Optional[str] = Field(default=None, max_length=64, index=True)
+    size_bytes: Optional[int] = None
+    # At-rest compression applied by the blob store (None = stored raw)
+    stored_size: Optional[int] = None
+    compression: Optional[str] = Field(default=None, max_length=16)
 
     storage_key: Optional[str] = None
     created_at: datetime = Field(default_factory=datetime.utcnow)
@@ -0,0 +1,27 @@
+from typing import Optional
+from datetime import datetime
+from sqlalchemy import Column, Index, Text, UniqueConstraint
+from sqlmodel import SQLModel, Field
+
+
+class SearchEntry(SQLModel, table=True):
+    """
+    One searchable record per source row (document, transcript, research
+    log, assessment, hazard). On Postgres the migration adds a generated
+    `tsv` tsvector column with a GIN index; it is intentionally not mapped
+    here so the model also works on databases without tsvector.
+    """
+    __tablename__ = "search_entry"
+    __table_args__ = (
+        UniqueConstraint("source_type", "source_id", name="uq_search_entry_source"),
+        Index("ix_search_entry_project_created", "project_id", "created_at"),
+    )
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    project_id: Optional[int] = Field(default=None, foreign_key="project.id")
+    source_type: str = Field(max_length=32)
+    source_id: int
+    title: Optional[str] = None
+    body: str = Field(default="", sa_column=Column(Text, nullable=False, server_default=""))
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
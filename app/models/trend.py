@@ -0,0 +1,27 @@
+from typing import Optional
+from datetime import datetime
+from sqlmodel import SQLModel, Field
+from sqlalchemy import Index
+
+
+class TrendPoint(SQLModel, table=True):
+    """Raw trend sample as logged through /assessments/trends/log."""
+    __table_args__ = (Index("ix_trendpoint_project_metric_ts", "project_id", "metric", "ts"),)
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    project_id: int = Field(foreign_key="project.id")
+    metric: str = Field(max_length=64)
+    ts: datetime
+    value: float
+
+
+class TrendRollup(SQLModel, table=True):
+    """Per-bucket aggregates at 1m / 1h / 1d, maintained as points are flushed."""
+    project_id: int = Field(foreign_key="project.id", primary_key=True)
+    metric: str = Field(max_length=64, primary_key=True)
+    resolution: str = Field(max_length=4, primary_key=True)
+    bucket: datetime = Field(primary_key=True)
+    count: int = 0
+    sum: float = 0.0
+    min: float
+    max: float
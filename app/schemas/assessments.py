@@ -1,5 +1,6 @@
 from typing import List, Optional, Any, Dict
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
+from datetime import datetime
 
 
 class AnalyzeRequest(BaseModel):
@@ -19,7 +20,7 @@ class ArchiveRequest(BaseModel):
 
 class TrendLogRequest(BaseModel):
     project_id: int
-    metric: str
+    metric: str = Field(..., min_length=1, max_length=64)
     value: float
     timestamp: Optional[str] = None
 
@@ -47,3 +48,21 @@ class AssessmentRead(BaseModel):
 class AssessmentResponse(BaseModel):
     assessment: AssessmentRead
     hazards: List[HazardSchema]
+
+
+class AssessmentHistoryItem(BaseModel):
+    id: int
+    project_id: int
+    score: float
+    notes: Optional[str]
+    image_path: Optional[str]
+    critical: Optional[bool]
+    compliant: Optional[bool]
+    hazard_count: int
+    created_at: datetime
+    gemini_response: Optional[Dict] = None
+
+
+class AssessmentHistoryPage(BaseModel):
+    items: List[AssessmentHistoryItem]
+    next_cursor: Optional[str] = None
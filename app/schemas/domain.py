@@ -133,6 +133,9 @@ class DocumentRead(BaseModel):
     filename: str
     content_type: Optional[str]
     storage_key: Optional[str] 
+    content_sha256: Optional[str] = None
+    size_bytes: Optional[int] = None
+    created_at: Optional[datetime] = None
     class Config:
         from_attributes = True
 
@@ -165,3 +168,6 @@ class ProjectDocumentsWithOwnershipRead(BaseModel):
 
 
     documents: List[DocumentRead]
+
+
+    next_cursor: Optional[str] = None
@@ -1,5 +1,5 @@
 from typing import Optional, List, Any, Dict
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 from datetime import datetime
 
 
@@ -14,9 +14,30 @@ class FLExperimentRead(BaseModel):
     name: str
     params: Optional[Dict[str, Any]] = None
     results: Optional[Dict[str, Any]] = None
+    current_round: Optional[int] = None
+    round_state: Optional[str] = None
     created_at: datetime
 
 
+class FLRoundEventRead(BaseModel):
+    id: int
+    round: int
+    event: str
+    details: Optional[Dict[str, Any]] = None
+    created_at: datetime
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class FLRoundEventPage(BaseModel):
+    experiment_id: int
+    round: int
+    round_state: str
+    items: List[FLRoundEventRead]
+    has_more: bool
+    next_cursor: Optional[str] = None
+
+
 class JoinExperimentRequest(BaseModel):
     experiment_id: int
 
@@ -30,6 +51,12 @@ class JoinExperimentResponse(BaseModel):
 class WeightsUploadRequest(BaseModel):
     experiment_id: int
     weights: Optional[Dict[str, Any]] = None
+    # dense | fp16 | int8 | topk, see GET /fl/experiments/{id}/encodings
+    encoding: str = "dense"
+    # Upload only the difference from the round's global model; base_checksum
+    # (from GET /fl/experiments/{id}/global-model) is required for deltas and topk
+    delta: bool = False
+    base_checksum: Optional[str] = None
     storage_key: Optional[str] = None
 
 
@@ -37,9 +64,20 @@ class WeightsUploadResponse(BaseModel):
     upload_id: int
     experiment_id: int
     uploader_id: Optional[int]
+    encoding: str = "dense"
+    compression_ratio: Optional[float] = None
     created_at: datetime
 
 
+class EncodingNegotiation(BaseModel):
+    experiment_id: int
+    encoding: str
+    supported: List[str]
+    topk_ratio: float
+    round: int
+    base_checksum: Optional[str] = None
+
+
 class AggregationStatus(BaseModel):
     experiment_id: int
     aggregated: bool
@@ -96,6 +134,26 @@ class EnvoyTrainRequest(BaseModel):
     lr: float = 0.01
 
 
+class FLTrainingJobRead(BaseModel):
+    id: int
+    experiment_id: int
+    participant_id: int
+    project_id: int
+    status: str
+    error: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class FLTrainingJobResult(BaseModel):
+    job_id: int
+    status: str
+    result: Dict[str, Any]
+
+
 
 
 # -------------------------
@@ -0,0 +1,20 @@
+from typing import Optional, List
+from pydantic import BaseModel
+from datetime import datetime
+
+
+class SearchHit(BaseModel):
+    id: int
+    project_id: Optional[int]
+    source_type: str
+    source_id: int
+    title: Optional[str]
+    snippet: str
+    rank: float
+    created_at: datetime
+
+
+class SearchResults(BaseModel):
+    query: str
+    results: List[SearchHit]
+    next_cursor: Optional[str] = None
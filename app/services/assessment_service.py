@@ -0,0 +1,319 @@
+# app/services/assessment_service.py
+
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import case, delete, func, select, tuple_
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.pagination import clamp_limit, decode_cursor, encode_cursor
+from app.models.assessment_hazard import AssessmentHazard
+from app.models.assessment_result import AssessmentResult
+from app.models.project_assessment_rollup import ProjectAssessmentRollup
+from app.models.hazard_type import HazardType, RiskLevel
+from app.services.gemini_classifier import extract_gemini_text, get_matcher
+from app.services.hazard_taxonomy import canonical_risk, canonical_type, resolve_type_ids, type_names
+from app.services.search_service import index_assessment
+
+
+async def save_assessment(
+    session: AsyncSession,
+    assessment: AssessmentResult,
+    hazards: Iterable[Dict[str, Any]] = (),
+) -> List[AssessmentHazard]:
+    """
+    Persist an assessment with its hazards in one transaction, keeping the
+    project rollup and the search index in step. `hazards` are the parsed
+    dicts (hazard_type, location, risk_level, recommendations).
+    """
+    classify_assessment(assessment)
+    session.add(assessment)
+    await session.flush()
+
+    hazards = list(hazards)
+    slugs = [canonical_type(h["hazard_type"]) for h in hazards]
+    type_ids = await resolve_type_ids(session, slugs) if hazards else {}
+
+    rows = [
+        AssessmentHazard(
+            assessment_id=assessment.id,
+            project_id=assessment.project_id,
+            hazard_type=h["hazard_type"],
+            hazard_type_id=type_ids.get(slug),
+            location=h["location"],
+            risk_level=h["risk_level"],
+            risk=canonical_risk(h["risk_level"], slug, h["hazard_type"]),
+            recommendations=h["recommendations"],
+        )
+        for h, slug in zip(hazards, slugs)
+    ]
+    session.add_all(rows)
+    await session.flush()
+
+    await bump_rollup(session, assessment)
+    await index_assessment(session, assessment, rows)
+
+    await session.commit()
+    await session.refresh(assessment)
+    return rows
+
+
+def classify_assessment(assessment: AssessmentResult) -> None:
+    """Set the critical/compliant labels from the Gemini text (once, at ingest)."""
+    matcher = get_matcher()
+    labels = matcher.classify(extract_gemini_text(assessment.gemini_response))
+    assessment.critical = labels["critical"]
+    assessment.compliant = labels["compliant"]
+    assessment.classifier_version = matcher.version
+
+
+async def bump_rollup(session: AsyncSession, assessment: AssessmentResult) -> None:
+    """
+    Add one assessment to its project's rollup with a single upsert, so
+    concurrent inserts for the same project never lose an increment.
+    """
+    critical = int(bool(assessment.critical))
+    compliant = int(bool(assessment.compliant))
+    assessed_at = assessment.created_at or datetime.utcnow()
+
+    stmt = insert(ProjectAssessmentRollup).values(
+        project_id=assessment.project_id,
+        assessment_count=1,
+        score_sum=assessment.score or 0.0,
+        score_count=int(assessment.score is not None),
+        critical_count=critical,
+        compliant_count=compliant,
+        last_assessed_at=assessed_at,
+        updated_at=datetime.utcnow(),
+    )
+    table = ProjectAssessmentRollup.__table__
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.c.project_id],
+        set_={
+            "assessment_count": table.c.assessment_count + 1,
+            "score_sum": table.c.score_sum + stmt.excluded.score_sum,
+            "score_count": table.c.score_count + stmt.excluded.score_count,
+            "critical_count": table.c.critical_count + stmt.excluded.critical_count,
+            "compliant_count": table.c.compliant_count + stmt.excluded.compliant_count,
+            "last_assessed_at": func.greatest(func.coalesce(table.c.last_assessed_at, stmt.excluded.last_assessed_at), stmt.excluded.last_assessed_at),
+            "updated_at": stmt.excluded.updated_at,
+        },
+    )
+    await session.execute(stmt)
+
+
+async def rebuild_rollups(session: AsyncSession, project_ids: Optional[List[int]] = None) -> int:
+    """
+    Recompute rollup rows from the stored labels with one INSERT ... SELECT
+    (no rows leave the database). Does not commit. Returns projects written.
+    """
+    clear = delete(ProjectAssessmentRollup)
+    totals = select(
+        AssessmentResult.project_id,
+        func.count(AssessmentResult.id),
+        func.coalesce(func.sum(AssessmentResult.score), 0.0),
+        func.count(AssessmentResult.score),
+        func.count(case((AssessmentResult.critical.is_(True), 1))),
+        func.count(case((AssessmentResult.compliant.is_(True), 1))),
+        func.max(AssessmentResult.created_at),
+        func.now(),
+    ).group_by(AssessmentResult.project_id)
+    if project_ids is not None:
+        clear = clear.where(ProjectAssessmentRollup.project_id.in_(project_ids))
+        totals = totals.where(AssessmentResult.project_id.in_(project_ids))
+
+    await session.execute(clear)
+    result = await session.execute(
+        insert(ProjectAssessmentRollup).from_select(
+            ["project_id", "assessment_count", "score_sum", "score_count", "critical_count", "compliant_count", "last_assessed_at", "updated_at"],
+            totals,
+        )
+    )
+    return result.rowcount
+
+
+async def get_rollup(session: AsyncSession, project_id: int) -> Optional[ProjectAssessmentRollup]:
+    return await session.get(ProjectAssessmentRollup, project_id)
+
+
+async def assessment_summary(session: AsyncSession, project_id: int) -> Dict[str, Any]:
+    """Count, score statistics and latest assessment time, computed in SQL."""
+    row = (await session.execute(
+        select(
+            func.count(AssessmentResult.id),
+            func.avg(AssessmentResult.score),
+            func.min(AssessmentResult.score),
+            func.max(AssessmentResult.score),
+            func.max(AssessmentResult.created_at),
+        ).where(AssessmentResult.project_id == project_id)
+    )).one()
+    total, avg_score, min_score, max_score, last_assessed_at = row
+    return {
+        "total_assessments": total,
+        "average_score": float(avg_score) if avg_score is not None else None,
+        "min_score": min_score,
+        "max_score": max_score,
+        "last_assessed_at": last_assessed_at,
+    }
+
+
+async def hazard_breakdown(session: AsyncSession, project_id: int) -> List[Dict[str, Any]]:
+    """Hazard counts grouped by canonical type and risk for a project."""
+    count = func.count(AssessmentHazard.id)
+    rows = (await session.execute(
+        select(HazardType.slug, HazardType.name, AssessmentHazard.risk, count)
+        .join(HazardType, AssessmentHazard.hazard_type_id == HazardType.id, isouter=True)
+        .where(AssessmentHazard.project_id == project_id)
+        .group_by(HazardType.slug, HazardType.name, AssessmentHazard.risk)
+        .order_by(count.desc(), HazardType.slug)
+    )).all()
+    return [
+        {"hazard_type": slug, "hazard_name": name, "risk_level": risk.value if risk else None, "count": c}
+        for slug, name, risk, c in rows
+    ]
+
+
+async def hazard_heatmap(
+    session: AsyncSession,
+    project_ids: Optional[List[int]] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    by_project: bool = False,
+) -> List[Dict[str, Any]]:
+    """
+    Hazard counts per (type, risk[, project]) across the portfolio. Grouped
+    on the integer/enum columns only, so it is answered from the
+    (hazard_type_id, risk, created_at) / (project_id, ...) indexes.
+    """
+    keys = [AssessmentHazard.hazard_type_id, AssessmentHazard.risk]
+    if by_project:
+        keys.insert(0, AssessmentHazard.project_id)
+    stmt = select(*keys, func.count(AssessmentHazard.id)).group_by(*keys)
+    if project_ids is not None:
+        stmt = stmt.where(AssessmentHazard.project_id.in_(project_ids))
+    if since:
+        stmt = stmt.where(AssessmentHazard.created_at >= since)
+    if until:
+        stmt = stmt.where(AssessmentHazard.created_at < until)
+
+    names = await type_names(session)
+    cells = []
+    for row in (await session.execute(stmt)).all():
+        *group, count = row
+        project_id = group.pop(0) if by_project else None
+        type_id, risk = group
+        slug, name = names.get(type_id, (None, None))
+        cell = {"hazard_type": slug, "hazard_name": name, "risk_level": (risk or RiskLevel.UNKNOWN).value, "count": count}
+        if by_project:
+            cell["project_id"] = project_id
+        cells.append(cell)
+    cells.sort(key=lambda c: -c["count"])
+    return cells
+
+
+async def list_assessment_notes(session: AsyncSession, project_id: int, cursor: Optional[str] = None, limit: Optional[int] = None) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """
+    Keyset-paginated notes, newest first. Only the `text` field is pulled out
+    of gemini_response, so the rest of the JSON never leaves the database.
+    """
+    limit = clamp_limit(limit)
+    stmt = select(
+        AssessmentResult.id,
+        AssessmentResult.score,
+        AssessmentResult.notes,
+        AssessmentResult.gemini_response["text"].as_string().label("text"),
+        AssessmentResult.image_path.label("file"),
+        AssessmentResult.created_at,
+    ).where(AssessmentResult.project_id == project_id)
+
+    after = decode_cursor(cursor, datetime, int)
+    if after:
+        stmt = stmt.where(tuple_(AssessmentResult.created_at, AssessmentResult.id) < tuple_(*after))
+
+    stmt = stmt.order_by(AssessmentResult.created_at.desc(), AssessmentResult.id.desc()).limit(limit + 1)
+    rows = [dict(r) for r in (await session.execute(stmt)).mappings().all()]
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1]["created_at"], rows[-1]["id"])
+    return rows, next_cursor
+
+
+# Lean column set for history listings; gemini_response is opt-in
+HISTORY_COLUMNS = (
+    AssessmentResult.id,
+    AssessmentResult.project_id,
+    AssessmentResult.score,
+    AssessmentResult.notes,
+    AssessmentResult.image_path,
+    AssessmentResult.critical,
+    AssessmentResult.compliant,
+    AssessmentResult.created_at,
+)
+
+
+async def list_assessment_history(
+    session: AsyncSession,
+    project_ids: Optional[List[int]] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    min_score: Optional[float] = None,
+    max_score: Optional[float] = None,
+    hazard_types: Optional[List[str]] = None,
+    include_gemini_response: bool = False,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = None,
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """
+    Keyset-paginated assessment history, newest first on (created_at, id).
+    `project_ids=None` covers every project. `hazard_types` are taxonomy
+    slugs; an assessment matches if it has a hazard of any of them.
+    """
+    limit = clamp_limit(limit)
+    if project_ids is not None and not project_ids:
+        return [], None
+
+    hazard_count = (
+        select(func.count(AssessmentHazard.id))
+        .where(AssessmentHazard.assessment_id == AssessmentResult.id)
+        .correlate(AssessmentResult)
+        .scalar_subquery()
+        .label("hazard_count")
+    )
+    columns = [*HISTORY_COLUMNS, hazard_count]
+    if include_gemini_response:
+        columns.append(AssessmentResult.gemini_response)
+
+    stmt = select(*columns)
+    if project_ids is not None:
+        stmt = stmt.where(AssessmentResult.project_id.in_(project_ids))
+    if start:
+        stmt = stmt.where(AssessmentResult.created_at >= start)
+    if end:
+        stmt = stmt.where(AssessmentResult.created_at < end)
+    if min_score is not None:
+        stmt = stmt.where(AssessmentResult.score >= min_score)
+    if max_score is not None:
+        stmt = stmt.where(AssessmentResult.score <= max_score)
+    if hazard_types:
+        stmt = stmt.where(
+            select(AssessmentHazard.id)
+            .join(HazardType, AssessmentHazard.hazard_type_id == HazardType.id)
+            .where(AssessmentHazard.assessment_id == AssessmentResult.id, HazardType.slug.in_(hazard_types))
+            .exists()
+        )
+
+    after = decode_cursor(cursor, datetime, int)
+    if after:
+        stmt = stmt.where(tuple_(AssessmentResult.created_at, AssessmentResult.id) < tuple_(*after))
+
+    stmt = stmt.order_by(AssessmentResult.created_at.desc(), AssessmentResult.id.desc()).limit(limit + 1)
+    rows = [dict(r) for r in (await session.execute(stmt)).mappings().all()]
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1]["created_at"], rows[-1]["id"])
+    return rows, next_cursor
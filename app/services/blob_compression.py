@@ -0,0 +1,79 @@
+# app/services/blob_compression.py
+
+import gzip
+import os
+import shutil
+import struct
+from typing import BinaryIO, Optional
+
+try:
+    import zstandard
+except ImportError:  # optional: fall back to gzip
+    zstandard = None
+
+
+COMPRESSIBLE_TYPES = {
+    "application/json",
+    "application/xml",
+    "application/csv",
+    "application/rtf",
+    "application/x-yaml",
+    "application/msword",
+    "application/vnd.ms-excel",
+    "application/sql",
+}
+
+# Suffix on the blob file name -> codec; raw blobs have no suffix
+CODEC_SUFFIXES = {"zstd": ".zst", "gzip": ".gz"}
+
+# Keep the compressed copy only if it is at least this much smaller
+MIN_SAVINGS_RATIO = 0.1
+
+
+def choose_codec(content_type: Optional[str]) -> Optional[str]:
+    """
+    Pick a codec for text-heavy content (specs, BoQs, CSV/JSON exports).
+    Already-compressed formats (PDF, DOCX, images, video) are stored raw.
+    """
+    if not content_type:
+        return None
+    base = content_type.split(";", 1)[0].strip().lower()
+    if not (base.startswith("text/") or base in COMPRESSIBLE_TYPES or base.endswith("+json") or base.endswith("+xml")):
+        return None
+    return "zstd" if zstandard is not None else "gzip"
+
+
+def compress_file(src_path: str, dst_path: str, codec: str, size: int) -> int:
+    """Compress src into dst with the given codec; returns the compressed size."""
+    with open(src_path, "rb") as src, open(dst_path, "wb") as dst:
+        if codec == "zstd":
+            cctx = zstandard.ZstdCompressor(level=10, write_content_size=True)
+            cctx.copy_stream(src, dst, size=size)
+        else:
+            with gzip.GzipFile(fileobj=dst, mode="wb", compresslevel=6, mtime=0) as gz:
+                shutil.copyfileobj(src, gz)
+        return dst.tell()
+
+
+def open_decompressed(path: str, codec: Optional[str]) -> BinaryIO:
+    """Open a blob file as a readable stream of the original bytes."""
+    if codec is None:
+        return open(path, "rb")
+    if codec == "zstd":
+        if zstandard is None:
+            raise RuntimeError("zstandard is required to read zstd-compressed blobs")
+        return zstandard.ZstdDecompressor().stream_reader(open(path, "rb"), closefd=True)
+    return gzip.open(path, "rb")
+
+
+def original_size(path: str, codec: Optional[str]) -> int:
+    """Uncompressed size read from the frame header / gzip trailer."""
+    if codec is None:
+        return os.path.getsize(path)
+    if codec == "zstd":
+        with open(path, "rb") as f:
+            return zstandard.frame_content_size(f.read(18))
+    with open(path, "rb") as f:
+        # ISIZE trailer is mod 2**32, which is fine below MAX_FILE_SIZE
+        f.seek(-4, 2)
+        return struct.unpack("<I", f.read(4))[0]
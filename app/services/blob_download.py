@@ -0,0 +1,123 @@
+# app/services/blob_download.py
+
+from typing import Optional, Tuple
+from urllib.parse import quote
+
+from fastapi import HTTPException, Request, Response
+from fastapi.responses import StreamingResponse
+
+from app.services.blob_store import LocalBlobStore
+
+
+def parse_range_header(header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """
+    Parse a single `Range: bytes=...` header into an inclusive (start, end).
+
+    Returns None when the whole body should be sent (no header, a
+    non-bytes unit or a multi-range request, which we answer with 200).
+    Raises 416 when the range cannot be satisfied.
+    """
+    if not header or not header.startswith("bytes="):
+        return None
+
+    spec = header[len("bytes="):].strip()
+    if "," in spec:
+        return None
+
+    start_s, sep, end_s = spec.partition("-")
+    if not sep:
+        return None
+
+    try:
+        if not start_s:
+            # Suffix range: last N bytes
+            length = int(end_s)
+            if length <= 0:
+                raise _unsatisfiable(size)
+            return max(size - length, 0), size - 1
+
+        start = int(start_s)
+        end = int(end_s) if end_s else size - 1
+    except ValueError:
+        return None
+
+    if start >= size or start > end:
+        raise _unsatisfiable(size)
+    return start, min(end, size - 1)
+
+
+def etag_matches(header: Optional[str], etag: str) -> bool:
+    """Weak comparison for If-None-Match (RFC 9110 13.1.2)."""
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    opaque = etag[2:] if etag.startswith("W/") else etag
+    for candidate in header.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == opaque:
+            return True
+    return False
+
+
+def build_blob_response(
+    request: Request,
+    store: LocalBlobStore,
+    sha256: str,
+    size: Optional[int],
+    media_type: Optional[str],
+    filename: Optional[str] = None,
+) -> Response:
+    """
+    Stream a blob with a strong ETag (its SHA-256), If-None-Match 304s and
+    single-range 206 responses so video players can seek without the app
+    ever buffering the whole file.
+    """
+    if not store.exists(sha256):
+        raise HTTPException(status_code=404, detail="Content not found")
+    if size is None:
+        size = store.stat(sha256).size
+
+    etag = f'"{sha256}"'
+    headers = {
+        "ETag": etag,
+        "Accept-Ranges": "bytes",
+        "Cache-Control": "private, max-age=0, must-revalidate",
+    }
+    if filename:
+        headers["Content-Disposition"] = f"attachment; filename*=UTF-8''{quote(filename)}"
+
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+
+    byte_range = parse_range_header(request.headers.get("range"), size)
+
+    # If-Range: only honour the range when the client's copy is current
+    if_range = request.headers.get("if-range")
+    if byte_range and if_range and if_range.strip() != etag:
+        byte_range = None
+
+    media_type = media_type or "application/octet-stream"
+    if byte_range is None:
+        headers["Content-Length"] = str(size)
+        return StreamingResponse(store.iter_chunks(sha256), media_type=media_type, headers=headers)
+
+    start, end = byte_range
+    headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+    headers["Content-Length"] = str(end - start + 1)
+    return StreamingResponse(
+        store.iter_chunks(sha256, start, end),
+        status_code=206,
+        media_type=media_type,
+        headers=headers,
+    )
+
+
+def _unsatisfiable(size: int) -> HTTPException:
+    return HTTPException(
+        status_code=416,
+        detail="Requested range not satisfiable",
+        headers={"Content-Range": f"bytes */{size}"},
+    )
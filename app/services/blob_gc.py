@@ -0,0 +1,70 @@
+# app/services/blob_gc.py
+
+"""
+Deferred blob deletion. Deleting a document only queues its sha256; the
+periodic sweep (app.main) removes the file once the queue entry is older
+than BLOB_GC_GRACE_SECONDS, no document references the content, and no
+upload has written or deduplicated against it within the grace period.
+Deleting inline would race uploads of the same content whose row isn't
+committed yet.
+"""
+
+import asyncio
+import logging
+from datetime import datetime, timedelta
+
+from sqlalchemy import delete, func, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.models.pending_blob_deletion import PendingBlobDeletion
+from app.models.project_document import ProjectDocument
+from app.services.blob_store import get_blob_store
+
+logger = logging.getLogger(__name__)
+
+SWEEP_BATCH_SIZE = 500
+
+
+async def queue_blob_deletion(session: AsyncSession, sha256: str) -> None:
+    """Queue in the caller's transaction; re-queuing restarts the grace period."""
+    stmt = insert(PendingBlobDeletion).values(sha256=sha256, queued_at=datetime.utcnow())
+    await session.execute(
+        stmt.on_conflict_do_update(index_elements=["sha256"], set_={"queued_at": stmt.excluded.queued_at})
+    )
+
+
+async def sweep_orphan_blobs() -> int:
+    grace = settings.BLOB_GC_GRACE_SECONDS
+    cutoff = datetime.utcnow() - timedelta(seconds=grace)
+    store = get_blob_store()
+    deleted = 0
+
+    async with AsyncSessionLocal() as session:
+        candidates = (await session.execute(
+            select(PendingBlobDeletion.sha256)
+            .where(PendingBlobDeletion.queued_at < cutoff)
+            .order_by(PendingBlobDeletion.queued_at)
+            .limit(SWEEP_BATCH_SIZE)
+        )).scalars().all()
+
+        for sha256 in candidates:
+            refs = (await session.execute(
+                select(func.count()).select_from(ProjectDocument).where(ProjectDocument.content_sha256 == sha256)
+            )).scalar_one()
+            if refs == 0:
+                if not await asyncio.to_thread(store.delete_if_idle, sha256, grace):
+                    # Uploaded again within the grace period: check back once it has passed
+                    await queue_blob_deletion(session, sha256)
+                    await session.commit()
+                    continue
+                deleted += 1
+            # Deleted, or referenced again (a later document delete re-queues it)
+            await session.execute(delete(PendingBlobDeletion).where(PendingBlobDeletion.sha256 == sha256))
+            await session.commit()
+
+    if deleted:
+        logger.info("Deleted unreferenced blobs | count=%s", deleted)
+    return deleted
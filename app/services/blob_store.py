@@ -0,0 +1,262 @@
+# app/services/blob_store.py
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import time
+from functools import lru_cache
+from pathlib import Path
+from typing import BinaryIO, Iterator, NamedTuple, Optional, Tuple
+
+from app.core.config import settings
+from app.services.blob_compression import (
+    CODEC_SUFFIXES,
+    MIN_SAVINGS_RATIO,
+    choose_codec,
+    compress_file,
+    open_decompressed,
+    original_size,
+)
+
+logger = logging.getLogger(__name__)
+
+
+BLOB_READ_CHUNK_SIZE = 1024 * 1024
+
+
+class BlobRef(NamedTuple):
+    sha256: str
+    size: int
+    stored_size: Optional[int] = None
+    codec: Optional[str] = None
+
+
+class BlobWriter:
+    """
+    Incrementally hashes and spools bytes to a temp file inside the store,
+    so uploads never have to be held in memory. `commit()` moves the file
+    into its content-addressed location (or drops it if the blob exists).
+    """
+
+    def __init__(self, store: "LocalBlobStore", content_type: Optional[str] = None):
+        self._store = store
+        self._codec = choose_codec(content_type)
+        self._hash = hashlib.sha256()
+        self._size = 0
+        fd, self._tmp_path = tempfile.mkstemp(dir=store.tmp_dir)
+        self._file = os.fdopen(fd, "wb")
+
+    def write(self, chunk: bytes) -> None:
+        self._hash.update(chunk)
+        self._size += len(chunk)
+        self._file.write(chunk)
+
+    def commit(self) -> BlobRef:
+        self._file.close()
+        return self._store._adopt(self._tmp_path, self._hash.hexdigest(), self._size, self._codec)
+
+    def abort(self) -> None:
+        self._file.close()
+        if os.path.exists(self._tmp_path):
+            os.remove(self._tmp_path)
+
+
+class LocalBlobStore:
+    """
+    Content-addressable blob store on the local filesystem.
+
+    Blobs live at <root>/<sha[:2]>/<sha[2:4]>/<sha>, so identical files
+    uploaded to different projects are stored once. Writes go through a
+    temp file and an atomic rename; readers never see partial blobs.
+
+    Text-heavy content is compressed at rest (<sha>.zst / <sha>.gz, see
+    blob_compression.choose_codec). The address is always the hash of the
+    original bytes and every read path decompresses transparently.
+    """
+
+    def __init__(self, root: str):
+        self.root = Path(root)
+        self.tmp_dir = self.root / "tmp"
+        self.tmp_dir.mkdir(parents=True, exist_ok=True)
+        self.keys_dir = self.root / "keys"
+        self.keys_dir.mkdir(parents=True, exist_ok=True)
+
+    def path(self, sha256: str) -> Path:
+        """Path of the raw (uncompressed) blob file."""
+        return self.root / sha256[:2] / sha256[2:4] / sha256
+
+    def locate(self, sha256: str) -> Optional[Tuple[Path, Optional[str]]]:
+        """Return (file path, codec) of the stored blob, or None if missing."""
+        raw = self.path(sha256)
+        if raw.exists():
+            return raw, None
+        for codec, suffix in CODEC_SUFFIXES.items():
+            candidate = raw.with_name(raw.name + suffix)
+            if candidate.exists():
+                return candidate, codec
+        return None
+
+    def exists(self, sha256: str) -> bool:
+        return self.locate(sha256) is not None
+
+    def stat(self, sha256: str) -> BlobRef:
+        found = self.locate(sha256)
+        if found is None:
+            raise FileNotFoundError(sha256)
+        path, codec = found
+        return BlobRef(sha256, original_size(str(path), codec), path.stat().st_size, codec)
+
+    def writer(self, content_type: Optional[str] = None) -> BlobWriter:
+        return BlobWriter(self, content_type)
+
+    def put_bytes(self, data: bytes, content_type: Optional[str] = None) -> BlobRef:
+        writer = self.writer(content_type)
+        try:
+            writer.write(data)
+            return writer.commit()
+        except Exception:
+            writer.abort()
+            raise
+
+    def open(self, sha256: str) -> BinaryIO:
+        found = self.locate(sha256)
+        if found is None:
+            raise FileNotFoundError(sha256)
+        path, codec = found
+        return open_decompressed(str(path), codec)
+
+    def read_bytes(self, sha256: str) -> bytes:
+        with self.open(sha256) as f:
+            return f.read()
+
+    def export(self, sha256: str) -> str:
+        """Decompress a blob into a temp file inside the store; the caller removes it."""
+        fd, tmp_path = tempfile.mkstemp(dir=self.tmp_dir)
+        try:
+            with os.fdopen(fd, "wb") as out, self.open(sha256) as f:
+                while True:
+                    chunk = f.read(BLOB_READ_CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    out.write(chunk)
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+        return tmp_path
+
+    def iter_chunks(
+        self,
+        sha256: str,
+        start: int = 0,
+        end: Optional[int] = None,
+        chunk_size: int = BLOB_READ_CHUNK_SIZE,
+    ) -> Iterator[bytes]:
+        """Yield the original bytes in [start, end] (inclusive) in chunks."""
+        with self.open(sha256) as f:
+            if start:
+                # Forward seek; decompressing readers skip by decoding
+                f.seek(start)
+            remaining = None if end is None else end - start + 1
+            while remaining is None or remaining > 0:
+                chunk = f.read(chunk_size if remaining is None else min(chunk_size, remaining))
+                if not chunk:
+                    break
+                if remaining is not None:
+                    remaining -= len(chunk)
+                yield chunk
+
+    def delete_if_idle(self, sha256: str, idle_seconds: float) -> bool:
+        """
+        Delete the blob unless it was written or deduplicated against in the
+        last `idle_seconds` (_adopt touches it). Each file is first moved
+        out of its address, so an upload racing the sweep either touched it
+        before the move (and it is put back) or stores its own copy.
+        Returns False if the blob was kept.
+        """
+        raw = self.path(sha256)
+        kept = False
+        for path in [raw] + [raw.with_name(raw.name + suffix) for suffix in CODEC_SUFFIXES.values()]:
+            fd, grave = tempfile.mkstemp(dir=self.tmp_dir)
+            os.close(fd)
+            try:
+                os.replace(path, grave)
+            except FileNotFoundError:
+                os.remove(grave)
+                continue
+            if time.time() - os.stat(grave).st_mtime < idle_seconds:
+                if path.exists():
+                    os.remove(grave)
+                else:
+                    os.replace(grave, path)
+                kept = True
+            else:
+                os.remove(grave)
+        return not kept
+
+    def delete(self, sha256: str) -> None:
+        raw = self.path(sha256)
+        for path in [raw] + [raw.with_name(raw.name + suffix) for suffix in CODEC_SUFFIXES.values()]:
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+
+    def bind_key(self, storage_key: str, ref: BlobRef, content_type: Optional[str] = None) -> None:
+        """
+        Record which blob a signed-URL upload landed in, so the API can
+        register the document later without ever touching the bytes.
+        """
+        payload = {**ref._asdict(), "content_type": content_type}
+        fd, tmp_path = tempfile.mkstemp(dir=self.tmp_dir)
+        with os.fdopen(fd, "w") as f:
+            json.dump(payload, f)
+        os.replace(tmp_path, self._key_path(storage_key))
+
+    def resolve_key(self, storage_key: str) -> Optional[dict]:
+        try:
+            return json.loads(self._key_path(storage_key).read_text())
+        except FileNotFoundError:
+            return None
+
+    def _key_path(self, storage_key: str) -> Path:
+        return self.keys_dir / hashlib.sha256(storage_key.encode()).hexdigest()
+
+    def _adopt(self, tmp_path: str, sha256: str, size: int, codec: Optional[str]) -> BlobRef:
+        found = self.locate(sha256)
+        if found is not None:
+            path, found_codec = found
+            try:
+                stored_size = path.stat().st_size
+                # Marks the blob as in use for the GC grace period (delete_if_idle)
+                os.utime(path)
+            except FileNotFoundError:
+                found = None  # swept just now: store this copy instead
+            if found is not None:
+                # Deduplicated: identical content is already stored
+                os.remove(tmp_path)
+                return BlobRef(sha256, size, stored_size, found_codec)
+
+        target = self.path(sha256)
+        target.parent.mkdir(parents=True, exist_ok=True)
+
+        if codec:
+            fd, packed_path = tempfile.mkstemp(dir=self.tmp_dir)
+            os.close(fd)
+            stored_size = compress_file(tmp_path, packed_path, codec, size)
+            if stored_size <= size * (1 - MIN_SAVINGS_RATIO):
+                os.replace(packed_path, target.with_name(target.name + CODEC_SUFFIXES[codec]))
+                os.remove(tmp_path)
+                return BlobRef(sha256, size, stored_size, codec)
+            os.remove(packed_path)
+
+        os.replace(tmp_path, target)
+        return BlobRef(sha256, size, size, None)
+
+
+@lru_cache(maxsize=1)
+def get_blob_store() -> LocalBlobStore:
+    if settings.BLOB_STORE_BACKEND != "local":
+        raise RuntimeError(f"Unsupported blob store backend: {settings.BLOB_STORE_BACKEND}")
+    return LocalBlobStore(settings.BLOB_STORE_DIR)
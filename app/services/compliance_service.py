@@ -5,6 +5,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.tax import TaxSubmission, TaxAudit, TaxStatus
 from app.services.gemini_service import _call_gemini, search_web
+from app.services.portfolio_dashboard import mark_portfolio_dirty
 
 
 async def calculate_tax(session: AsyncSession, project_id: int, reported_amount: float, revenues: Optional[Dict[str, float]] = None, expenses: Optional[Dict[str, float]] = None, tax_rate: float = 0.2, context_query: Optional[str] = None) -> Dict[str, Any]:
@@ -40,6 +41,7 @@ async def persist_submission(session: AsyncSession, project_id: int, reporter_id
         sub.gemini_output = gemini_output
     session.add(sub)
     await session.commit()
+    mark_portfolio_dirty()
     await session.refresh(sub)
     return sub
 
@@ -52,6 +54,7 @@ async def submit_tax(session: AsyncSession, submission_id: int, submitter_id: in
     sub.submitted_at = datetime.utcnow()
     session.add(sub)
     await session.commit()
+    mark_portfolio_dirty()
 
     # Create audit entry using Gemini to summarize and verify
     prompt = (
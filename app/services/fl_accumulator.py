@@ -0,0 +1,171 @@
+# app/services/fl_accumulator.py
+
+"""
+Streaming FedAvg: one running sum(dataset_size * weights) per
+(experiment, round), updated as each upload arrives.
+
+The sum is checkpointed to FLRoundAccumulator in the upload's own
+transaction (under a row lock, so concurrent uploads from several workers
+serialize instead of losing updates). Each worker also keeps the last sum
+it wrote in memory, tagged with the row version, so the common case skips
+decoding the checkpoint. Closing a round is a single division.
+"""
+
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+
+import torch
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.fl_round_accumulator import FLRoundAccumulator
+from app.models.fl_weights_upload import FLWeightsUpload
+from app.services.fl_aggregation import ParameterLayout
+from app.services.fl_tensor_codec import decode_state, encode_state
+
+_CACHE_MAX_ROUNDS = 64
+
+
+class AccumulatorCache:
+    """Per-worker {(experiment_id, round): (version, layout, flat float64 sum)}."""
+
+    def __init__(self, max_rounds: int = _CACHE_MAX_ROUNDS):
+        self.max_rounds = max_rounds
+        self._entries: "OrderedDict[Tuple[int, int], Tuple[int, ParameterLayout, torch.Tensor]]" = OrderedDict()
+
+    def get(self, key: Tuple[int, int], version: int) -> Optional[Tuple[ParameterLayout, torch.Tensor]]:
+        entry = self._entries.get(key)
+        if entry is None or entry[0] != version:
+            return None
+        self._entries.move_to_end(key)
+        return entry[1], entry[2]
+
+    def put(self, key: Tuple[int, int], version: int, layout: ParameterLayout, vector: torch.Tensor) -> None:
+        self._entries[key] = (version, layout, vector)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_rounds:
+            self._entries.popitem(last=False)
+
+    def discard(self, key: Tuple[int, int]) -> None:
+        self._entries.pop(key, None)
+
+
+accumulator_cache = AccumulatorCache()
+
+
+async def _lock_accumulator(session: AsyncSession, experiment_id: int, round_: int) -> FLRoundAccumulator:
+    # Create the row if this is the round's first upload, then lock it
+    await session.execute(
+        insert(FLRoundAccumulator)
+        .values(
+            experiment_id=experiment_id,
+            round=round_,
+            total_samples=0,
+            contributors=0,
+            version=0,
+            updated_at=datetime.utcnow(),
+        )
+        .on_conflict_do_nothing()
+    )
+    return (await session.execute(
+        select(FLRoundAccumulator)
+        .where(FLRoundAccumulator.experiment_id == experiment_id, FLRoundAccumulator.round == round_)
+        .with_for_update()
+        .execution_options(populate_existing=True)
+    )).scalars().one()
+
+
+def _current_sum(acc: FLRoundAccumulator, key: Tuple[int, int]) -> Tuple[Optional[ParameterLayout], Optional[torch.Tensor]]:
+    cached = accumulator_cache.get(key, acc.version)
+    if cached is not None:
+        return cached
+    if not acc.weighted_sum:
+        return None, None
+    state = decode_state(acc.weighted_sum)
+    layout = ParameterLayout.from_state(state)
+    return layout, layout.flatten(state).to(torch.float64)
+
+
+async def accumulate(
+    session: AsyncSession,
+    experiment_id: int,
+    round_: int,
+    layout: ParameterLayout,
+    vector: torch.Tensor,
+    dataset_size: int,
+) -> FLRoundAccumulator:
+    """
+    Fold one upload (a flat vector in `layout`, see fl_update_codec) into
+    its round's running sum. Does not commit; the in-memory copy is only
+    refreshed by `remember` after the caller commits. Raises ValueError
+    when the layout differs from the round's earlier uploads.
+    """
+    if dataset_size <= 0:
+        raise ValueError("dataset_size must be positive")
+    key = (experiment_id, round_)
+
+    acc = await _lock_accumulator(session, experiment_id, round_)
+    if acc.closed_at is not None:
+        raise ValueError("round already aggregated")
+
+    acc_layout, total = _current_sum(acc, key)
+    if acc_layout is None:
+        total = torch.zeros(layout.numel, dtype=torch.float64)
+    elif acc_layout != layout:
+        raise ValueError("weights do not match the global model")
+
+    # New tensor rather than in place, so a rolled back transaction leaves the cache intact
+    total = total + vector.to(torch.float64) * dataset_size
+
+    acc.weighted_sum = encode_state(layout.unflatten(total), dtype="float64")
+    acc.total_samples += dataset_size
+    acc.contributors += 1
+    acc.version += 1
+    acc.updated_at = datetime.utcnow()
+    session.add(acc)
+
+    session.info.setdefault("fl_accumulators", []).append((key, acc.version, layout, total))
+    return acc
+
+
+def remember(session: AsyncSession) -> None:
+    """Cache the sums written by this session; call after a successful commit."""
+    for key, version, layout, total in session.info.pop("fl_accumulators", []):
+        accumulator_cache.put(key, version, layout, total)
+
+
+async def close_round(
+    session: AsyncSession,
+    experiment_id: int,
+    round_: int,
+) -> Optional[Tuple[Dict[str, torch.Tensor], int, int]]:
+    """
+    Normalize and close a round's accumulator. Returns (averaged state,
+    contributors, total_samples), or None for rounds without one (uploaded
+    before streaming aggregation). Does not commit.
+    """
+    key = (experiment_id, round_)
+    acc = (await session.execute(
+        select(FLRoundAccumulator)
+        .where(FLRoundAccumulator.experiment_id == experiment_id, FLRoundAccumulator.round == round_)
+        .with_for_update()
+    )).scalars().first()
+    if acc is None or acc.total_samples <= 0:
+        return None
+
+    layout, total = _current_sum(acc, key)
+    averaged = layout.unflatten((total / acc.total_samples).to(torch.float32))
+
+    acc.closed_at = datetime.utcnow()
+    session.add(acc)
+    accumulator_cache.discard(key)
+    return averaged, acc.contributors, acc.total_samples
+
+
+async def round_upload_count(session: AsyncSession, experiment_id: int, round_: int) -> int:
+    return (await session.execute(
+        select(func.count(FLWeightsUpload.id))
+        .where(FLWeightsUpload.experiment_id == experiment_id, FLWeightsUpload.round == round_)
+    )).scalar_one()
@@ -0,0 +1,244 @@
+# app/services/fl_aggregation.py
+
+"""
+Vectorized aggregation of FL updates.
+
+Every participant's state dict is flattened once into a row of an
+(n_participants x n_params) matrix following a shared ParameterLayout.
+FedAvg is then a single vector-matrix product; the robust strategies
+(coordinate-wise median, trimmed mean, Krum / multi-Krum) work on the
+same matrix. The strategy comes from FLExperiment.params:
+
+    {"aggregation": "trimmed_mean", "trim_ratio": 0.2, "clip_norm": 5.0}
+"""
+
+import math
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+import torch
+
+
+class ParameterLayout:
+    """Fixed order and shapes of a model's parameters inside a flat vector."""
+
+    def __init__(self, shapes: Dict[str, Sequence[int]]):
+        self.names: List[str] = sorted(shapes)
+        self.shapes: List[Tuple[int, ...]] = [tuple(shapes[n]) for n in self.names]
+        self.sizes: List[int] = [math.prod(s) for s in self.shapes]
+        self.numel: int = sum(self.sizes)
+
+    @classmethod
+    def from_state(cls, state: Dict[str, torch.Tensor]) -> "ParameterLayout":
+        return cls({k: tuple(v.shape) for k, v in state.items()})
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, ParameterLayout):
+            return NotImplemented
+        return self.names == other.names and self.shapes == other.shapes
+
+    def matches(self, state: Dict[str, torch.Tensor]) -> bool:
+        if len(state) != len(self.names):
+            return False
+        for name, shape in zip(self.names, self.shapes):
+            t = state.get(name)
+            if t is None or tuple(t.shape) != shape:
+                return False
+        return True
+
+    def flatten(self, state: Dict[str, torch.Tensor], out: Optional[torch.Tensor] = None) -> torch.Tensor:
+        parts = [state[n].reshape(-1).to(torch.float32) for n in self.names]
+        if out is None:
+            return torch.cat(parts)
+        return torch.cat(parts, out=out)
+
+    def unflatten(self, vector: torch.Tensor) -> Dict[str, torch.Tensor]:
+        return {
+            name: chunk.view(shape)
+            for name, shape, chunk in zip(self.names, self.shapes, torch.split(vector, self.sizes))
+        }
+
+    def stack(self, states: Sequence[Dict[str, torch.Tensor]]) -> torch.Tensor:
+        matrix = torch.empty((len(states), self.numel), dtype=torch.float32)
+        for i, state in enumerate(states):
+            self.flatten(state, out=matrix[i])
+        return matrix
+
+
+def weighted_average(matrix: torch.Tensor, sample_counts: Sequence[float]) -> torch.Tensor:
+    weights = torch.tensor(sample_counts, dtype=torch.float64)
+    weights = (weights / weights.sum()).to(matrix.dtype)
+    return weights @ matrix
+
+
+def fedavg(
+    states: Sequence[Dict[str, torch.Tensor]],
+    sample_counts: Sequence[int],
+    layout: Optional[ParameterLayout] = None,
+) -> Tuple[Dict[str, torch.Tensor], List[int]]:
+    """
+    Sample-weighted average of the states that fit the layout (by default
+    the first state's). Returns the averaged state and the indices of the
+    states that were used; the others are rejected as shape mismatches.
+    """
+    if not states:
+        raise ValueError("no valid uploads")
+    layout = layout or ParameterLayout.from_state(states[0])
+
+    accepted = [i for i, s in enumerate(states) if sample_counts[i] > 0 and layout.matches(s)]
+    if not accepted:
+        raise ValueError("no valid uploads")
+
+    matrix = layout.stack([states[i] for i in accepted])
+    vector = weighted_average(matrix, [sample_counts[i] for i in accepted])
+    return layout.unflatten(vector), accepted
+
+
+# ============================================================
+# Robust strategies
+# ============================================================
+
+AGGREGATIONS = ("fedavg", "median", "trimmed_mean", "krum", "multi_krum")
+
+
+class AggregationConfig(NamedTuple):
+    strategy: str = "fedavg"
+    # trimmed_mean: fraction of values dropped at each end of every coordinate
+    trim_ratio: float = 0.1
+    # krum / multi_krum: number of Byzantine participants tolerated
+    byzantine: int = 1
+    # multi_krum: updates averaged after scoring (default n - byzantine)
+    krum_select: Optional[int] = None
+    # Updates (upload - global model) longer than this are scaled down to it
+    clip_norm: Optional[float] = None
+
+    @classmethod
+    def from_params(cls, params: Optional[Dict[str, Any]]) -> "AggregationConfig":
+        params = params or {}
+        strategy = str(params.get("aggregation") or "fedavg").lower()
+        if strategy not in AGGREGATIONS:
+            raise ValueError(f"unknown aggregation: {strategy} (expected one of {', '.join(AGGREGATIONS)})")
+
+        try:
+            trim_ratio = float(params.get("trim_ratio", 0.1))
+            byzantine = int(params.get("byzantine", 1))
+            krum_select = params.get("krum_select")
+            krum_select = int(krum_select) if krum_select is not None else None
+            clip_norm = params.get("clip_norm")
+            clip_norm = float(clip_norm) if clip_norm is not None else None
+        except (TypeError, ValueError):
+            raise ValueError("invalid aggregation parameters")
+
+        if not 0 <= trim_ratio < 0.5:
+            raise ValueError("trim_ratio must be in [0, 0.5)")
+        if byzantine < 0:
+            raise ValueError("byzantine must be >= 0")
+        if krum_select is not None and krum_select < 1:
+            raise ValueError("krum_select must be >= 1")
+        if clip_norm is not None and clip_norm <= 0:
+            raise ValueError("clip_norm must be positive")
+        return cls(strategy, trim_ratio, byzantine, krum_select, clip_norm)
+
+    @property
+    def streaming(self) -> bool:
+        """Whether rounds can be averaged from the running accumulator (fl_accumulator)."""
+        return self.strategy == "fedavg" and self.clip_norm is None
+
+
+def clip_updates(matrix: torch.Tensor, base: torch.Tensor, clip_norm: float) -> Tuple[torch.Tensor, int]:
+    """Scale every row's distance from `base` down to at most clip_norm."""
+    updates = matrix - base
+    norms = updates.norm(dim=1)
+    scale = (clip_norm / norms.clamp(min=1e-12)).clamp(max=1.0)
+    return base + updates * scale.unsqueeze(1), int((norms > clip_norm).sum())
+
+
+def coordinate_median(matrix: torch.Tensor) -> torch.Tensor:
+    n = matrix.shape[0]
+    ordered = matrix.sort(dim=0).values
+    if n % 2:
+        return ordered[n // 2]
+    return (ordered[n // 2 - 1] + ordered[n // 2]) / 2
+
+
+def trimmed_mean(matrix: torch.Tensor, trim_ratio: float) -> Tuple[torch.Tensor, int]:
+    """Mean of every coordinate without its k lowest and k highest values; returns (vector, k)."""
+    n = matrix.shape[0]
+    k = min(int(math.floor(trim_ratio * n)), (n - 1) // 2)
+    if k == 0:
+        return matrix.mean(dim=0), 0
+    return matrix.sort(dim=0).values[k:n - k].mean(dim=0), k
+
+
+def krum_scores(matrix: torch.Tensor, byzantine: int) -> torch.Tensor:
+    """Sum of squared distances from each row to its n - f - 2 nearest other rows."""
+    n = matrix.shape[0]
+    neighbours = min(max(1, n - byzantine - 2), n - 1)
+    sq = (matrix * matrix).sum(dim=1)
+    dist = (sq.unsqueeze(1) + sq.unsqueeze(0) - 2 * matrix @ matrix.T).clamp(min=0)
+    dist.fill_diagonal_(float("inf"))
+    return dist.topk(neighbours, dim=1, largest=False).values.sum(dim=1)
+
+
+def aggregate_matrix(
+    matrix: torch.Tensor,
+    sample_counts: Sequence[float],
+    config: AggregationConfig,
+    base: Optional[torch.Tensor] = None,
+) -> Tuple[torch.Tensor, Dict[str, Any]]:
+    """
+    Aggregate stacked updates with the configured strategy. Returns the
+    vector and a report: rows kept, rows rejected (Krum), rows whose
+    update norm was clipped and values trimmed per coordinate.
+    """
+    n = matrix.shape[0]
+    report: Dict[str, Any] = {"strategy": config.strategy, "selected": list(range(n)), "clipped": 0, "trimmed": 0}
+
+    if config.clip_norm is not None and base is not None:
+        matrix, report["clipped"] = clip_updates(matrix, base, config.clip_norm)
+
+    if config.strategy == "median":
+        vector = coordinate_median(matrix)
+        report["trimmed"] = (n - 1) // 2
+    elif config.strategy == "trimmed_mean":
+        vector, report["trimmed"] = trimmed_mean(matrix, config.trim_ratio)
+    elif config.strategy in ("krum", "multi_krum") and n > 1:
+        scores = krum_scores(matrix, config.byzantine)
+        if config.strategy == "krum":
+            keep = 1
+        else:
+            keep = config.krum_select or max(1, n - config.byzantine)
+        selected = scores.topk(min(keep, n), largest=False).indices.sort().values
+        report["selected"] = selected.tolist()
+        vector = weighted_average(matrix[selected], [sample_counts[i] for i in report["selected"]])
+    else:
+        vector = weighted_average(matrix, sample_counts)
+
+    report["rejected"] = n - len(report["selected"])
+    return vector, report
+
+
+def aggregate(
+    states: Sequence[Dict[str, torch.Tensor]],
+    sample_counts: Sequence[int],
+    layout: ParameterLayout,
+    config: AggregationConfig,
+    base_state: Optional[Dict[str, torch.Tensor]] = None,
+) -> Tuple[Dict[str, torch.Tensor], Dict[str, Any]]:
+    """
+    Like fedavg, with the configured strategy. The report's "contributors"
+    counts uploads that made it into the result; "rejected" adds shape
+    mismatches to the ones the strategy dropped.
+    """
+    accepted = [i for i, s in enumerate(states) if sample_counts[i] > 0 and layout.matches(s)]
+    if not accepted:
+        raise ValueError("no valid uploads")
+
+    matrix = layout.stack([states[i] for i in accepted])
+    base = layout.flatten(base_state) if base_state is not None and layout.matches(base_state) else None
+    vector, report = aggregate_matrix(matrix, [sample_counts[i] for i in accepted], config, base)
+
+    selected = report.pop("selected")
+    report["contributors"] = len(selected)
+    report["rejected"] += len(states) - len(accepted)
+    report["total_samples"] = sum(sample_counts[accepted[j]] for j in selected)
+    return layout.unflatten(vector), report
@@ -0,0 +1,108 @@
+# app/services/fl_inference_batcher.py
+
+"""
+Micro-batching for /fl/.../infer.
+
+Concurrent requests for the same cached model (fl_model_cache) join a
+pending batch for up to FL_INFERENCE_BATCH_MAX_WAIT_MS, or until it holds
+FL_INFERENCE_BATCH_MAX_ROWS rows. The batch then runs as one forward pass
+under torch.inference_mode and each request gets its own rows back. The
+wait bounds the extra latency; a wait of 0 disables batching.
+"""
+
+import asyncio
+import logging
+from typing import Any, Dict, List
+
+import torch
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class _Batch:
+    def __init__(self, module: torch.nn.Module):
+        self.module = module
+        self.inputs: List[torch.Tensor] = []
+        self.futures: List[asyncio.Future] = []
+        self.rows = 0
+        self.timer: Any = None
+
+
+class InferenceBatcher:
+    def __init__(self, max_wait_ms: float, max_rows: int):
+        self.max_wait = max_wait_ms / 1000.0
+        self.max_rows = max_rows
+        # Keyed by the module itself: a new round is a new module, so
+        # requests never share a batch across model versions
+        self._pending: Dict[torch.nn.Module, _Batch] = {}
+        self.requests = 0
+        self.batches = 0
+        self.rows = 0
+
+    async def predict(self, module: torch.nn.Module, x: torch.Tensor) -> torch.Tensor:
+        """Model output for the rows of `x`, computed together with concurrent requests."""
+        if self.max_wait <= 0 or x.shape[0] >= self.max_rows:
+            self._count(1, x.shape[0])
+            with torch.inference_mode():
+                return module(x)
+
+        loop = asyncio.get_running_loop()
+        batch = self._pending.get(module)
+        if batch is None:
+            batch = _Batch(module)
+            self._pending[module] = batch
+            batch.timer = loop.call_later(self.max_wait, self._flush, batch)
+        elif batch.rows + x.shape[0] > self.max_rows:
+            # Doesn't fit: run what has been collected and start a new batch
+            self._flush(batch)
+            return await self.predict(module, x)
+
+        future = loop.create_future()
+        batch.inputs.append(x)
+        batch.futures.append(future)
+        batch.rows += x.shape[0]
+        if batch.rows >= self.max_rows:
+            self._flush(batch)
+        return await future
+
+    def _flush(self, batch: _Batch) -> None:
+        if self._pending.get(batch.module) is batch:
+            del self._pending[batch.module]
+        batch.timer.cancel()
+        self._count(len(batch.futures), batch.rows)
+
+        try:
+            with torch.inference_mode():
+                out = batch.module(torch.cat(batch.inputs))
+        except Exception as e:
+            logger.exception("Batched FL inference failed | requests=%s | rows=%s", len(batch.futures), batch.rows)
+            for future in batch.futures:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        sizes = [t.shape[0] for t in batch.inputs]
+        for future, rows in zip(batch.futures, torch.split(out, sizes)):
+            # Done already if the client went away
+            if not future.done():
+                future.set_result(rows)
+
+    def _count(self, requests: int, rows: int) -> None:
+        self.requests += requests
+        self.batches += 1
+        self.rows += rows
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "batches": self.batches,
+            "rows": self.rows,
+            "avg_requests_per_batch": round(self.requests / self.batches, 2) if self.batches else None,
+            "max_wait_ms": self.max_wait * 1000.0,
+            "max_rows": self.max_rows,
+        }
+
+
+inference_batcher = InferenceBatcher(settings.FL_INFERENCE_BATCH_MAX_WAIT_MS, settings.FL_INFERENCE_BATCH_MAX_ROWS)
@@ -0,0 +1,153 @@
+# app/services/fl_model_cache.py
+
+"""
+Per-worker cache of ready-to-run global models for /fl/.../infer.
+
+Entries are keyed by (experiment_id, round) and hold an eval() module
+with gradients off. A lookup costs one indexed query for the latest
+round and its checksum; the weights are decoded and loaded only when
+that round isn't cached yet. So a round aggregated by another worker
+is picked up on the next request, and aggregate_round drops the stale
+entries of the worker that aggregated it.
+"""
+
+import asyncio
+import logging
+from collections import OrderedDict
+from typing import Any, Dict, NamedTuple, Optional, Tuple
+
+import torch
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.models.fl_experiment import FLExperiment
+from app.models.fl_global_model import FLGlobalModel
+from app.services.fl_rounds import ACTIVE_STATUSES
+from app.services.fl_tensor_codec import load_weights
+from app.services.fl_training import ConstructionLinearModel
+
+logger = logging.getLogger(__name__)
+
+
+class CachedModel(NamedTuple):
+    experiment_id: int
+    round: int
+    checksum: Optional[str]
+    input_dim: int
+    module: torch.nn.Module
+
+
+def build_model(global_model: FLGlobalModel) -> CachedModel:
+    state = load_weights(global_model)
+    if not state or "net.0.weight" not in state:
+        raise ValueError("global model does not match the inference architecture")
+
+    input_dim = state["net.0.weight"].shape[1]
+    module = ConstructionLinearModel(input_dim=input_dim)
+    try:
+        module.load_state_dict({k: v.float() for k, v in state.items()})
+    except RuntimeError as e:
+        raise ValueError(f"global model does not match the inference architecture: {e}")
+    module.eval()
+    module.requires_grad_(False)
+    return CachedModel(global_model.experiment_id, global_model.round, global_model.checksum, input_dim, module)
+
+
+class GlobalModelCache:
+    def __init__(self, max_models: int):
+        self.max_models = max_models
+        self._entries: "OrderedDict[Tuple[int, int], CachedModel]" = OrderedDict()
+        # One loader per experiment, so a burst of misses decodes the weights once
+        self._loading: Dict[int, asyncio.Lock] = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _lookup(self, key: Tuple[int, int], checksum: Optional[str]) -> Optional[CachedModel]:
+        entry = self._entries.get(key)
+        if entry is None or entry.checksum != checksum:
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def put(self, entry: CachedModel) -> None:
+        self.invalidate(entry.experiment_id)
+        self._entries[(entry.experiment_id, entry.round)] = entry
+        while len(self._entries) > self.max_models:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, experiment_id: int) -> None:
+        for key in [k for k in self._entries if k[0] == experiment_id]:
+            del self._entries[key]
+
+    async def get(self, session: AsyncSession, experiment_id: int) -> Optional[CachedModel]:
+        """The experiment's latest global model, or None if it has none yet."""
+        latest = (await session.execute(
+            select(FLGlobalModel.round, FLGlobalModel.checksum)
+            .where(FLGlobalModel.experiment_id == experiment_id)
+            .order_by(FLGlobalModel.round.desc())
+            .limit(1)
+        )).first()
+        if latest is None:
+            return None
+
+        key = (experiment_id, latest.round)
+        entry = self._lookup(key, latest.checksum)
+        if entry is not None:
+            self.hits += 1
+            return entry
+
+        self.misses += 1
+        async with self._loading.setdefault(experiment_id, asyncio.Lock()):
+            entry = self._lookup(key, latest.checksum)
+            if entry is not None:
+                return entry
+            global_model = (await session.execute(
+                select(FLGlobalModel)
+                .where(FLGlobalModel.experiment_id == experiment_id, FLGlobalModel.round == latest.round)
+                .limit(1)
+            )).scalars().first()
+            if global_model is None:
+                return None
+            entry = build_model(global_model)
+            self.put(entry)
+            return entry
+
+    async def warm(self) -> int:
+        """Load the latest model of every running experiment; returns how many were loaded."""
+        async with AsyncSessionLocal() as session:
+            experiment_ids = (await session.execute(
+                select(FLExperiment.id)
+                .where(FLExperiment.status.in_(ACTIVE_STATUSES))
+                .order_by(FLExperiment.id.desc())
+                .limit(self.max_models)
+            )).scalars().all()
+
+            loaded = 0
+            for experiment_id in experiment_ids:
+                try:
+                    if await self.get(session, experiment_id) is not None:
+                        loaded += 1
+                except ValueError as e:
+                    logger.warning("Skipping FL model warm-up | experiment_id=%s | error=%s", experiment_id, e)
+        # Warm-up loads aren't traffic
+        self.hits = self.misses = 0
+        return loaded
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else None,
+            "evictions": self.evictions,
+            "size": len(self._entries),
+            "max_models": self.max_models,
+            "models": [{"experiment_id": e, "round": r} for e, r in self._entries],
+        }
+
+
+global_model_cache = GlobalModelCache(settings.FL_MODEL_CACHE_SIZE)
@@ -0,0 +1,93 @@
+# app/services/fl_round_scheduler.py
+
+"""
+Background FL round scheduler (started from app.main as a PeriodicTask).
+
+Each tick closes rounds that reached their participant threshold or
+deadline, requeues aggregations that have been stuck longer than
+FL_AGGREGATION_TIMEOUT_SECONDS (a worker died mid-round), then claims and
+aggregates CLOSING rounds one by one. A failed aggregation reopens the
+round (retried after a backoff, see fl_rounds.close_if_ready) until
+FL_AGGREGATION_MAX_ATTEMPTS, then parks it as FAILED. Every worker runs
+it; the conditional transitions in fl_rounds make sure a round is
+aggregated once.
+"""
+
+import logging
+from datetime import datetime, timedelta
+
+from sqlalchemy import select
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.models.fl_experiment import FLExperiment
+from app.services.fl_rounds import (
+    ACTIVE_STATUSES,
+    AGGREGATING,
+    CLOSING,
+    FAILED,
+    OPEN,
+    close_if_ready,
+    failed_attempts,
+    transition,
+)
+from app.services.fl_service import aggregate_round
+
+logger = logging.getLogger(__name__)
+
+
+async def run_round_scheduler() -> None:
+    now = datetime.utcnow()
+    stuck_before = now - timedelta(seconds=settings.FL_AGGREGATION_TIMEOUT_SECONDS)
+
+    async with AsyncSessionLocal() as session:
+        experiments = (await session.execute(
+            select(FLExperiment).where(FLExperiment.status.in_(ACTIVE_STATUSES))
+        )).scalars().all()
+
+        for exp in experiments:
+            if exp.round_state == OPEN:
+                event = await close_if_ready(session, exp, now)
+                if event:
+                    logger.info("FL round closing | experiment_id=%s | round=%s | event=%s", exp.id, exp.current_round, event)
+            elif exp.round_state == AGGREGATING and (exp.round_state_changed_at or now) < stuck_before:
+                if await transition(session, exp.id, exp.current_round, AGGREGATING, CLOSING, "REQUEUED"):
+                    logger.warning("FL aggregation requeued | experiment_id=%s | round=%s", exp.id, exp.current_round)
+        await session.commit()
+
+        closing = (await session.execute(
+            select(FLExperiment.id, FLExperiment.current_round)
+            .where(FLExperiment.status.in_(ACTIVE_STATUSES), FLExperiment.round_state == CLOSING)
+            .order_by(FLExperiment.id)
+        )).all()
+
+    for experiment_id, round_ in closing:
+        await aggregate_closing_round(experiment_id, round_)
+
+
+async def aggregate_closing_round(experiment_id: int, round_: int) -> None:
+    async with AsyncSessionLocal() as session:
+        if not await transition(session, experiment_id, round_, CLOSING, AGGREGATING, "AGGREGATING"):
+            return  # claimed by another worker
+        await session.commit()
+
+    async with AsyncSessionLocal() as session:
+        try:
+            # Records AGGREGATED and opens the next round in the same commit
+            await aggregate_round(session, experiment_id, round_override=round_)
+        except Exception as e:
+            await session.rollback()
+            if str(e) == "round not aggregating":
+                # Requeued while this worker was slow; whoever holds it now finishes it
+                logger.warning("FL aggregation skipped | experiment_id=%s | round=%s", experiment_id, round_)
+                return
+            logger.exception("FL aggregation failed | experiment_id=%s | round=%s", experiment_id, round_)
+            attempts = await failed_attempts(session, experiment_id, round_) + 1
+            details = {"error": str(e), "attempts": attempts}
+            if attempts >= settings.FL_AGGREGATION_MAX_ATTEMPTS:
+                # Needs a fix and a manual close (fl_rounds.request_close) to retry
+                details["final"] = True
+                await transition(session, experiment_id, round_, AGGREGATING, FAILED, "FAILED", details)
+            else:
+                await transition(session, experiment_id, round_, AGGREGATING, OPEN, "FAILED", details, reopen=True)
+            await session.commit()
@@ -0,0 +1,198 @@
+# app/services/fl_rounds.py
+
+"""
+FL round state and its event log.
+
+    OPEN --(participant_threshold uploaders | deadline | manual close)--> CLOSING
+    CLOSING --(scheduler claims it)--> AGGREGATING --(aggregate_round)--> OPEN (next round)
+    AGGREGATING --(failure)--> OPEN (same round, deadline restarted; closes
+                               again only after an exponential backoff)
+    AGGREGATING --(FL_AGGREGATION_MAX_ATTEMPTS failures)--> FAILED
+    FAILED --(manual close)--> CLOSING
+
+Transitions are conditional UPDATEs on the experiment row, so concurrent
+uploads and several scheduler workers never apply the same transition
+twice; each successful one is recorded as an FLRoundEvent in the same
+transaction. The scheduler itself lives in fl_round_scheduler.py.
+"""
+
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional
+
+from sqlalchemy import func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.pagination import clamp_limit, decode_cursor, encode_cursor
+from app.models.fl_experiment import FLExperiment
+from app.models.fl_round_event import FLRoundEvent
+from app.models.fl_weights_upload import FLWeightsUpload
+
+OPEN = "OPEN"
+CLOSING = "CLOSING"
+AGGREGATING = "AGGREGATING"
+FAILED = "FAILED"
+
+ACTIVE_STATUSES = ("STARTED", "TRAINING")
+
+
+def record_event(
+    session: AsyncSession,
+    experiment_id: int,
+    round_: int,
+    event: str,
+    details: Optional[Dict[str, Any]] = None,
+) -> None:
+    session.add(FLRoundEvent(experiment_id=experiment_id, round=round_, event=event, details=details))
+
+
+async def transition(
+    session: AsyncSession,
+    experiment_id: int,
+    round_: int,
+    from_state: str,
+    to_state: str,
+    event: str,
+    details: Optional[Dict[str, Any]] = None,
+    reopen: bool = False,
+) -> bool:
+    """
+    Move the experiment's current round from `from_state` to `to_state`.
+    Returns False (and records nothing) when the round is no longer in
+    `from_state`. Does not commit.
+    """
+    now = datetime.utcnow()
+    values: Dict[str, Any] = {"round_state": to_state, "round_state_changed_at": now}
+    if reopen:
+        values["round_opened_at"] = now
+    result = await session.execute(
+        update(FLExperiment)
+        .where(
+            FLExperiment.id == experiment_id,
+            FLExperiment.current_round == round_,
+            FLExperiment.round_state == from_state,
+        )
+        .values(**values)
+        .execution_options(synchronize_session=False)
+    )
+    if result.rowcount != 1:
+        return False
+    record_event(session, experiment_id, round_, event, details)
+    return True
+
+
+def open_next_round(session: AsyncSession, exp: FLExperiment, details: Optional[Dict[str, Any]] = None) -> None:
+    """Mark exp.current_round as freshly opened (the caller already advanced it). Does not commit."""
+    now = datetime.utcnow()
+    exp.round_state = OPEN
+    exp.round_opened_at = now
+    exp.round_state_changed_at = now
+    session.add(exp)
+    record_event(session, exp.id, exp.current_round, "OPENED", details)
+
+
+def round_deadline(exp: FLExperiment) -> Optional[datetime]:
+    if exp.round_opened_at is None:
+        return None
+    seconds = (exp.params or {}).get("round_deadline_seconds", settings.FL_ROUND_DEADLINE_SECONDS)
+    return exp.round_opened_at + timedelta(seconds=float(seconds))
+
+
+async def round_uploaders(session: AsyncSession, experiment_id: int, round_: int) -> int:
+    return (await session.execute(
+        select(func.count(func.distinct(FLWeightsUpload.uploader_id)))
+        .where(FLWeightsUpload.experiment_id == experiment_id, FLWeightsUpload.round == round_)
+    )).scalar_one()
+
+
+async def failed_attempts(session: AsyncSession, experiment_id: int, round_: int) -> int:
+    return (await session.execute(
+        select(func.count(FLRoundEvent.id))
+        .where(
+            FLRoundEvent.experiment_id == experiment_id,
+            FLRoundEvent.round == round_,
+            FLRoundEvent.event == "FAILED",
+        )
+    )).scalar_one()
+
+
+def retry_after(exp: FLExperiment, failures: int) -> datetime:
+    """When a round reopened after `failures` failed aggregations may close again."""
+    delay = min(settings.FL_AGGREGATION_RETRY_BACKOFF_SECONDS * 2 ** (failures - 1), settings.FL_ROUND_DEADLINE_SECONDS)
+    return (exp.round_state_changed_at or datetime.utcnow()) + timedelta(seconds=delay)
+
+
+async def close_if_ready(session: AsyncSession, exp: FLExperiment, now: Optional[datetime] = None) -> Optional[str]:
+    """
+    Move an OPEN round to CLOSING once participant_threshold participants
+    have uploaded, or once its deadline passed with at least one upload.
+    Returns the event recorded, if any. Does not commit.
+    """
+    if exp.round_state != OPEN or exp.status not in ACTIVE_STATUSES:
+        return None
+    uploaders = await round_uploaders(session, exp.id, exp.current_round)
+    details = {"uploaders": uploaders, "threshold": exp.participant_threshold}
+
+    if uploaders >= exp.participant_threshold:
+        event = "THRESHOLD_REACHED"
+    else:
+        deadline = round_deadline(exp)
+        if uploaders == 0 or deadline is None or (now or datetime.utcnow()) < deadline:
+            return None
+        event = "DEADLINE_PASSED"
+
+    # Don't retry a failing aggregation on every scheduler tick
+    failures = await failed_attempts(session, exp.id, exp.current_round)
+    if failures and (now or datetime.utcnow()) < retry_after(exp, failures):
+        return None
+
+    if await transition(session, exp.id, exp.current_round, OPEN, CLOSING, event, details):
+        return event
+    return None
+
+
+async def request_close(session: AsyncSession, experiment_id: int) -> Dict[str, Any]:
+    """Close the current round now; the scheduler aggregates it on its next tick."""
+    exp = await session.get(FLExperiment, experiment_id)
+    if not exp:
+        raise ValueError("experiment not found")
+    if exp.status not in ACTIVE_STATUSES:
+        raise ValueError("experiment not active")
+
+    # Also the way to retry a round parked as FAILED
+    if (
+        await transition(session, exp.id, exp.current_round, OPEN, CLOSING, "CLOSE_REQUESTED")
+        or await transition(session, exp.id, exp.current_round, FAILED, CLOSING, "RETRY_REQUESTED")
+    ):
+        await session.commit()
+    await session.refresh(exp)
+    return {"experiment_id": exp.id, "round": exp.current_round, "round_state": exp.round_state}
+
+
+async def list_events(
+    session: AsyncSession,
+    experiment_id: int,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = None,
+) -> Dict[str, Any]:
+    """Events in the order they happened; pass next_cursor back to poll for newer ones."""
+    limit = clamp_limit(limit)
+    stmt = (
+        select(FLRoundEvent)
+        .where(FLRoundEvent.experiment_id == experiment_id)
+        .order_by(FLRoundEvent.id)
+        .limit(limit + 1)
+    )
+    after = decode_cursor(cursor, int)
+    if after:
+        stmt = stmt.where(FLRoundEvent.id > after[0])
+
+    rows = (await session.execute(stmt)).scalars().all()
+    items = rows[:limit]
+    last_id = items[-1].id if items else (after[0] if after else 0)
+    return {
+        "items": items,
+        "has_more": len(rows) > limit,
+        # Always returned, so pollers can resume from the last event they saw
+        "next_cursor": encode_cursor(last_id),
+    }
@@ -1,25 +1,33 @@
+import hashlib
 import random
 import math
-import time
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple
 from datetime import datetime, timezone
 
 from fastapi import HTTPException
-from sqlalchemy import select
+from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
 import torch
-import torch.nn as nn
-import torch.optim as optim
-from torch.utils.data import TensorDataset, DataLoader
 
+from app.models.assessment_hazard import AssessmentHazard
 from app.models.assessment_result import AssessmentResult
 from app.models.envoy_local_model import EnvoyLocalModel
 from app.models.fl_experiment import FLExperiment
 from app.models.fl_participant import FLParticipant
 from app.models.fl_weights_upload import FLWeightsUpload
 from app.models.fl_global_model import FLGlobalModel
+from app.core.config import settings
+from app.services.fl_accumulator import accumulate, close_round, remember, round_upload_count
+from app.services.fl_aggregation import AggregationConfig, ParameterLayout, aggregate
+from app.services.fl_model_cache import global_model_cache
+from app.services.fl_tensor_codec import decode_state, encode_state, load_weights, model_checksum
+from app.services.fl_training import default_model_state_dict, train_local
+from app.services.fl_training_executor import training_executor
+from app.services.fl_rounds import AGGREGATING, OPEN, close_if_ready, open_next_round, record_event
+from app.services.fl_update_codec import DEFAULT_TOPK_RATIO, ENCODINGS, decode_update
+from app.services.portfolio_dashboard import mark_portfolio_dirty
 
 # ============================================================
 # Utils
@@ -46,28 +54,6 @@ def sanitize_json(obj):
         return obj
     return obj
 
-# ============================================================
-# PyTorch Model (UPGRADED, SAME INTERFACE)
-# ============================================================
-
-class ConstructionLinearModel(nn.Module):
-    def __init__(self, input_dim: int = 6):
-        super().__init__()
-        self.net = nn.Sequential(
-            nn.Linear(input_dim, 16),
-            nn.ReLU(),
-            nn.Linear(16, 8),
-            nn.ReLU(),
-            nn.Linear(8, 1),
-        )
-
-    def forward(self, x):
-        return self.net(x)
-
-
-def default_model_state_dict() -> Dict[str, torch.Tensor]:
-    return ConstructionLinearModel().state_dict()
-
 # ============================================================
 # Experiments
 # ============================================================
@@ -88,6 +74,11 @@ async def create_experiment(
     participant_threshold: int = 3
 ) -> FLExperiment:
 
+    # Reject unknown strategies / encodings up front rather than at the first round
+    AggregationConfig.from_params(params)
+    if (params or {}).get("update_encoding", "dense") not in ENCODINGS:
+        raise ValueError(f"unsupported update_encoding (expected one of {', '.join(ENCODINGS)})")
+
     exp = FLExperiment(
         name=name,
         params=params or {"model": "construction-mlp", "aggregation": "fedavg"},
@@ -98,16 +89,12 @@ async def create_experiment(
     session.add(exp)
     await session.flush()
 
-    global_model = FLGlobalModel(
-        experiment_id=exp.id,
-        round=0,
-        weights=sanitize_json({
-            k: v.tolist() for k, v in default_model_state_dict().items()
-        })
-    )
+    global_model = FLGlobalModel(experiment_id=exp.id, round=0)
+    set_global_weights(global_model, default_model_state_dict())
     session.add(global_model)
 
     await session.commit()
+    mark_portfolio_dirty()
     await session.refresh(exp)
     return exp
 
@@ -142,6 +129,16 @@ async def join_experiment(session: AsyncSession, experiment_id: int, user_id: in
 # Global Model
 # ============================================================
 
+def set_global_weights(
+    model: FLGlobalModel,
+    state: Dict[str, Any],
+    metadata: Optional[Dict[str, Any]] = None
+) -> None:
+    model.weights = None
+    model.weights_blob = encode_state(state, metadata=metadata)
+    model.checksum = hashlib.sha256(model.weights_blob).hexdigest()
+
+
 async def get_global_model(session: AsyncSession, experiment_id: int) -> Optional[FLGlobalModel]:
     stmt = (
         select(FLGlobalModel)
@@ -164,7 +161,10 @@ async def upload_weights(
     experiment_id: int,
     uploader_id: int,
     weights: Dict[str, Any],
-    dataset_size: int
+    dataset_size: int,
+    encoding: str = "dense",
+    delta: bool = False,
+    base_checksum: Optional[str] = None
 ) -> FLWeightsUpload:
 
     exp = await session.get(FLExperiment, experiment_id)
@@ -175,32 +175,107 @@ async def upload_weights(
     if not participant or participant.experiment_id != experiment_id:
         raise PermissionError("not a participant")
 
-    weights_json = sanitize_json({
-        k: v if isinstance(v, list) else v.tolist()
-        for k, v in weights.items()
-    })
+    if exp.round_state != OPEN:
+        raise ValueError("round closing")
+
+    global_model = await get_global_model(session, experiment_id)
+
+    # Deltas are only meaningful against the model the client trained from
+    is_delta = delta or encoding == "topk"
+    if is_delta:
+        if not base_checksum:
+            raise ValueError("base_checksum required for delta uploads")
+        if not global_model or model_checksum(global_model) != base_checksum:
+            raise ValueError("stale base model")
+
+    # Decode straight into a flat vector in the global model's layout
+    base_state = load_weights(global_model) if global_model else None
+    layout = ParameterLayout.from_state(base_state) if base_state else None
+    base = layout.flatten(base_state) if layout else None
+    layout, vector, payload_bytes = decode_update(weights, encoding, layout, base, delta=is_delta)
+
+    config = AggregationConfig.from_params(exp.params)
+    if config.streaming and dataset_size > 0:
+        await accumulate(session, experiment_id, exp.current_round, layout, vector, dataset_size)
+
+    # Robust strategies need every upload at round close, so those are always kept
+    keep_raw = settings.FL_KEEP_RAW_UPLOADS or not config.streaming
 
     upload = FLWeightsUpload(
         experiment_id=experiment_id,
         uploader_id=participant.user_id,
         round=exp.current_round,
-        weights=weights_json,
-        dataset_size=dataset_size
+        weights_blob=(
+            encode_state(layout.unflatten(vector), dtype=settings.FL_UPLOAD_WEIGHTS_DTYPE)
+            if keep_raw else None
+        ),
+        dataset_size=dataset_size,
+        encoding=encoding,
+        is_delta=is_delta,
+        compression_ratio=round(layout.numel * 4 / max(payload_bytes, 1), 3)
     )
 
     session.add(upload)
+    await session.flush()
+    # The scheduler aggregates rounds this closes (and catches any missed here)
+    await close_if_ready(session, exp)
     await session.commit()
+    remember(session)
     await session.refresh(upload)
     return upload
 
 
-async def get_uploads(session: AsyncSession, experiment_id: int) -> List[FLWeightsUpload]:
+async def get_uploads(session: AsyncSession, experiment_id: int) -> List[Dict[str, Any]]:
+    # Listing metadata only; the weights themselves are never sent back
     res = await session.execute(
-        select(FLWeightsUpload).where(
-            FLWeightsUpload.experiment_id == experiment_id
+        select(
+            FLWeightsUpload.id,
+            FLWeightsUpload.experiment_id,
+            FLWeightsUpload.uploader_id,
+            FLWeightsUpload.round,
+            FLWeightsUpload.dataset_size,
+            FLWeightsUpload.storage_key,
+            FLWeightsUpload.encoding,
+            FLWeightsUpload.is_delta,
+            FLWeightsUpload.compression_ratio,
+            FLWeightsUpload.created_at,
+            func.length(FLWeightsUpload.weights_blob).label("weights_bytes"),
         )
+        .where(FLWeightsUpload.experiment_id == experiment_id)
+        .order_by(FLWeightsUpload.id)
     )
-    return res.scalars().all()
+    return [dict(row._mapping) for row in res.all()]
+
+async def negotiate_encoding(
+    session: AsyncSession,
+    experiment_id: int,
+    accepted: Optional[List[str]] = None
+) -> Dict[str, Any]:
+    """
+    Pick the upload encoding for a client: the experiment's
+    params["update_encoding"] when the client supports it, otherwise the
+    most compact of int8 / fp16 / dense it accepts.
+    """
+    exp = await session.get(FLExperiment, experiment_id)
+    if not exp:
+        raise ValueError("experiment not found")
+
+    params = exp.params or {}
+    accepted = [e for e in (accepted or ENCODINGS) if e in ENCODINGS]
+    preference = [params.get("update_encoding", "dense"), "int8", "fp16", "dense"]
+    encoding = next((e for e in preference if e in accepted), None)
+    if encoding is None:
+        raise ValueError(f"no common encoding (supported: {', '.join(ENCODINGS)})")
+
+    global_model = await get_global_model(session, experiment_id)
+    return {
+        "experiment_id": experiment_id,
+        "encoding": encoding,
+        "supported": list(ENCODINGS),
+        "topk_ratio": params.get("topk_ratio", DEFAULT_TOPK_RATIO),
+        "round": exp.current_round,
+        "base_checksum": model_checksum(global_model) if global_model else None,
+    }
 
 # ============================================================
 # Aggregation (FedAvg)
@@ -212,12 +287,63 @@ async def aggregate_round(
     round_override: Optional[int] = None
 ) -> Dict[str, Any]:
 
-    exp = await session.get(FLExperiment, experiment_id)
+    # Locked and fresh: the round state may have just changed under us
+    exp = await session.get(FLExperiment, experiment_id, with_for_update=True, populate_existing=True)
     if not exp:
         raise ValueError("experiment not found")
 
+    if round_override is not None and (exp.round_state != AGGREGATING or exp.current_round != round_override):
+        # Claimed round already aggregated, requeued or reopened by another worker
+        raise ValueError("round not aggregating")
     round_to_aggregate = round_override if round_override is not None else exp.current_round
 
+    config = AggregationConfig.from_params(exp.params)
+    closed = await close_round(session, experiment_id, round_to_aggregate) if config.streaming else None
+    upload_count = await round_upload_count(session, experiment_id, round_to_aggregate)
+    if closed is not None:
+        agg_state, contributors, total_samples = closed
+        report = {"strategy": config.strategy, "contributors": contributors, "clipped": 0, "trimmed": 0, "total_samples": total_samples}
+    else:
+        # Robust strategies, and rounds uploaded before the streaming accumulator
+        agg_state, report = await _aggregate_raw_uploads(
+            session, experiment_id, round_to_aggregate, config
+        )
+
+    summary = {
+        "experiment_id": experiment_id,
+        "aggregated_round": round_to_aggregate,
+        "new_round": round_to_aggregate + 1,
+        "strategy": report["strategy"],
+        "contributors": report["contributors"],
+        "rejected_uploads": upload_count - report["contributors"],
+        "clipped_uploads": report["clipped"],
+        "trimmed_per_coordinate": report["trimmed"],
+        "total_samples": report["total_samples"],
+    }
+
+    new_model = FLGlobalModel(experiment_id=experiment_id, round=round_to_aggregate + 1)
+    set_global_weights(new_model, agg_state, metadata={
+        k: v for k, v in summary.items() if k not in ("experiment_id", "new_round")
+    })
+    session.add(new_model)
+
+    record_event(session, experiment_id, round_to_aggregate, "AGGREGATED", summary)
+    exp.current_round += 1
+    exp.status = "TRAINING"
+    open_next_round(session, exp)
+
+    await session.commit()
+    global_model_cache.invalidate(experiment_id)
+    logger.info("Aggregated FL round | %s", summary)
+    return summary
+
+
+async def _aggregate_raw_uploads(
+    session: AsyncSession,
+    experiment_id: int,
+    round_to_aggregate: int,
+    config: AggregationConfig
+) -> Tuple[Dict[str, torch.Tensor], Dict[str, Any]]:
     uploads = (await session.execute(
         select(FLWeightsUpload).where(
             FLWeightsUpload.experiment_id == experiment_id,
@@ -225,43 +351,21 @@ async def aggregate_round(
         )
     )).scalars().all()
 
-    valid = [u for u in uploads if isinstance(u.weights, dict) and u.dataset_size > 0]
-    if not valid:
+    states, sizes = [], []
+    for u in uploads:
+        state = load_weights(u)
+        if state:
+            states.append(state)
+            sizes.append(u.dataset_size)
+    if not states:
         raise ValueError("no valid uploads")
 
-    total_samples = sum(u.dataset_size for u in valid)
-
-    keys = set()
-    for u in valid:
-        keys.update(u.weights.keys())
-
-    agg_state = {}
-    for k in keys:
-        acc = None
-        for u in valid:
-            if k not in u.weights:
-                continue
-            w = torch.tensor(u.weights[k], dtype=torch.float32)
-            scaled = w * (u.dataset_size / total_samples)
-            acc = scaled if acc is None else acc + scaled
-        agg_state[k] = acc
-
-    agg_json = sanitize_json({k: v.tolist() for k, v in agg_state.items()})
-
-    session.add_all([
-        FLGlobalModel(
-            experiment_id=experiment_id,
-            round=round_to_aggregate + 1,
-            weights=agg_json
-        )
-    ])
-
-    exp.current_round += 1
-    exp.status = "TRAINING"
-    session.add(exp)
+    # Uploads must match the architecture of the model they were trained from
+    global_model = await get_global_model(session, experiment_id)
+    base_state = load_weights(global_model) if global_model else None
+    layout = ParameterLayout.from_state(base_state or states[0])
 
-    await session.commit()
-    return agg_json
+    return aggregate(states, sizes, layout, config, base_state)
 
 # ============================================================
 # Update Global Model
@@ -270,17 +374,14 @@ async def aggregate_round(
 async def update_global_model(session: AsyncSession, experiment_id: int, weights: Dict[str, Any]):
     global_model = await get_global_model(session, experiment_id)
     if not global_model:
-        global_model = FLGlobalModel(
-            experiment_id=experiment_id,
-            round=1,
-            weights=weights
-        )
+        global_model = FLGlobalModel(experiment_id=experiment_id, round=1)
     else:
-        global_model.weights = weights
         global_model.round += 1
+    set_global_weights(global_model, weights)
 
     session.add(global_model)
     await session.commit()
+    global_model_cache.invalidate(experiment_id)
     return global_model
 
 # ============================================================
@@ -302,6 +403,7 @@ async def start_experiment(session: AsyncSession, experiment_id: int) -> Dict[st
         raise ValueError("no participants")
 
     exp.status = "STARTED"
+    open_next_round(session, exp, {"participants": len(participants)})
     await session.commit()
 
     return {
@@ -315,29 +417,46 @@ async def start_experiment(session: AsyncSession, experiment_id: int) -> Dict[st
 # ============================================================
 
 async def get_assessment_dataset(session: AsyncSession, project_id: int) -> List[Dict[str, Any]]:
+    # Only the columns the features need; the hazard count is computed in
+    # SQL instead of loading every hazard. The features keep their original
+    # definitions (str() size of the response, truthy image_path), which the
+    # existing global models were trained on.
+    hazard_count = (
+        select(func.count(AssessmentHazard.id))
+        .where(AssessmentHazard.assessment_id == AssessmentResult.id)
+        .correlate(AssessmentResult)
+        .scalar_subquery()
+    )
     results = (await session.execute(
-        select(AssessmentResult)
+        select(
+            AssessmentResult.score,
+            AssessmentResult.gemini_response,
+            hazard_count,
+            AssessmentResult.image_path,
+            AssessmentResult.project_id,
+            AssessmentResult.created_at,
+        )
         .where(AssessmentResult.project_id == project_id)
-        .options(selectinload(AssessmentResult.hazards))
-    )).scalars().all()
+        .order_by(AssessmentResult.created_at, AssessmentResult.id)
+    )).all()
 
     now = datetime.now(timezone.utc)
     dataset = []
 
-    for r in results:
-        age = max((now - r.created_at.replace(tzinfo=timezone.utc)).total_seconds(), 0)
+    for score, gemini_response, hazards, image_path, r_project_id, created_at in results:
+        age = max((now - created_at.replace(tzinfo=timezone.utc)).total_seconds(), 0)
         freshness = 1.0 / (1.0 + age / 86400.0)
 
         dataset.append({
             "features": [
-                safe_float(r.score),
-                safe_float(len(str(r.gemini_response)) if r.gemini_response else 0),
-                safe_float(len(r.hazards)),
-                safe_float(1.0 if r.image_path else 0.0),
-                safe_float(r.project_id / 1000.0),
+                safe_float(score),
+                safe_float(len(str(gemini_response)) if gemini_response else 0),
+                safe_float(hazards),
+                safe_float(1.0 if image_path else 0.0),
+                safe_float(r_project_id / 1000.0),
                 safe_float(freshness),
             ],
-            "label": safe_float(r.score),
+            "label": safe_float(score),
         })
 
     return dataset
@@ -346,17 +465,13 @@ async def get_assessment_dataset(session: AsyncSession, project_id: int) -> List
 # Envoy Training (ROBUST)
 # ============================================================
 
-async def envoy_train(
+async def prepare_envoy_training(
     session: AsyncSession,
     experiment_id: int,
     participant_id: int,
     project_id: int,
-    epochs: int = 10,
-    lr: float = 0.01,
-    batch_size: int = 8,
-    max_seconds: float = 2.0,
-) -> Dict[str, Any]:
-
+) -> Tuple[bytes, List[List[float]], List[float]]:
+    """Validate the request and read what train_local needs: (global blob, features, labels)."""
     exp = await session.get(FLExperiment, experiment_id)
     if not exp or exp.status not in {"STARTED", "TRAINING"}:
         raise ValueError("experiment not active")
@@ -370,74 +485,60 @@ async def envoy_train(
         raise ValueError("no dataset found")
 
     global_model = await get_global_model(session, experiment_id)
-    if not global_model:
+    global_state = load_weights(global_model) if global_model else None
+    if not global_state:
         raise ValueError("global model missing")
 
-    model = ConstructionLinearModel()
-    model.load_state_dict({
-        k: torch.tensor(v, dtype=torch.float32)
-        for k, v in global_model.weights.items()
-    })
-    model.train()
-
-    optimizer = optim.SGD(model.parameters(), lr=lr)
-    loss_fn = nn.MSELoss()
-
-    X = torch.tensor([d["features"] for d in local_dataset], dtype=torch.float32)
-    y = torch.tensor([[d["label"]] for d in local_dataset], dtype=torch.float32)
-
-    loader = DataLoader(
-        TensorDataset(X, y),
-        batch_size=batch_size,
-        shuffle=True
-    )
-
-    start = time.monotonic()
-    final_loss = None
-
-    for epoch in range(epochs):
-        epoch_loss = 0.0
-        for xb, yb in loader:
-            optimizer.zero_grad()
-            preds = model(xb)
-            loss = loss_fn(preds, yb)
-            loss.backward()
-
-            torch.nn.utils.clip_grad_norm_(model.parameters(), 1.0)
-            for p in model.parameters():
-                if p.grad is not None:
-                    p.grad += 0.001 * torch.randn_like(p.grad)
-
-            optimizer.step()
-            epoch_loss += loss.item()
+    global_blob = global_model.weights_blob or encode_state(global_state)
+    return global_blob, [d["features"] for d in local_dataset], [d["label"] for d in local_dataset]
 
-            if time.monotonic() - start >= max_seconds:
-                break
-
-        final_loss = epoch_loss / max(1, len(loader))
-        if time.monotonic() - start >= max_seconds:
-            break
-
-    trained_weights = sanitize_json({
-        k: v.tolist() for k, v in model.state_dict().items()
-    })
 
+async def upload_envoy_result(
+    session: AsyncSession,
+    experiment_id: int,
+    participant_id: int,
+    trained_blob: bytes,
+    metrics: Dict[str, Any],
+) -> Dict[str, Any]:
     await upload_weights(
         session,
         experiment_id,
         participant_id,
-        trained_weights,
-        len(local_dataset)
+        decode_state(trained_blob),
+        metrics["samples_trained"]
     )
 
-    await aggregate_round(session, experiment_id)
+    # The upload may have closed the round
+    exp = await session.get(FLExperiment, experiment_id, populate_existing=True)
 
     return {
         "experiment_id": experiment_id,
         "participant_id": participant_id,
         "round": exp.current_round,
-        "samples_trained": len(local_dataset),
-        "loss": safe_float(final_loss),
-        "epochs_completed": epoch + 1,
-        "training_seconds": round(time.monotonic() - start, 3),
+        "round_state": exp.round_state,
+        "samples_trained": metrics["samples_trained"],
+        "loss": safe_float(metrics["loss"]),
+        "epochs_completed": metrics["epochs_completed"],
+        "training_seconds": metrics["training_seconds"],
     }
+
+
+async def envoy_train(
+    session: AsyncSession,
+    experiment_id: int,
+    participant_id: int,
+    project_id: int,
+    epochs: int = 10,
+    lr: float = 0.01,
+    batch_size: int = 8,
+    max_seconds: float = 2.0,
+) -> Dict[str, Any]:
+    global_blob, features, labels = await prepare_envoy_training(session, experiment_id, participant_id, project_id)
+    # End the read transaction so no connection sits idle while the pool trains
+    await session.commit()
+
+    # The training loop runs in the process pool, off the event loop
+    trained_blob, metrics = await training_executor.run(
+        train_local, global_blob, features, labels, epochs, lr, batch_size, max_seconds
+    )
+    return await upload_envoy_result(session, experiment_id, participant_id, trained_blob, metrics)
@@ -0,0 +1,155 @@
+# app/services/fl_tensor_codec.py
+
+"""
+Binary encoding for FL model weights.
+
+Layout (the safetensors layout, so the blobs open with that library too):
+
+    [8 bytes]  little-endian u64 N, length of the header
+    [N bytes]  JSON header, space padded to a multiple of 8:
+               {name: {"dtype": "F32"|"F16"|"F64", "shape": [...], "data_offsets": [start, end]},
+                "__metadata__": {...}}
+    [...]      tensor buffers, contiguous, offsets relative to the end of the header
+
+Decoding uses torch.frombuffer, so each tensor is a view on the blob
+rather than a copy; treat decoded tensors as read-only.
+"""
+
+import hashlib
+import json
+import struct
+import warnings
+from typing import Any, Dict, List, Optional
+
+import torch
+
+DTYPES: Dict[str, torch.dtype] = {
+    "F32": torch.float32,
+    "F16": torch.float16,
+    "F64": torch.float64,
+}
+DTYPE_CODES: Dict[str, str] = {
+    "float32": "F32",
+    "float16": "F16",
+    "float64": "F64",
+}
+
+_HEADER_LEN = struct.Struct("<Q")
+_ALIGN = 8
+
+
+def _as_tensor(value: Any) -> torch.Tensor:
+    if isinstance(value, torch.Tensor):
+        return value.detach().cpu()
+    return torch.tensor(value, dtype=torch.float32)
+
+
+def encode_state(
+    state: Dict[str, Any],
+    dtype: str = "float32",
+    metadata: Optional[Dict[str, str]] = None,
+) -> bytes:
+    """
+    Encode a state dict (tensors or nested lists) into one blob. NaN/inf
+    become 0, matching what sanitize_json did for the JSON column.
+    """
+    code = DTYPE_CODES.get(dtype)
+    if code is None:
+        raise ValueError(f"unsupported dtype: {dtype}")
+    torch_dtype = DTYPES[code]
+
+    header: Dict[str, Any] = {}
+    if metadata:
+        header["__metadata__"] = {k: str(v) for k, v in metadata.items()}
+
+    buffers = []
+    offset = 0
+    for name in sorted(state):
+        t = torch.nan_to_num(_as_tensor(state[name]).to(torch_dtype), nan=0.0, posinf=0.0, neginf=0.0)
+        raw = t.contiguous().numpy().tobytes()
+        header[name] = {"dtype": code, "shape": list(t.shape), "data_offsets": [offset, offset + len(raw)]}
+        buffers.append(raw)
+        offset += len(raw)
+
+    header_bytes = json.dumps(header, separators=(",", ":")).encode("utf-8")
+    header_bytes += b" " * (-len(header_bytes) % _ALIGN)
+    return b"".join([_HEADER_LEN.pack(len(header_bytes)), header_bytes, *buffers])
+
+
+def to_tensors(state: Dict[str, Any]) -> Dict[str, torch.Tensor]:
+    """Nested lists or tensors -> {name: float32 tensor}."""
+    return {k: _as_tensor(v).to(torch.float32) for k, v in state.items()}
+
+
+def read_header(data: bytes) -> Dict[str, Any]:
+    if len(data) < _HEADER_LEN.size:
+        raise ValueError("truncated weights blob")
+    (n,) = _HEADER_LEN.unpack_from(data, 0)
+    if _HEADER_LEN.size + n > len(data):
+        raise ValueError("truncated weights blob")
+    return json.loads(bytes(data[_HEADER_LEN.size:_HEADER_LEN.size + n]))
+
+
+def read_shapes(data: bytes) -> Dict[str, List[int]]:
+    """Tensor shapes of a blob, without touching its buffers."""
+    return {k: v["shape"] for k, v in read_header(data).items() if k != "__metadata__"}
+
+
+def decode_state(data: bytes) -> Dict[str, torch.Tensor]:
+    """Decode a blob into {name: tensor}; tensors keep their stored dtype."""
+    header = read_header(data)
+    base = _HEADER_LEN.size + _HEADER_LEN.unpack_from(data, 0)[0]
+
+    state: Dict[str, torch.Tensor] = {}
+    with warnings.catch_warnings():
+        # bytes are immutable; the views are never written to
+        warnings.filterwarnings("ignore", message="The given buffer is not writable")
+        for name, info in header.items():
+            if name == "__metadata__":
+                continue
+            dtype = DTYPES.get(info["dtype"])
+            if dtype is None:
+                raise ValueError(f"unsupported dtype in blob: {info['dtype']}")
+            start, end = info["data_offsets"]
+            count = (end - start) // dtype.itemsize
+            if count == 0:
+                state[name] = torch.empty(info["shape"], dtype=dtype)
+                continue
+            state[name] = torch.frombuffer(data, dtype=dtype, count=count, offset=base + start).view(info["shape"])
+    return state
+
+
+def load_weights(row: Any) -> Optional[Dict[str, torch.Tensor]]:
+    """
+    Weights of an FLGlobalModel / FLWeightsUpload row as float32 tensors.
+    Reads the binary column when present and falls back to the legacy JSON
+    lists, so rows not yet converted by migrate_fl_weights.py keep working.
+    """
+    blob = getattr(row, "weights_blob", None)
+    if blob:
+        return {k: v.float() for k, v in decode_state(blob).items()}
+    weights = getattr(row, "weights", None)
+    if isinstance(weights, dict):
+        return {k: torch.tensor(v, dtype=torch.float32) for k, v in weights.items()}
+    return None
+
+
+def model_checksum(row: Any) -> Optional[str]:
+    """
+    SHA-256 identifying a global model's weights, which delta uploads quote
+    as their base. Legacy JSON rows are hashed through their float32 encoding.
+    """
+    checksum = getattr(row, "checksum", None)
+    if checksum:
+        return checksum
+    blob = getattr(row, "weights_blob", None)
+    if not blob:
+        state = load_weights(row)
+        if state is None:
+            return None
+        blob = encode_state(state)
+    return hashlib.sha256(blob).hexdigest()
+
+
+def state_to_json(state: Dict[str, torch.Tensor]) -> Dict[str, Any]:
+    return {k: v.tolist() for k, v in state.items()}
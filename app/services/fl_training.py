@@ -0,0 +1,102 @@
+# app/services/fl_training.py
+
+"""
+Local (envoy) training, free of any database or app state so it can run
+in the training process pool (services/fl_training_executor.py). Inputs
+and outputs are plain lists and weight blobs, which pickle cheaply.
+"""
+
+import time
+from typing import Any, Dict, List, Tuple
+
+import torch
+import torch.nn as nn
+import torch.optim as optim
+from torch.utils.data import DataLoader, TensorDataset
+
+from app.services.fl_tensor_codec import decode_state, encode_state
+
+
+class ConstructionLinearModel(nn.Module):
+    def __init__(self, input_dim: int = 6):
+        super().__init__()
+        self.net = nn.Sequential(
+            nn.Linear(input_dim, 16),
+            nn.ReLU(),
+            nn.Linear(16, 8),
+            nn.ReLU(),
+            nn.Linear(8, 1),
+        )
+
+    def forward(self, x):
+        return self.net(x)
+
+
+def default_model_state_dict() -> Dict[str, torch.Tensor]:
+    return ConstructionLinearModel().state_dict()
+
+
+def train_local(
+    global_blob: bytes,
+    features: List[List[float]],
+    labels: List[float],
+    epochs: int = 10,
+    lr: float = 0.01,
+    batch_size: int = 8,
+    max_seconds: float = 2.0,
+) -> Tuple[bytes, Dict[str, Any]]:
+    """
+    Train the construction model from the given global weights for up to
+    `epochs` / `max_seconds`. Returns the trained weights as a blob and
+    the training metrics.
+    """
+    model = ConstructionLinearModel()
+    model.load_state_dict({k: v.float() for k, v in decode_state(global_blob).items()})
+    model.train()
+
+    optimizer = optim.SGD(model.parameters(), lr=lr)
+    loss_fn = nn.MSELoss()
+
+    X = torch.tensor(features, dtype=torch.float32)
+    y = torch.tensor([[label] for label in labels], dtype=torch.float32)
+
+    loader = DataLoader(
+        TensorDataset(X, y),
+        batch_size=batch_size,
+        shuffle=True
+    )
+
+    start = time.monotonic()
+    final_loss = None
+    epochs_completed = 0
+
+    for epoch in range(epochs):
+        epoch_loss = 0.0
+        for xb, yb in loader:
+            optimizer.zero_grad()
+            preds = model(xb)
+            loss = loss_fn(preds, yb)
+            loss.backward()
+
+            torch.nn.utils.clip_grad_norm_(model.parameters(), 1.0)
+            for p in model.parameters():
+                if p.grad is not None:
+                    p.grad += 0.001 * torch.randn_like(p.grad)
+
+            optimizer.step()
+            epoch_loss += loss.item()
+
+            if time.monotonic() - start >= max_seconds:
+                break
+
+        final_loss = epoch_loss / max(1, len(loader))
+        epochs_completed = epoch + 1
+        if time.monotonic() - start >= max_seconds:
+            break
+
+    return encode_state(model.state_dict()), {
+        "samples_trained": len(features),
+        "loss": final_loss,
+        "epochs_completed": epochs_completed,
+        "training_seconds": round(time.monotonic() - start, 3),
+    }
@@ -0,0 +1,97 @@
+# app/services/fl_training_executor.py
+
+"""
+Bounded process pool for envoy training, so PyTorch loops never run on
+the event loop. Each pool process pins torch to FL_TRAINING_TORCH_THREADS
+intra-op threads (default: the CPUs split evenly between the pool's
+processes) so concurrent jobs don't oversubscribe the machine. The pool
+is per API worker and is created on first use.
+"""
+
+import asyncio
+import functools
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Optional
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+def _init_worker(threads: int) -> None:
+    import torch
+
+    torch.set_num_threads(threads)
+    try:
+        torch.set_num_interop_threads(1)
+    except RuntimeError:
+        # Already fixed once torch has run parallel work in this process
+        pass
+
+
+class TrainingExecutor:
+    def __init__(self, workers: int, torch_threads: int, max_pending: int):
+        self.workers = max(1, workers)
+        self.torch_threads = torch_threads or max(1, (os.cpu_count() or 1) // self.workers)
+        self.max_pending = max_pending
+        self._pending = 0
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    def has_capacity(self) -> bool:
+        return self._pending < self.max_pending
+
+    def reserve(self) -> None:
+        """Claim a queue slot ahead of run(..., reserved=True); pair with release()."""
+        if not self.has_capacity():
+            raise ValueError("training queue full")
+        self._pending += 1
+
+    def release(self) -> None:
+        self._pending = max(0, self._pending - 1)
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            # spawn: forking a process that holds an event loop and DB connections is unsafe
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(self.torch_threads,),
+            )
+            logger.info("Training pool started | workers=%s | torch_threads=%s", self.workers, self.torch_threads)
+        return self._pool
+
+    async def run(self, func: Callable[..., Any], *args: Any, reserved: bool = False) -> Any:
+        if not reserved:
+            self.reserve()
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._get_pool(), functools.partial(func, *args))
+        except BrokenProcessPool:
+            # A worker died (e.g. OOM); start a fresh pool for the next job
+            logger.error("Training pool broken; restarting")
+            self.shutdown()
+            raise
+        finally:
+            if not reserved:
+                self.release()
+
+    def shutdown(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+
+training_executor = TrainingExecutor(
+    settings.FL_TRAINING_WORKERS,
+    settings.FL_TRAINING_TORCH_THREADS,
+    settings.FL_TRAINING_MAX_PENDING,
+)
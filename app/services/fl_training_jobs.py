@@ -0,0 +1,170 @@
+# app/services/fl_training_jobs.py
+
+"""
+Envoy training jobs. POST /envoy/train only records an FLTrainingJob and
+returns its id; the job runs as an asyncio task in the API worker that
+accepted it, with the training loop itself in the process pool
+(fl_training_executor). Clients poll GET /fl/jobs/{id}.
+
+Each experiment runs at most params["max_concurrent_jobs"]
+(FL_MAX_JOBS_PER_EXPERIMENT) jobs at a time. Jobs orphaned by a restart
+are failed by expire_stale_jobs after FL_TRAINING_JOB_TIMEOUT_SECONDS.
+"""
+
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional, Set
+
+from sqlalchemy import func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.models.fl_experiment import FLExperiment
+from app.models.fl_participant import FLParticipant
+from app.models.fl_training_job import FLTrainingJob
+from app.services.fl_rounds import ACTIVE_STATUSES
+from app.services.fl_service import prepare_envoy_training, upload_envoy_result
+from app.services.fl_training import train_local
+from app.services.fl_training_executor import training_executor
+
+logger = logging.getLogger(__name__)
+
+QUEUED = "QUEUED"
+RUNNING = "RUNNING"
+SUCCEEDED = "SUCCEEDED"
+FAILED = "FAILED"
+
+# Strong references, so running jobs aren't garbage collected
+_running: Set[asyncio.Task] = set()
+
+
+def job_cap(exp: FLExperiment) -> int:
+    return int((exp.params or {}).get("max_concurrent_jobs", settings.FL_MAX_JOBS_PER_EXPERIMENT))
+
+
+async def submit_training_job(
+    session: AsyncSession,
+    experiment_id: int,
+    participant_id: int,
+    project_id: int,
+    epochs: int = 10,
+    lr: float = 0.01,
+) -> FLTrainingJob:
+    # Row lock so concurrent submits see each other's jobs when counting
+    exp = await session.get(FLExperiment, experiment_id, with_for_update=True, populate_existing=True)
+    if not exp or exp.status not in ACTIVE_STATUSES:
+        raise ValueError("experiment not active")
+
+    participant = await session.get(FLParticipant, participant_id)
+    if not participant or participant.experiment_id != experiment_id:
+        raise ValueError("not a participant")
+
+    active = (await session.execute(
+        select(func.count(FLTrainingJob.id))
+        .where(FLTrainingJob.experiment_id == experiment_id, FLTrainingJob.status.in_((QUEUED, RUNNING)))
+    )).scalar_one()
+    if active >= job_cap(exp):
+        raise ValueError("too many training jobs")
+
+    # Claimed now so a burst of submits gets 429s rather than jobs that fail
+    # later; run_training_job releases it
+    training_executor.reserve()
+    try:
+        job = FLTrainingJob(
+            experiment_id=experiment_id,
+            participant_id=participant_id,
+            project_id=project_id,
+            params={"epochs": epochs, "lr": lr},
+        )
+        session.add(job)
+        await session.commit()
+    except BaseException:
+        training_executor.release()
+        raise
+
+    task = asyncio.create_task(run_training_job(job.id), name=f"fl-training-job-{job.id}")
+    _running.add(task)
+    task.add_done_callback(_running.discard)
+    return job
+
+
+async def _finish(job_id: int, status: str, result: Optional[Dict[str, Any]] = None, error: Optional[str] = None) -> None:
+    async with AsyncSessionLocal() as session:
+        # Only RUNNING jobs: expire_stale_jobs may already have failed it
+        await session.execute(
+            update(FLTrainingJob)
+            .where(FLTrainingJob.id == job_id, FLTrainingJob.status == RUNNING)
+            .values(status=status, result=result, error=error, finished_at=datetime.utcnow())
+        )
+        await session.commit()
+
+
+async def run_training_job(job_id: int) -> None:
+    """Run a submitted job; owns the executor slot submit_training_job reserved."""
+    try:
+        await _run_training_job(job_id)
+    finally:
+        training_executor.release()
+
+
+async def _run_training_job(job_id: int) -> None:
+    # Read everything up front: no session (or pooled connection) is held
+    # while the process pool trains
+    async with AsyncSessionLocal() as session:
+        job = await session.get(FLTrainingJob, job_id)
+        if not job or job.status != QUEUED:
+            return
+        job.status = RUNNING
+        job.started_at = datetime.utcnow()
+        session.add(job)
+        await session.commit()
+
+        params = job.params or {}
+        try:
+            global_blob, features, labels = await prepare_envoy_training(
+                session, job.experiment_id, job.participant_id, job.project_id
+            )
+        except ValueError as e:
+            await session.rollback()
+            await _finish(job_id, FAILED, error=str(e))
+            return
+
+    try:
+        trained_blob, metrics = await training_executor.run(
+            train_local,
+            global_blob,
+            features,
+            labels,
+            params.get("epochs", 10),
+            params.get("lr", 0.01),
+            reserved=True,
+        )
+        async with AsyncSessionLocal() as session:
+            result = await upload_envoy_result(session, job.experiment_id, job.participant_id, trained_blob, metrics)
+    except Exception as e:
+        if not isinstance(e, (ValueError, PermissionError)):
+            logger.exception("FL training job failed | job_id=%s", job_id)
+        await _finish(job_id, FAILED, error=str(e) or type(e).__name__)
+        return
+
+    await _finish(job_id, SUCCEEDED, result=result)
+
+
+async def get_training_job(session: AsyncSession, job_id: int) -> Optional[FLTrainingJob]:
+    return await session.get(FLTrainingJob, job_id)
+
+
+async def expire_stale_jobs() -> None:
+    """Fail jobs left QUEUED / RUNNING by a worker that went away."""
+    cutoff = datetime.utcnow() - timedelta(seconds=settings.FL_TRAINING_JOB_TIMEOUT_SECONDS)
+    async with AsyncSessionLocal() as session:
+        result = await session.execute(
+            update(FLTrainingJob)
+            .where(FLTrainingJob.status.in_((QUEUED, RUNNING)), FLTrainingJob.created_at < cutoff)
+            .values(status=FAILED, error="timed out", finished_at=datetime.utcnow())
+        )
+        await session.commit()
+    if result.rowcount:
+        logger.warning("Expired %s stale FL training jobs", result.rowcount)
@@ -0,0 +1,184 @@
+# app/services/fl_update_codec.py
+
+"""
+Wire encodings for FL weight uploads (WeightsUploadRequest.weights).
+
+    dense   {name: nested list}                                   float32, as before
+    fp16    {name: {"shape", "data"}}                              half precision
+    int8    {name: {"shape", "scale", "data"}}                     value = data * scale
+    topk    {name: {"shape", "indices", "values"}}                 sparse update:
+            value = global[indices] + values, other coordinates keep the
+            current global model
+
+Array fields are base64 little-endian buffers (int8 / float16 / int32 /
+float32) or plain JSON lists. Uploads are decoded straight into one flat
+float32 vector in the global model's ParameterLayout, which is what the
+aggregation code consumes.
+
+With delta=True the dense / fp16 / int8 payload is the difference from
+the round's global model rather than the trained weights; topk is always
+a delta. Deltas name their base by checksum (fl_tensor_codec.model_checksum)
+and fl_service rejects stale ones.
+"""
+
+import base64
+from typing import Any, Dict, Optional, Tuple
+
+import torch
+
+from app.services.fl_aggregation import ParameterLayout
+from app.services.fl_tensor_codec import to_tensors
+
+ENCODINGS = ("dense", "fp16", "int8", "topk")
+
+DEFAULT_TOPK_RATIO = 0.01
+
+
+def _buffer(value: Any, dtype: torch.dtype) -> torch.Tensor:
+    if isinstance(value, str):
+        try:
+            raw = base64.b64decode(value, validate=True)
+        except ValueError:
+            raise ValueError("invalid base64 buffer")
+        if len(raw) % dtype.itemsize:
+            raise ValueError("buffer length does not match its dtype")
+        if not raw:
+            return torch.empty(0, dtype=dtype)
+        return torch.frombuffer(bytearray(raw), dtype=dtype)
+    if isinstance(value, list):
+        return torch.tensor(value, dtype=dtype).reshape(-1)
+    raise ValueError("expected a base64 string or a list")
+
+
+def _b64(t: torch.Tensor) -> str:
+    return base64.b64encode(t.contiguous().numpy().tobytes()).decode("ascii")
+
+
+def decode_update(
+    weights: Dict[str, Any],
+    encoding: str,
+    layout: Optional[ParameterLayout],
+    base: Optional[torch.Tensor] = None,
+    delta: bool = False,
+) -> Tuple[ParameterLayout, torch.Tensor, int]:
+    """
+    Decode an upload into (layout, flat float32 vector of full weights,
+    encoded tensor bytes). `layout` and `base` come from the current global
+    model; deltas need both, full dense uploads can fall back to their own
+    layout.
+    """
+    if encoding not in ENCODINGS:
+        raise ValueError(f"unsupported encoding: {encoding}")
+    if not isinstance(weights, dict) or not weights:
+        raise ValueError("weights missing")
+    delta = delta or encoding == "topk"
+    if delta and (layout is None or base is None):
+        raise ValueError("global model missing")
+
+    if encoding == "dense":
+        state = to_tensors(weights)
+        layout = layout or ParameterLayout.from_state(state)
+        if not layout.matches(state):
+            raise ValueError("weights do not match the global model")
+        vector = layout.flatten(state)
+        # NaN / Infinity parse from JSON; one would poison the round's running sum
+        torch.nan_to_num_(vector, nan=0.0, posinf=0.0, neginf=0.0)
+        if delta:
+            vector += base
+        return layout, vector, layout.numel * 4
+
+    if layout is None:
+        raise ValueError("global model missing")
+    if set(weights) != set(layout.names):
+        raise ValueError("weights do not match the global model")
+
+    if encoding == "topk":
+        out = torch.zeros(layout.numel, dtype=torch.float32)
+    else:
+        out = torch.empty(layout.numel, dtype=torch.float32)
+
+    payload_bytes = 0
+    offset = 0
+    for name, shape, size in zip(layout.names, layout.shapes, layout.sizes):
+        entry = weights[name]
+        if not isinstance(entry, dict):
+            raise ValueError(f"{name}: expected an object for {encoding} encoding")
+        if "shape" in entry and tuple(entry["shape"]) != shape:
+            raise ValueError("weights do not match the global model")
+        dst = out[offset:offset + size]
+
+        if encoding == "fp16":
+            data = _buffer(entry.get("data"), torch.float16)
+            if data.numel() != size:
+                raise ValueError(f"{name}: expected {size} values")
+            dst.copy_(data)
+            payload_bytes += size * 2
+
+        elif encoding == "int8":
+            data = _buffer(entry.get("data"), torch.int8)
+            if data.numel() != size:
+                raise ValueError(f"{name}: expected {size} values")
+            try:
+                scale = float(entry["scale"])
+            except (KeyError, TypeError, ValueError):
+                raise ValueError(f"{name}: scale missing")
+            dst.copy_(data).mul_(scale)
+            payload_bytes += size + 4
+
+        else:
+            indices = _buffer(entry.get("indices"), torch.int32).long()
+            values = _buffer(entry.get("values"), torch.float32)
+            if indices.numel() != values.numel():
+                raise ValueError(f"{name}: indices and values differ in length")
+            if indices.numel():
+                if int(indices.min()) < 0 or int(indices.max()) >= size:
+                    raise ValueError(f"{name}: index out of range")
+                dst.index_add_(0, indices, values)
+            payload_bytes += indices.numel() * 8
+
+        offset += size
+
+    torch.nan_to_num_(out, nan=0.0, posinf=0.0, neginf=0.0)
+    if delta:
+        out += base
+    return layout, out, payload_bytes
+
+
+def encode_update(
+    state: Dict[str, torch.Tensor],
+    encoding: str,
+    base_state: Optional[Dict[str, torch.Tensor]] = None,
+    topk_ratio: float = DEFAULT_TOPK_RATIO,
+    delta: bool = False,
+) -> Dict[str, Any]:
+    """Client side of decode_update, for envoys and scripts."""
+    if encoding not in ENCODINGS:
+        raise ValueError(f"unsupported encoding: {encoding}")
+    delta = delta or encoding == "topk"
+    if delta and base_state is None:
+        raise ValueError("deltas need the global model they are relative to")
+
+    out: Dict[str, Any] = {}
+    for name, value in to_tensors(state).items():
+        shape = list(value.shape)
+        flat = value.reshape(-1)
+        if delta:
+            flat = flat - base_state[name].reshape(-1).to(torch.float32)
+            value = flat.view(shape)
+        if encoding == "dense":
+            out[name] = value.tolist()
+        elif encoding == "fp16":
+            out[name] = {"shape": shape, "data": _b64(flat.to(torch.float16))}
+        elif encoding == "int8":
+            scale = float(flat.abs().max()) / 127 if flat.numel() else 0.0
+            q = (flat / scale).round().clamp(-127, 127) if scale else torch.zeros_like(flat)
+            out[name] = {"shape": shape, "scale": scale, "data": _b64(q.to(torch.int8))}
+        else:
+            k = min(flat.numel(), max(1, int(flat.numel() * topk_ratio)))
+            indices = flat.abs().topk(k).indices.sort().values
+            out[name] = {
+                "shape": shape,
+                "indices": _b64(indices.to(torch.int32)),
+                "values": _b64(flat[indices]),
+            }
+    return out
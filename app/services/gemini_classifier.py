@@ -1,3 +1,12 @@
+import hashlib
+import json
+import re
+from functools import lru_cache
+from typing import Iterable
+
+from app.core.config import settings
+
+
 def extract_gemini_text(gemini_response: dict | None) -> str:
     """Extracts text from a Gemini response dictionary.
 
@@ -10,6 +19,11 @@ def extract_gemini_text(gemini_response: dict | None) -> str:
     if gemini_response is None:
         return ""
 
+    # Normalized responses (see gemini_response.normalize_gemini_response)
+    text = gemini_response.get("text")
+    if isinstance(text, str):
+        return text
+
     # Navigate through the nested structure to find the text
     try:
         return gemini_response["candidates"][0]["message"]["content"]["text"]
@@ -17,12 +31,40 @@ def extract_gemini_text(gemini_response: dict | None) -> str:
         return ""
 
 
+def _compile(keywords: Iterable[str]) -> re.Pattern | None:
+    # Longest first so overlapping keywords prefer the more specific phrase
+    words = sorted({k.strip() for k in keywords if k.strip()}, key=len, reverse=True)
+    if not words:
+        return None
+    return re.compile("|".join(re.escape(w) for w in words), re.IGNORECASE)
+
+
+class KeywordMatcher:
+    """
+    One compiled alternation per keyword set, so each label is a single
+    C-level scan of the text instead of one `in` check per keyword.
+    """
+
+    def __init__(self, critical: Iterable[str], non_compliant: Iterable[str]):
+        critical, non_compliant = list(critical), list(non_compliant)
+        self._critical = _compile(critical)
+        self._non_compliant = _compile(non_compliant)
+        # Stored with each assessment so the re-classification job can skip current rows
+        digest = hashlib.sha256(json.dumps([sorted(critical), sorted(non_compliant)]).encode()).hexdigest()
+        self.version = digest[:16]
+
+    def classify(self, text: str) -> dict:
+        text = text or ""
+        return {
+            "critical": bool(self._critical and self._critical.search(text)),
+            "compliant": not (self._non_compliant and self._non_compliant.search(text)),
+        }
+
+
+@lru_cache(maxsize=1)
+def get_matcher() -> KeywordMatcher:
+    return KeywordMatcher(settings.CRITICAL_KEYWORDS, settings.NON_COMPLIANT_KEYWORDS)
+
+
 def classify(text: str) -> dict:
-    t = text.lower()
-
-    return {
-        "critical": any(k in t for k in [
-            "fall", "missing harness", "exposed rebar", "impalement"
-        ]),
-        "complaint": "recommended" not in t and "unable" not in t,
-    }
\ No newline at end of file
+    return get_matcher().classify(text)
@@ -0,0 +1,128 @@
+# app/services/gemini_response.py
+
+from typing import Any, Dict, List, Optional
+
+
+def normalize_gemini_response(response: Any) -> Dict[str, Any]:
+    """
+    Normalize any Gemini result into a fixed, JSON-safe schema:
+
+        {
+            "text": str,
+            "candidates": [{"text": str, "finish_reason": str | None}],
+            "usage": {"prompt_tokens", "candidates_tokens", "total_tokens"} | None,
+            "finish_reason": str | None,
+        }
+
+    Accepts a raw GenerateContentResponse, the dicts returned by
+    gemini_service ({"text": ..., "raw": <response>}) or an already
+    normalized dict. Every attribute is visited once and nothing is
+    round-tripped through json.dumps, so the cost is linear in the
+    number of candidate parts.
+    """
+    if response is None:
+        return _empty("")
+
+    if isinstance(response, dict):
+        return _normalize_dict(response)
+
+    if isinstance(response, str):
+        return _empty(response)
+
+    candidates = _candidates(getattr(response, "candidates", None))
+    usage = _usage(getattr(response, "usage_metadata", None))
+
+    if candidates:
+        text = candidates[0]["text"]
+    else:
+        text = getattr(response, "output_text", None)
+        if not isinstance(text, str):
+            text = str(response)
+
+    return {
+        "text": text,
+        "candidates": candidates,
+        "usage": usage,
+        "finish_reason": candidates[0]["finish_reason"] if candidates else None,
+    }
+
+
+def _normalize_dict(response: Dict[str, Any]) -> Dict[str, Any]:
+    text = response.get("text")
+    raw = response.get("raw")
+    candidates = response.get("candidates")
+
+    if not isinstance(candidates, list) and raw is not None and not isinstance(raw, (str, dict)):
+        normalized = normalize_gemini_response(raw)
+        if isinstance(text, str) and text and not normalized["candidates"]:
+            normalized["text"] = text
+        return normalized
+
+    if isinstance(candidates, list):
+        candidates = [
+            {
+                "text": c.get("text", "") if isinstance(c, dict) else str(c),
+                "finish_reason": c.get("finish_reason") if isinstance(c, dict) else None,
+            }
+            for c in candidates
+        ]
+    else:
+        candidates = []
+
+    if not isinstance(text, str):
+        text = candidates[0]["text"] if candidates else ""
+
+    usage = response.get("usage")
+    return {
+        "text": text,
+        "candidates": candidates,
+        "usage": usage if isinstance(usage, dict) else None,
+        "finish_reason": response.get("finish_reason") or (
+            candidates[0]["finish_reason"] if candidates else None
+        ),
+    }
+
+
+def _candidates(candidates: Any) -> List[Dict[str, Any]]:
+    if not candidates:
+        return []
+
+    out = []
+    for c in candidates:
+        content = getattr(c, "content", None)
+        parts = getattr(content, "parts", None) or []
+        texts = []
+        for p in parts:
+            t = getattr(p, "text", None)
+            if isinstance(t, str):
+                texts.append(t)
+        out.append({
+            "text": "".join(texts),
+            "finish_reason": _enum_name(getattr(c, "finish_reason", None)),
+        })
+    return out
+
+
+def _usage(usage: Any) -> Optional[Dict[str, Optional[int]]]:
+    if usage is None:
+        return None
+    return {
+        "prompt_tokens": _int_or_none(getattr(usage, "prompt_token_count", None)),
+        "candidates_tokens": _int_or_none(getattr(usage, "candidates_token_count", None)),
+        "total_tokens": _int_or_none(getattr(usage, "total_token_count", None)),
+    }
+
+
+def _enum_name(value: Any) -> Optional[str]:
+    if value is None:
+        return None
+    name = getattr(value, "name", None)
+    return name if isinstance(name, str) else str(value)
+
+
+def _int_or_none(value: Any) -> Optional[int]:
+    return value if isinstance(value, int) else None
+
+
+def _empty(text: str) -> Dict[str, Any]:
+    return {"text": text, "candidates": [], "usage": None, "finish_reason": None}
@@ -1,14 +1,22 @@
 # app/services/gemini_service.py
 
 import asyncio
+import io
 import logging
-from typing import Optional, Dict, Any, List
-from datetime import datetime
+import time
+from typing import Optional, Dict, Any, List, Union
 
 import httpx
 
 from app.core.config import settings
 from app.core.logging import request_id_ctx_var
+from app.services.gemini_response import normalize_gemini_response
+from app.services.video_segmentation import (
+    merge_timeline,
+    parse_segment_findings,
+    plan_segments,
+    probe_video_duration,
+)
 
 from google import genai
 from google.genai import types
@@ -38,7 +46,7 @@ async def _call_gemini(prompt: str, model: Optional[str] = None) -> Dict[str, An
 
     try:
         response = await asyncio.to_thread(sync_call)
-        return {"text": getattr(response, "output_text", str(response))}
+        return normalize_gemini_response(response)
     except Exception as exc:
         # If quota exhausted, return simple message
         err_str = str(exc)
@@ -69,7 +77,7 @@ async def analyze_document(
         response = await asyncio.to_thread(sync_call)
         return {
             "raw": response,
-            "text": getattr(response, "output_text", str(response)),
+            **normalize_gemini_response(response),
         }
     except Exception as exc:
         err_str = str(exc)
@@ -125,7 +133,7 @@ async def analyze_video(
         return {
             "project_id": project_id,
             "raw": response,
-            "text": getattr(response, "output_text", str(response)),
+            **normalize_gemini_response(response),
         }
 
     except Exception as exc:
@@ -150,6 +158,187 @@ async def analyze_video(
         }
 
 
+VIDEO_SEGMENT_PROMPT = (
+    "Project ID: {project_id}\n"
+    "You are an expert construction safety and risk analyst.\n"
+    "Only analyze the part of the video between {start:.0f}s and {end}.\n"
+    "Return a JSON array of hazards. Each item must have: hazard_type, "
+    "risk_level (low|medium|high|critical), location, start_seconds, "
+    "end_seconds (seconds from the start of the FULL video) and "
+    "recommendations (array of strings). Return [] if nothing is found.\n\n"
+    "{prompt}"
+)
+
+
+def _upload_video_file(client: genai.Client, video: Union[bytes, str], mime_type: str):
+    """Upload once through the Files API and wait until it can be referenced."""
+    uploaded = client.files.upload(
+        file=video if isinstance(video, str) else io.BytesIO(video),
+        config=types.UploadFileConfig(mime_type=mime_type),
+    )
+    deadline = time.monotonic() + settings.VIDEO_UPLOAD_PROCESSING_TIMEOUT_SECONDS
+    while getattr(uploaded.state, "name", uploaded.state) == "PROCESSING":
+        if time.monotonic() >= deadline:
+            try:
+                client.files.delete(name=uploaded.name)
+            except Exception:
+                logger.debug("Failed to delete uploaded video %s", uploaded.name)
+            raise TimeoutError(
+                f"Video still processing after {settings.VIDEO_UPLOAD_PROCESSING_TIMEOUT_SECONDS:.0f}s"
+            )
+        time.sleep(2)
+        uploaded = client.files.get(name=uploaded.name)
+
+    if getattr(uploaded.state, "name", uploaded.state) != "ACTIVE":
+        raise RuntimeError(f"Video processing failed: {uploaded.state}")
+    return uploaded
+
+
+async def analyze_video_segments(
+    *,
+    project_id: int,
+    prompt: str,
+    video_bytes: Optional[bytes] = None,
+    video_path: Optional[str] = None,
+    mime_type: str = "video/mp4",
+    duration_seconds: Optional[float] = None,
+    model: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    Analyze a long video as concurrent time segments.
+
+    The video is uploaded once and every segment references it with its own
+    start/end offsets, so wall-clock time scales with
+    VIDEO_ANALYSIS_CONCURRENCY rather than video length. Per-segment
+    findings are merged into a single deduplicated hazard timeline.
+
+    Pass `video_path` (e.g. a blob store path) to avoid buffering the video
+    in memory; `video_bytes` is accepted for callers that already hold it.
+    """
+    client = _configure_google_client()
+    model_name = model or settings.GEMINI_MODEL
+    video = video_path if video_path is not None else video_bytes
+    if video is None:
+        raise ValueError("video_bytes or video_path is required")
+
+    if duration_seconds is None:
+        duration_seconds = await probe_video_duration(video)
+    segments = plan_segments(duration_seconds, settings.VIDEO_SEGMENT_SECONDS)
+
+    try:
+        uploaded = await asyncio.to_thread(_upload_video_file, client, video, mime_type)
+    except Exception as exc:
+        err_str = str(exc)
+        logger.exception(
+            "Video upload to Gemini failed",
+            extra={"project_id": project_id, "request_id": request_id_ctx_var.get()},
+        )
+        if "RESOURCE_EXHAUSTED" in err_str or "429" in err_str:
+            err_str = "You have run out of quota. Please check your plan or billing."
+        return {
+            "project_id": project_id,
+            "text": f"AI service error: {err_str}",
+            "error": err_str,
+            "segments": [],
+            "timeline": [],
+        }
+
+    semaphore = asyncio.Semaphore(max(1, settings.VIDEO_ANALYSIS_CONCURRENCY))
+
+    async def run_segment(index: int, start: float, end: Optional[float]) -> Dict[str, Any]:
+        video_part = types.Part(
+            file_data=types.FileData(file_uri=uploaded.uri, mime_type=mime_type),
+        )
+        if end is not None:
+            video_part.video_metadata = types.VideoMetadata(
+                start_offset=f"{start:.0f}s",
+                end_offset=f"{end:.0f}s",
+            )
+        segment_prompt = VIDEO_SEGMENT_PROMPT.format(
+            project_id=project_id,
+            start=start,
+            end=f"{end:.0f}s" if end is not None else "the end",
+            prompt=prompt,
+        )
+
+        def sync_call():
+            return client.models.generate_content(
+                model=model_name,
+                contents=[types.Content(role="user", parts=[video_part, types.Part(text=segment_prompt)])],
+                config=types.GenerateContentConfig(response_mime_type="application/json"),
+            )
+
+        segment = {"index": index, "start_seconds": start, "end_seconds": end}
+        async with semaphore:
+            try:
+                response = await asyncio.to_thread(sync_call)
+                text = normalize_gemini_response(response)["text"]
+                segment["findings"] = parse_segment_findings(text, start, end)
+            except Exception as exc:
+                logger.warning(
+                    "Video segment analysis failed | project_id=%s | segment=%s | error=%s",
+                    project_id,
+                    index,
+                    exc,
+                )
+                segment["findings"] = []
+                segment["error"] = str(exc)
+        return segment
+
+    try:
+        results = await asyncio.gather(
+            *(run_segment(i, s, e) for i, (s, e) in enumerate(segments))
+        )
+    finally:
+        try:
+            await asyncio.to_thread(client.files.delete, name=uploaded.name)
+        except Exception:
+            logger.debug("Failed to delete uploaded video %s", uploaded.name)
+
+    timeline = merge_timeline(
+        [f for seg in results for f in seg["findings"]],
+        gap_seconds=settings.VIDEO_TIMELINE_MERGE_GAP_SECONDS,
+    )
+    failed = sum(1 for seg in results if "error" in seg)
+
+    summary = [
+        f"{h['start_seconds']:.0f}s-{h['end_seconds']:.0f}s {h['hazard_type']} ({h['risk_level'] or 'unrated'})"
+        for h in timeline
+    ]
+    error = None
+    if failed == len(results):
+        # Nothing was analyzed: not the same as a clean video
+        error = f"all {failed} video segments failed analysis"
+        text = f"AI service error: {error}"
+    elif failed:
+        summary.insert(0, (
+            f"Analysis incomplete: {failed} of {len(results)} segments failed; "
+            "hazards in those time ranges are unknown."
+        ))
+        text = "\n".join(summary if timeline else summary + ["No hazards detected in the analyzed segments"])
+    else:
+        text = "\n".join(summary) or "No hazards detected"
+
+    return {
+        "project_id": project_id,
+        "text": text,
+        **({"error": error} if error else {}),
+        "duration_seconds": duration_seconds,
+        "segments": [
+            {
+                "index": seg["index"],
+                "start_seconds": seg["start_seconds"],
+                "end_seconds": seg["end_seconds"],
+                "findings": len(seg["findings"]),
+                **({"error": seg["error"]} if "error" in seg else {}),
+            }
+            for seg in results
+        ],
+        "failed_segments": failed,
+        "timeline": timeline,
+    }
+
+
 async def analyze_image(
     image_bytes: bytes,
     prompt: str,
@@ -171,7 +360,7 @@ async def analyze_image(
         response = await asyncio.to_thread(sync_call)
         return {
             "raw": response,
-            "text": getattr(response, "output_text", str(response)),
+            **normalize_gemini_response(response),
         }
     except Exception as exc:
         err_str = str(exc)
@@ -255,25 +444,6 @@ async def archive_assessment(
     return {"archived": assessment_id, "notes": notes}
 
 
-async def log_trend(
-    project_id: int,
-    metric: str,
-    value: float,
-    timestamp: Optional[str] = None,
-) -> Dict[str, Any]:
-    ts = timestamp or datetime.utcnow().isoformat()
-    logger.info(
-        "Trend log",
-        extra={
-            "project_id": project_id,
-            "metric": metric,
-            "value": value,
-            "ts": ts,
-        },
-    )
-    return {"ok": True}
-
-
 async def verify_compliance(
     text: str,
     regulation_query: Optional[str] = None,
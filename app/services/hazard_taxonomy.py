@@ -0,0 +1,107 @@
+# app/services/hazard_taxonomy.py
+
+import re
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.hazard_type import HazardType, RiskLevel
+
+
+class TaxonomyEntry(NamedTuple):
+    slug: str
+    name: str
+    default_risk: RiskLevel
+    keywords: Tuple[str, ...]
+
+
+# Checked in order, first match wins: specific categories come before the
+# broad ones ("falling object" is struck-by, not a fall; "rebar" before "fall").
+TAXONOMY: List[TaxonomyEntry] = [
+    TaxonomyEntry("impalement", "Impalement / exposed rebar", RiskLevel.HIGH, ("rebar", "impale", "protruding", "spike")),
+    TaxonomyEntry("electrical", "Electrical", RiskLevel.HIGH, ("electric", "wiring", "live wire", "cable", "shock", "power line")),
+    TaxonomyEntry("excavation", "Excavation / trench collapse", RiskLevel.HIGH, ("excavat", "trench", "cave-in", "shoring", "collapse")),
+    TaxonomyEntry("struck_by", "Struck by object or plant", RiskLevel.HIGH, ("falling object", "falling debris", "dropped object", "struck", "crane", "suspended load", "excavator", "forklift", "vehicle", "machinery", "reversing")),
+    TaxonomyEntry("confined_space", "Confined space", RiskLevel.HIGH, ("confined space",)),
+    TaxonomyEntry("fire", "Fire / hot work", RiskLevel.HIGH, ("fire", "hot work", "welding", "flammable", "extinguisher")),
+    TaxonomyEntry("hazardous_substances", "Hazardous substances", RiskLevel.MEDIUM, ("chemical", "silica", "asbestos", "fumes", "dust", "hazardous substance")),
+    TaxonomyEntry("fall_from_height", "Fall from height", RiskLevel.HIGH, ("fall", "height", "edge", "scaffold", "ladder", "guardrail", "guard rail", "roof", "harness", "opening")),
+    TaxonomyEntry("ppe", "Missing or improper PPE", RiskLevel.MEDIUM, ("ppe", "helmet", "hard hat", "hardhat", "hi-vis", "high-vis", "vest", "gloves", "goggles", "boots", "protective")),
+    TaxonomyEntry("housekeeping", "Housekeeping / slips and trips", RiskLevel.LOW, ("trip", "slip", "debris", "clutter", "housekeeping", "obstruct", "material storage")),
+    TaxonomyEntry("other", "Other", RiskLevel.MEDIUM, ()),
+]
+
+OTHER_SLUG = "other"
+
+_TYPE_PATTERNS = [
+    (entry, re.compile(r"\b(?:" + "|".join(re.escape(k) for k in entry.keywords) + ")", re.IGNORECASE))
+    for entry in TAXONOMY
+    if entry.keywords
+]
+_DEFAULT_RISK = {entry.slug: entry.default_risk for entry in TAXONOMY}
+
+_RISK_WORDS = [
+    (RiskLevel.CRITICAL, re.compile(r"\b(critical|severe|extreme|imminent)\b", re.IGNORECASE)),
+    (RiskLevel.HIGH, re.compile(r"\bhigh\b", re.IGNORECASE)),
+    (RiskLevel.MEDIUM, re.compile(r"\b(medium|moderate)\b", re.IGNORECASE)),
+    (RiskLevel.LOW, re.compile(r"\b(low|minor)\b", re.IGNORECASE)),
+]
+
+
+def canonical_type(hazard_type: Optional[str]) -> str:
+    """Map a free-text hazard label to a taxonomy slug."""
+    text = hazard_type or ""
+    for entry, pattern in _TYPE_PATTERNS:
+        if pattern.search(text):
+            return entry.slug
+    return OTHER_SLUG
+
+
+def canonical_risk(risk_level: Optional[str], slug: str, hazard_type: Optional[str] = None) -> RiskLevel:
+    """
+    Parse the risk label; Gemini often leaves it empty, so fall back to a
+    risk word in the hazard title and then to the category default.
+    """
+    for text in (risk_level, hazard_type):
+        if not text:
+            continue
+        for level, pattern in _RISK_WORDS:
+            if pattern.search(text):
+                return level
+    return _DEFAULT_RISK.get(slug, RiskLevel.UNKNOWN)
+
+
+# slug -> HazardType.id, only for committed rows (the migration seeds TAXONOMY)
+_type_ids: Dict[str, int] = {}
+
+
+async def resolve_type_ids(session: AsyncSession, slugs: Iterable[str]) -> Dict[str, int]:
+    """Return ids for the given slugs, inserting taxonomy rows that don't exist yet."""
+    slugs = set(slugs)
+    missing = slugs - _type_ids.keys()
+    if missing:
+        rows = await session.execute(select(HazardType.slug, HazardType.id).where(HazardType.slug.in_(missing)))
+        _type_ids.update(dict(rows.all()))
+
+    ids = {s: _type_ids[s] for s in slugs if s in _type_ids}
+    new = slugs - ids.keys()
+    if new:
+        # A category added to TAXONOMY after the seed migration; not cached
+        # because the caller's transaction could still roll back
+        entries = {entry.slug: entry for entry in TAXONOMY}
+        await session.execute(
+            insert(HazardType)
+            .values([{"slug": s, "name": entries[s].name, "default_risk": entries[s].default_risk} for s in new])
+            .on_conflict_do_nothing(index_elements=["slug"])
+        )
+        rows = await session.execute(select(HazardType.slug, HazardType.id).where(HazardType.slug.in_(new)))
+        ids.update(dict(rows.all()))
+    return ids
+
+
+async def type_names(session: AsyncSession) -> Dict[int, Tuple[str, str]]:
+    """HazardType id -> (slug, name) for labelling aggregated results."""
+    rows = await session.execute(select(HazardType.id, HazardType.slug, HazardType.name))
+    return {i: (slug, name) for i, slug, name in rows.all()}
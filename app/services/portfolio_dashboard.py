@@ -0,0 +1,115 @@
+# app/services/portfolio_dashboard.py
+
+import logging
+import time
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.models.fl_experiment import FLExperiment
+from app.models.labor import Labor
+from app.models.portfolio_snapshot import PortfolioSnapshot
+from app.models.project import Project, ProjectStatus
+from app.models.tax import TaxStatus, TaxSubmission
+
+logger = logging.getLogger(__name__)
+
+
+SNAPSHOT_ID = 1
+
+
+async def compute_portfolio_metrics(session: AsyncSession) -> Dict[str, Any]:
+    """All dashboard counts in one round trip (one scalar subquery per count)."""
+    counts = select(
+        select(func.count(Project.id)).scalar_subquery(),
+        select(func.count(Project.id)).where(Project.status == ProjectStatus.ACTIVE).scalar_subquery(),
+        select(func.count(Labor.id))
+        .join(Project, Labor.project_id == Project.id)
+        .where(Project.status == ProjectStatus.ACTIVE)
+        .scalar_subquery(),
+        select(func.count(FLExperiment.id)).scalar_subquery(),
+        select(func.count(TaxSubmission.id)).scalar_subquery(),
+        select(func.count(TaxSubmission.id)).where(TaxSubmission.status != TaxStatus.VALIDATED).scalar_subquery(),
+    )
+    total_projects, active_projects, labor_active, fl_experiments, tax_total, tax_risky = (await session.execute(counts)).one()
+
+    return {
+        "projects": {
+            "total": total_projects,
+            "active": active_projects,
+        },
+        "laborForceIndex": round(labor_active / active_projects if active_projects else 0.0, 2),
+        "flModelDrift": round(fl_experiments / max(total_projects, 1), 2),
+        "financialRiskScore": round(tax_risky / tax_total if tax_total else 0.0, 2),
+    }
+
+
+class PortfolioDashboard:
+    """
+    Serves the government dashboard from a snapshot row refreshed in the
+    background. Each worker keeps the last snapshot for
+    PORTFOLIO_CACHE_SECONDS. Relevant writes call mark_dirty(), and the
+    periodic refresh then recomputes within PORTFOLIO_DIRTY_CHECK_SECONDS.
+    Otherwise it recomputes every PORTFOLIO_REFRESH_SECONDS.
+    """
+
+    def __init__(self):
+        self._payload: Optional[Dict[str, Any]] = None
+        self._loaded_at = 0.0
+        self._refreshed_at = 0.0
+        self._dirty = True
+
+    def mark_dirty(self) -> None:
+        self._dirty = True
+
+    async def get(self, session: AsyncSession) -> Dict[str, Any]:
+        if self._payload is not None and time.monotonic() - self._loaded_at < settings.PORTFOLIO_CACHE_SECONDS:
+            return self._payload
+
+        snapshot = await session.get(PortfolioSnapshot, SNAPSHOT_ID)
+        if snapshot is None:
+            # First hit before the background refresh has run
+            return await self.refresh(session)
+        return self._remember({**snapshot.metrics, "computedAt": snapshot.computed_at})
+
+    async def refresh(self, session: AsyncSession) -> Dict[str, Any]:
+        self._dirty = False
+        metrics = await compute_portfolio_metrics(session)
+        computed_at = datetime.utcnow()
+
+        stmt = insert(PortfolioSnapshot).values(id=SNAPSHOT_ID, metrics=metrics, computed_at=computed_at)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[PortfolioSnapshot.__table__.c.id],
+            set_={"metrics": stmt.excluded.metrics, "computed_at": stmt.excluded.computed_at},
+        )
+        await session.execute(stmt)
+        await session.commit()
+
+        self._refreshed_at = time.monotonic()
+        return self._remember({**metrics, "computedAt": computed_at})
+
+    async def refresh_if_needed(self) -> None:
+        """Periodic task body: recompute when marked dirty or when the snapshot is due."""
+        due = time.monotonic() - self._refreshed_at >= settings.PORTFOLIO_REFRESH_SECONDS
+        if not (self._dirty or due):
+            return
+        async with AsyncSessionLocal() as session:
+            await self.refresh(session)
+        logger.debug("Portfolio snapshot refreshed")
+
+    def _remember(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        self._payload = payload
+        self._loaded_at = time.monotonic()
+        return payload
+
+
+portfolio_dashboard = PortfolioDashboard()
+
+
+def mark_portfolio_dirty() -> None:
+    portfolio_dashboard.mark_dirty()
@@ -1,15 +1,25 @@
-from typing import List, Optional, Dict, Any
+import asyncio
+from typing import List, Optional, Dict, Any, Tuple
 from datetime import datetime
 import json
-from sqlalchemy import select, insert, update, delete, func, text
+from sqlalchemy import select, insert, update, delete, func, text, tuple_
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import defer
+
+from app.core.pagination import clamp_limit, decode_cursor, encode_cursor
+from app.core.signing import build_signed_url
 
 from app.models.project import Project
 from app.models.project_document import ProjectDocument
 from app.models.ai_config import AIConfig, AIConfigAudit
 from app.models.contractor import Contractor
+from app.models.user import Role
 from app.models.enforcement_action import EnforcementAction
 from app.services.auth_service import get_user_by_username
+from app.services.blob_gc import queue_blob_deletion
+from app.services.blob_store import get_blob_store
+from app.services.portfolio_dashboard import mark_portfolio_dirty
+from app.services.search_service import index_document, remove_entries
 
 
 async def create_project(session: AsyncSession, contractor_id: int, name: str, description: Optional[str] = None) -> Project:
@@ -21,6 +31,7 @@ async def create_project(session: AsyncSession, contractor_id: int, name: str, d
     project = Project(contractor_id=contractor_id, name=name, description=description)
     session.add(project)
     await session.commit()
+    mark_portfolio_dirty()
     await session.refresh(project)
     return project
 
@@ -45,36 +56,194 @@ async def check_ownership(session: AsyncSession, project: Project, user) -> bool
     return contractor is not None and contractor.owner_id == user.id
 
 
+async def owned_project_ids(session: AsyncSession, user) -> Optional[List[int]]:
+    """Project ids a user may see: None (all) for government users, else the projects they own."""
+    if user.role == Role.GOVERNMENT:
+        return None
+    result = await session.execute(
+        select(Project.id)
+        .join(Contractor, Project.contractor_id == Contractor.id)
+        .where(Contractor.owner_id == user.id)
+    )
+    return list(result.scalars().all())
+
+
 def generate_presigned_url(storage_key: str, expires_seconds: int = 3600, purpose: str = "download") -> str:
-    # Placeholder presigned URL generator. Replace with provider SDK (GCS/S3) in production.
-    token = f"token-{int(datetime.utcnow().timestamp())}"
-    url = f"https://storage.example.com/{storage_key}?token={token}&exp={expires_seconds}&purpose={purpose}"
-    return url
+    # HMAC-signed, expiring URL on the storage endpoint (app/storage_server.py)
+    method = "PUT" if purpose == "upload" else "GET"
+    return build_signed_url(method, f"/objects/{storage_key}", expires_seconds)["url"]
 
 
 async def create_document(session: AsyncSession, project_id: int, doc_type: str, filename: str, content: bytes, content_type: str | None, ) -> ProjectDocument:
-    doc = ProjectDocument(project_id=project_id, type=doc_type, filename=filename, content=content, content_type=content_type, storage_key=None,)
+    # Bytes go to the content-addressed blob store; the row only keeps hash + size
+    ref = await asyncio.to_thread(get_blob_store().put_bytes, content, content_type)
+    doc = ProjectDocument(project_id=project_id, type=doc_type, filename=filename, content_type=content_type, content_sha256=ref.sha256, size_bytes=ref.size, stored_size=ref.stored_size, compression=ref.codec, storage_key=None,)
     session.add(doc)
+    await session.flush()
+    await index_document(session, doc, content)
     await session.commit()
     await session.refresh(doc)
     return doc
 
 
+async def get_document(session: AsyncSession, project_id: int, record_id: int) -> Optional[ProjectDocument]:
+    # Legacy inline content stays unloaded until read_document_bytes touches it
+    result = await session.execute(
+        select(ProjectDocument)
+        .options(defer(ProjectDocument.content))
+        .where(ProjectDocument.id == record_id, ProjectDocument.project_id == project_id)
+    )
+    return result.scalars().first()
+
+
+# Metadata-only projection used by every document listing (never the bytes)
+DOCUMENT_LIST_COLUMNS = (
+    ProjectDocument.id,
+    ProjectDocument.project_id,
+    ProjectDocument.type,
+    ProjectDocument.filename,
+    ProjectDocument.content_type,
+    ProjectDocument.storage_key,
+    ProjectDocument.content_sha256,
+    ProjectDocument.size_bytes,
+    ProjectDocument.created_at,
+)
+
+
+async def list_document_metadata(session: AsyncSession, project_id: Optional[int] = None, owner_id: Optional[int] = None, cursor: Optional[str] = None, limit: Optional[int] = None) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """Keyset-paginated document metadata, newest first, ordered by (created_at, id)."""
+    limit = clamp_limit(limit)
+    stmt = select(*DOCUMENT_LIST_COLUMNS)
+    if project_id is not None:
+        stmt = stmt.where(ProjectDocument.project_id == project_id)
+    if owner_id is not None:
+        stmt = (
+            stmt.join(Project, ProjectDocument.project_id == Project.id)
+            .join(Contractor, Project.contractor_id == Contractor.id)
+            .where(Contractor.owner_id == owner_id)
+        )
+
+    after = decode_cursor(cursor, datetime, int)
+    if after:
+        stmt = stmt.where(tuple_(ProjectDocument.created_at, ProjectDocument.id) < tuple_(*after))
+
+    stmt = stmt.order_by(ProjectDocument.created_at.desc(), ProjectDocument.id.desc()).limit(limit + 1)
+    rows = [dict(r) for r in (await session.execute(stmt)).mappings().all()]
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1]["created_at"], rows[-1]["id"])
+    return rows, next_cursor
+
+
+async def document_storage_stats(session: AsyncSession, project_id: Optional[int] = None, owner_id: Optional[int] = None) -> Dict[str, Any]:
+    """Bytes saved by at-rest compression, computed in SQL per codec."""
+    stored = func.coalesce(ProjectDocument.stored_size, ProjectDocument.size_bytes)
+    stmt = (
+        select(
+            ProjectDocument.compression,
+            func.count(ProjectDocument.id),
+            func.coalesce(func.sum(ProjectDocument.size_bytes), 0),
+            func.coalesce(func.sum(stored), 0),
+        )
+        .where(ProjectDocument.content_sha256.is_not(None))
+        .group_by(ProjectDocument.compression)
+    )
+    if project_id is not None:
+        stmt = stmt.where(ProjectDocument.project_id == project_id)
+    if owner_id is not None:
+        stmt = (
+            stmt.join(Project, ProjectDocument.project_id == Project.id)
+            .join(Contractor, Project.contractor_id == Contractor.id)
+            .where(Contractor.owner_id == owner_id)
+        )
+
+    by_codec = []
+    for codec, count, original, stored_bytes in (await session.execute(stmt)).all():
+        by_codec.append({
+            "codec": codec or "none",
+            "documents": count,
+            "original_bytes": int(original),
+            "stored_bytes": int(stored_bytes),
+            "bytes_saved": int(original) - int(stored_bytes),
+        })
+
+    original_total = sum(c["original_bytes"] for c in by_codec)
+    stored_total = sum(c["stored_bytes"] for c in by_codec)
+    return {
+        "project_id": project_id,
+        "documents": sum(c["documents"] for c in by_codec),
+        "original_bytes": original_total,
+        "stored_bytes": stored_total,
+        "bytes_saved": original_total - stored_total,
+        "savings_ratio": round(1 - stored_total / original_total, 4) if original_total else 0.0,
+        "by_codec": by_codec,
+    }
+
+
 async def delete_document(session: AsyncSession, project_id: int, record_id: int) -> bool:
-    result = await session.execute(select(ProjectDocument).where(ProjectDocument.id == record_id, ProjectDocument.project_id == project_id))
-    doc = result.scalars().first()
+    doc = await get_document(session, project_id, record_id)
     if not doc:
         return False
+    sha256 = doc.content_sha256
+    await remove_entries(session, "document", [doc.id])
     await session.delete(doc)
+    # Blobs are shared across projects and may be re-uploaded at any moment:
+    # the GC sweep drops the file later if nothing references it by then
+    if sha256:
+        await queue_blob_deletion(session, sha256)
     await session.commit()
     return True
 
 
+async def read_document_bytes(doc: ProjectDocument) -> bytes:
+    """Return a document's bytes from the blob store, falling back to legacy inline content."""
+    if doc.content_sha256:
+        return await asyncio.to_thread(get_blob_store().read_bytes, doc.content_sha256)
+    return doc.content or b""
+
+
 async def get_signed_url_for_doc(session: AsyncSession, project_id: int, doc_type: str, filename: str, purpose: str = "download") -> Dict[str, Any]:
-    # For uploads: create a storage_key and return presigned URL
-    storage_key = f"projects/{project_id}/{doc_type}/{int(datetime.utcnow().timestamp())}-{filename}"
-    url = generate_presigned_url(storage_key, purpose=purpose)
-    return {"url": url, "storage_key": storage_key}
+    # For uploads: create a storage_key and return a signed PUT URL. The client
+    # uploads straight to the storage endpoint, then calls complete_signed_upload.
+    storage_key = f"projects/{project_id}/{doc_type}/{int(datetime.utcnow().timestamp())}-{filename.replace('/', '_')}"
+    signed = build_signed_url("PUT" if purpose == "upload" else "GET", f"/objects/{storage_key}")
+    return {**signed, "storage_key": storage_key}
+
+
+def get_download_url_for_doc(doc: ProjectDocument, expires_seconds: Optional[int] = None) -> Dict[str, Any]:
+    """Signed GET URL for a stored document; the bytes never pass through the API."""
+    filename = doc.filename.replace("/", "_")
+    return build_signed_url("GET", f"/blobs/{doc.content_sha256}/{filename}", expires_seconds)
+
+
+async def complete_signed_upload(session: AsyncSession, project_id: int, doc_type: str, filename: str, storage_key: str) -> Optional[ProjectDocument]:
+    """
+    Register a ProjectDocument for bytes already uploaded through a signed URL.
+    Returns None when nothing was uploaded under `storage_key`. Idempotent:
+    repeated callbacks return the existing document.
+    """
+    existing = (await session.execute(
+        select(ProjectDocument)
+        .options(defer(ProjectDocument.content))
+        .where(ProjectDocument.project_id == project_id, ProjectDocument.storage_key == storage_key)
+    )).scalars().first()
+    if existing:
+        return existing
+
+    meta = await asyncio.to_thread(get_blob_store().resolve_key, storage_key)
+    # The blob itself may have been garbage collected if the callback came very late
+    if not meta or not await asyncio.to_thread(get_blob_store().exists, meta["sha256"]):
+        return None
+
+    doc = ProjectDocument(project_id=project_id, type=doc_type, filename=filename, content_type=meta.get("content_type"), content_sha256=meta["sha256"], size_bytes=meta["size"], stored_size=meta.get("stored_size"), compression=meta.get("codec"), storage_key=storage_key)
+    session.add(doc)
+    await session.flush()
+    await index_document(session, doc)
+    await session.commit()
+    await session.refresh(doc)
+    return doc
 
 
 # AI config functions
@@ -189,8 +358,8 @@ async def list_projects_with_ownership(session: AsyncSession, q: Optional[str] =
     return result
 
 
-async def list_project_documents_with_ownership(session: AsyncSession, project_id: int) -> Optional[Dict[str, Any]]:
-    """List all documents for a project including project owner_id"""
+async def list_project_documents_with_ownership(session: AsyncSession, project_id: int, cursor: Optional[str] = None, limit: Optional[int] = None) -> Optional[Dict[str, Any]]:
+    """List a page of document metadata for a project including project owner_id"""
     project = await get_project(session, project_id)
     if not project:
         return None
@@ -198,14 +367,13 @@ async def list_project_documents_with_ownership(session: AsyncSession, project_i
     contractor = await session.get(Contractor, project.contractor_id)
     owner_id = contractor.owner_id if contractor else None
     
-    stmt = select(ProjectDocument).where(ProjectDocument.project_id == project_id)
-    result = await session.execute(stmt)
-    documents = result.scalars().all()
+    documents, next_cursor = await list_document_metadata(session, project_id=project_id, cursor=cursor, limit=limit)
     
     return {
         "project_id": project_id,
         "owner_id": owner_id,
-        "documents": documents
+        "documents": documents,
+        "next_cursor": next_cursor,
     }
 
 
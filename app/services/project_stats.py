@@ -1,18 +1,23 @@
-from typing import List
+from typing import List, Optional
 from app.models.assessment_result import AssessmentResult
+from app.models.project_assessment_rollup import ProjectAssessmentRollup
 from app.services.gemini_classifier import extract_gemini_text, classify 
 
 
+def _labels(a: AssessmentResult) -> dict:
+    # Stored at ingest; only legacy rows that were never classified are scanned here
+    if a.critical is not None and a.compliant is not None:
+        return {"critical": a.critical, "compliant": a.compliant}
+    return classify(extract_gemini_text(a.gemini_response))
+
+
 
 def compute_stats(assessments: List[AssessmentResult]) -> dict:
     total = len(assessments)
     scores = [a.score for a in assessments if a.score is not None]
 
 
-    classified = [
-        classify(extract_gemini_text(a.gemini_response))
-        for a in assessments
-    ]
+    classified = [_labels(a) for a in assessments]
 
 
     return {
@@ -23,8 +28,23 @@ def compute_stats(assessments: List[AssessmentResult]) -> dict:
         ),
         "complianceRate":(
             round(
-                100 * sum(1 for c in classified if c["complaint"]) / total,
+                100 * sum(1 for c in classified if c["compliant"]) / total,
                 2
             ) if total > 0 else None
         )
-    }
\ No newline at end of file
+    }
+
+
+def rollup_stats(rollup: Optional[ProjectAssessmentRollup]) -> dict:
+    """Same shape as compute_stats, read from the maintained rollup row."""
+    total = rollup.assessment_count if rollup else 0
+    return {
+        "totalAssessments": total,
+        "criticalRisks": rollup.critical_count if rollup else 0,
+        "averageSafetyScore": (
+            round(rollup.score_sum / rollup.score_count, 2) if rollup and rollup.score_count else None
+        ),
+        "complianceRate": (
+            round(100 * rollup.compliant_count / total, 2) if total else None
+        ),
+    }
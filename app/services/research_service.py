@@ -6,11 +6,14 @@ from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.research_log import ResearchLog
+from app.services.search_service import index_research_log
 
 
 async def log_interaction(session: AsyncSession, project_id: int, user_id: Optional[int], action: str, details: Optional[Dict[str, Any]] = None) -> ResearchLog:
     rec = ResearchLog(project_id=project_id, user_id=user_id, action=action, details=details)
     session.add(rec)
+    await session.flush()
+    await index_research_log(session, rec)
     await session.commit()
     await session.refresh(rec)
     return rec
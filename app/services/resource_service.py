@@ -6,6 +6,7 @@ from app.models.labor import Labor
 from app.models.equipment import Equipment
 from app.models.logistics import Logistics
 from app.models.vendor import Vendor
+from app.services.portfolio_dashboard import mark_portfolio_dirty
 from app.services.project_service import get_project, check_ownership
 
 
@@ -14,6 +15,7 @@ async def create_labor(session: AsyncSession, payload: dict) -> Labor:
     obj = Labor(**payload)
     session.add(obj)
     await session.commit()
+    mark_portfolio_dirty()
     await session.refresh(obj)
     return obj
 
@@ -32,6 +34,7 @@ async def update_labor(session: AsyncSession, record_id: int, data: dict) -> Opt
         setattr(obj, k, v)
     session.add(obj)
     await session.commit()
+    mark_portfolio_dirty()
     await session.refresh(obj)
     return obj
 
@@ -42,6 +45,7 @@ async def delete_labor(session: AsyncSession, record_id: int) -> bool:
         return False
     await session.delete(obj)
     await session.commit()
+    mark_portfolio_dirty()
     return True
 
 
@@ -0,0 +1,328 @@
+# app/services/search_service.py
+
+import asyncio
+import json
+import logging
+import math
+import re
+from collections import Counter, defaultdict
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import delete, func, literal_column, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.pagination import clamp_limit, decode_cursor, encode_cursor
+from app.models.assessment_hazard import AssessmentHazard
+from app.models.assessment_result import AssessmentResult
+from app.models.project_document import ProjectDocument
+from app.models.research_log import ResearchLog
+from app.models.search_entry import SearchEntry
+from app.models.transcript import Transcript
+from app.services.blob_store import get_blob_store
+from app.services.text_extraction import extract_text, is_extractable
+
+logger = logging.getLogger(__name__)
+
+
+SOURCE_TYPES = ("document", "transcript", "research_log", "assessment", "hazard")
+
+# Must match the text search config of the generated tsv column (see migration c41d7a2e9f35)
+TS_CONFIG = "english"
+
+
+# ---------------------------------------------------------------------------
+# Indexing (called from the write paths; never commits on its own)
+# ---------------------------------------------------------------------------
+
+async def index_entry(
+    session: AsyncSession,
+    source_type: str,
+    source_id: int,
+    project_id: Optional[int],
+    title: Optional[str],
+    body: Optional[str],
+    created_at: Optional[datetime] = None,
+) -> SearchEntry:
+    """Insert or refresh the search entry for one source row."""
+    body = (body or "")[: settings.SEARCH_MAX_BODY_CHARS]
+    entry = (await session.execute(
+        select(SearchEntry).where(SearchEntry.source_type == source_type, SearchEntry.source_id == source_id)
+    )).scalars().first()
+
+    if entry is None:
+        entry = SearchEntry(source_type=source_type, source_id=source_id, created_at=created_at or datetime.utcnow())
+    entry.project_id = project_id
+    entry.title = title
+    entry.body = body
+    entry.updated_at = datetime.utcnow()
+    session.add(entry)
+    return entry
+
+
+async def remove_entries(session: AsyncSession, source_type: str, source_ids: Iterable[int]) -> None:
+    ids = list(source_ids)
+    if ids:
+        await session.execute(
+            delete(SearchEntry).where(SearchEntry.source_type == source_type, SearchEntry.source_id.in_(ids))
+        )
+
+
+async def index_document(session: AsyncSession, doc: ProjectDocument, data: Optional[bytes] = None) -> SearchEntry:
+    """Index a document by filename and extracted text; reads the blob only if bytes weren't passed in."""
+    if data is None and doc.content_sha256 and is_extractable(doc.content_type):
+        data = await asyncio.to_thread(get_blob_store().read_bytes, doc.content_sha256)
+    text = await asyncio.to_thread(extract_text, data, doc.content_type) if data and is_extractable(doc.content_type) else ""
+    return await index_entry(session, "document", doc.id, doc.project_id, f"{doc.type}: {doc.filename}", text, doc.created_at)
+
+
+async def index_transcript(session: AsyncSession, transcript: Transcript) -> SearchEntry:
+    return await index_entry(session, "transcript", transcript.id, transcript.project_id, transcript.source, transcript.text, transcript.created_at)
+
+
+async def index_research_log(session: AsyncSession, rec: ResearchLog) -> SearchEntry:
+    return await index_entry(session, "research_log", rec.id, rec.project_id, rec.action, _flatten(rec.details), rec.created_at)
+
+
+async def index_assessment(session: AsyncSession, assessment: AssessmentResult, hazards: Iterable[AssessmentHazard] = ()) -> None:
+    """Index an assessment's notes and each of its hazards (hazards inherit the project)."""
+    await index_entry(session, "assessment", assessment.id, assessment.project_id, f"Assessment score {assessment.score:g}", assessment.notes, assessment.created_at)
+    for h in hazards:
+        body = " ".join([h.location or "", *(h.recommendations or [])])
+        await index_entry(session, "hazard", h.id, assessment.project_id, f"{h.hazard_type} ({h.risk_level})", body, h.created_at)
+
+
+def _flatten(value: Any) -> str:
+    """Collect the string leaves of a JSON-ish value (research log details)."""
+    if value is None:
+        return ""
+    if isinstance(value, str):
+        return value
+    if isinstance(value, dict):
+        return " ".join(f"{k} {_flatten(v)}" for k, v in value.items())
+    if isinstance(value, (list, tuple)):
+        return " ".join(_flatten(v) for v in value)
+    return json.dumps(value, default=str)
+
+
+# ---------------------------------------------------------------------------
+# Querying
+# ---------------------------------------------------------------------------
+
+async def search(
+    session: AsyncSession,
+    q: str,
+    project_ids: Optional[List[int]] = None,
+    source_types: Optional[List[str]] = None,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = None,
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """
+    Ranked full-text search, keyset-paginated on (rank, id).
+
+    `project_ids=None` searches every project; an empty list matches nothing.
+    Postgres uses the generated `tsv` column (GIN index); other databases
+    fall back to an in-process inverted index built from search_entry.
+    """
+    limit = clamp_limit(limit)
+    if project_ids is not None and not project_ids:
+        return [], None
+    after = decode_cursor(cursor, float, int)
+
+    if session.bind.dialect.name == "postgresql":
+        rows = await _search_postgres(session, q, project_ids, source_types, after, limit + 1)
+    else:
+        rows = await _search_fallback(session, q, project_ids, source_types, after, limit + 1)
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1]["rank"], rows[-1]["id"])
+    return rows, next_cursor
+
+
+async def _search_postgres(session, q, project_ids, source_types, after, limit) -> List[Dict[str, Any]]:
+    language = literal_column(f"'{TS_CONFIG}'::regconfig")
+    query = func.websearch_to_tsquery(language, q)
+    tsv = literal_column("search_entry.tsv")
+    rank = func.ts_rank_cd(tsv, query).label("rank")
+
+    stmt = select(
+        SearchEntry.id,
+        SearchEntry.project_id,
+        SearchEntry.source_type,
+        SearchEntry.source_id,
+        SearchEntry.title,
+        SearchEntry.created_at,
+        rank,
+    ).where(tsv.op("@@")(query))
+    if project_ids is not None:
+        stmt = stmt.where(SearchEntry.project_id.in_(project_ids))
+    if source_types:
+        stmt = stmt.where(SearchEntry.source_type.in_(source_types))
+    if after:
+        stmt = stmt.where(tuple_(func.ts_rank_cd(tsv, query), SearchEntry.id) < tuple_(*after))
+    stmt = stmt.order_by(rank.desc(), SearchEntry.id.desc()).limit(limit)
+
+    rows = [dict(r) for r in (await session.execute(stmt)).mappings().all()]
+    if not rows:
+        return rows
+
+    # Headlines only for the page being returned
+    snippets = dict((await session.execute(
+        select(
+            SearchEntry.id,
+            func.ts_headline(language, SearchEntry.body, query, "MaxFragments=1, MaxWords=30, MinWords=10"),
+        ).where(SearchEntry.id.in_([r["id"] for r in rows]))
+    )).all())
+    for r in rows:
+        r["rank"] = float(r["rank"])
+        r["snippet"] = snippets.get(r["id"], "")
+    return rows
+
+
+async def _search_fallback(session, q, project_ids, source_types, after, limit) -> List[Dict[str, Any]]:
+    index = await _fallback_index.sync(session)
+    hits = index.query(q, project_ids=project_ids, source_types=source_types)
+    if after:
+        hits = [h for h in hits if (h[0], h[1]) < tuple(after)]
+    hits = hits[:limit]
+
+    rows = []
+    for score, entry_id in hits:
+        doc = index.docs[entry_id]
+        rows.append({
+            "id": entry_id,
+            "project_id": doc["project_id"],
+            "source_type": doc["source_type"],
+            "source_id": doc["source_id"],
+            "title": doc["title"],
+            "created_at": doc["created_at"],
+            "rank": score,
+            "snippet": _snippet(doc["body"], index.tokenize(q)),
+        })
+    return rows
+
+
+def _snippet(body: str, terms: List[str], width: int = 200) -> str:
+    lowered = body.lower()
+    positions = [lowered.find(t) for t in terms if lowered.find(t) >= 0]
+    start = max(min(positions) - width // 4, 0) if positions else 0
+    return body[start:start + width]
+
+
+# ---------------------------------------------------------------------------
+# In-process fallback index
+# ---------------------------------------------------------------------------
+
+class InvertedIndex:
+    """
+    Minimal BM25 inverted index over SearchEntry rows, for databases without
+    tsvector support (SQLite in local dev). Queries are AND-ed like
+    websearch_to_tsquery; `-term` excludes.
+    """
+
+    TOKEN_RE = re.compile(r"[a-z0-9]+")
+    K1 = 1.2
+    B = 0.75
+
+    def __init__(self):
+        self.docs: Dict[int, Dict[str, Any]] = {}
+        self.postings: Dict[str, Dict[int, int]] = defaultdict(dict)
+        self.total_length = 0
+        self.watermark: Optional[datetime] = None
+
+    @classmethod
+    def tokenize(cls, text: Optional[str]) -> List[str]:
+        return cls.TOKEN_RE.findall((text or "").lower())
+
+    def add(self, row: Dict[str, Any]) -> None:
+        self.remove(row["id"])
+        terms = Counter(self.tokenize(row["title"]) * 2 + self.tokenize(row["body"]))
+        length = sum(terms.values())
+        self.docs[row["id"]] = {**row, "length": length, "terms": list(terms)}
+        self.total_length += length
+        for term, tf in terms.items():
+            self.postings[term][row["id"]] = tf
+
+    def remove(self, entry_id: int) -> None:
+        doc = self.docs.pop(entry_id, None)
+        if doc is None:
+            return
+        self.total_length -= doc["length"]
+        for term in doc["terms"]:
+            self.postings[term].pop(entry_id, None)
+            if not self.postings[term]:
+                del self.postings[term]
+
+    def query(self, q: str, project_ids=None, source_types=None) -> List[Tuple[float, int]]:
+        words = q.split()
+        include = [t for w in words if not w.startswith("-") for t in self.tokenize(w)]
+        exclude = {t for w in words if w.startswith("-") for t in self.tokenize(w)}
+        if not include or not self.docs:
+            return []
+
+        # Rarest term first keeps the candidate set small
+        terms = sorted(set(include), key=lambda t: len(self.postings.get(t, ())))
+        candidates = set(self.postings.get(terms[0], ()))
+        for term in terms[1:]:
+            candidates &= self.postings.get(term, {}).keys()
+        for term in exclude:
+            candidates -= self.postings.get(term, {}).keys()
+
+        n = len(self.docs)
+        avg_length = self.total_length / n or 1.0
+        hits = []
+        for entry_id in candidates:
+            doc = self.docs[entry_id]
+            if project_ids is not None and doc["project_id"] not in project_ids:
+                continue
+            if source_types and doc["source_type"] not in source_types:
+                continue
+            score = 0.0
+            for term in terms:
+                df = len(self.postings[term])
+                tf = self.postings[term][entry_id]
+                idf = math.log(1 + (n - df + 0.5) / (df + 0.5))
+                score += idf * tf * (self.K1 + 1) / (tf + self.K1 * (1 - self.B + self.B * doc["length"] / avg_length))
+            hits.append((round(score, 6), entry_id))
+        hits.sort(reverse=True)
+        return hits
+
+
+class _FallbackIndex:
+    """Process-wide InvertedIndex kept in step with search_entry incrementally."""
+
+    def __init__(self):
+        self.index = InvertedIndex()
+        self._lock = asyncio.Lock()
+
+    async def sync(self, session: AsyncSession) -> InvertedIndex:
+        async with self._lock:
+            columns = (SearchEntry.id, SearchEntry.project_id, SearchEntry.source_type, SearchEntry.source_id, SearchEntry.title, SearchEntry.body, SearchEntry.created_at, SearchEntry.updated_at)
+            stmt = select(*columns)
+            if self.index.watermark is not None:
+                stmt = stmt.where(SearchEntry.updated_at >= self.index.watermark)
+            for row in (await session.execute(stmt)).mappings().all():
+                self.index.add(dict(row))
+                if self.index.watermark is None or row["updated_at"] > self.index.watermark:
+                    self.index.watermark = row["updated_at"]
+
+            # Deletions don't bump the watermark; rebuild when the counts drift
+            total = (await session.execute(select(func.count()).select_from(SearchEntry))).scalar_one()
+            if total != len(self.index.docs):
+                logger.info("Rebuilding in-process search index | entries=%s", total)
+                self.index = InvertedIndex()
+                return await self._rebuild(session, columns)
+            return self.index
+
+    async def _rebuild(self, session: AsyncSession, columns) -> InvertedIndex:
+        for row in (await session.execute(select(*columns))).mappings().all():
+            self.index.add(dict(row))
+            if self.index.watermark is None or row["updated_at"] > self.index.watermark:
+                self.index.watermark = row["updated_at"]
+        return self.index
+
+
+_fallback_index = _FallbackIndex()
@@ -0,0 +1,43 @@
+# app/services/text_extraction.py
+
+import io
+import logging
+from typing import Optional
+
+import docx2txt
+import PyPDF2
+
+logger = logging.getLogger(__name__)
+
+
+DOCX_TYPES = {
+    "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+    "application/msword",
+}
+
+
+TEXT_TYPES = {"application/json", "application/xml", "application/csv"}
+
+
+def is_extractable(content_type: Optional[str]) -> bool:
+    content_type = (content_type or "").split(";", 1)[0].strip().lower()
+    return content_type == "application/pdf" or content_type in DOCX_TYPES or content_type in TEXT_TYPES or content_type.startswith("text/")
+
+
+def extract_text(data: bytes, content_type: Optional[str]) -> str:
+    """
+    Extract searchable text from document bytes (PDF, DOCX, plain text).
+    Images, video and other binary formats yield an empty string.
+    """
+    content_type = (content_type or "").split(";", 1)[0].strip().lower()
+    try:
+        if content_type == "application/pdf":
+            reader = PyPDF2.PdfReader(io.BytesIO(data))
+            return "\n".join(page.extract_text() or "" for page in reader.pages)
+        if content_type in DOCX_TYPES:
+            return docx2txt.process(io.BytesIO(data)) or ""
+        if content_type.startswith("text/") or content_type in TEXT_TYPES:
+            return data.decode("utf-8", errors="ignore")
+    except Exception as exc:
+        logger.warning("Text extraction failed | content_type=%s | error=%s", content_type, exc)
+    return ""
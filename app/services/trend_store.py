@@ -0,0 +1,234 @@
+# app/services/trend_store.py
+
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import func, insert as sa_insert, select
+from sqlalchemy.exc import DataError, IntegrityError
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.models.trend import TrendPoint, TrendRollup
+
+logger = logging.getLogger(__name__)
+
+
+RESOLUTIONS: Dict[str, timedelta] = {
+    "1m": timedelta(minutes=1),
+    "1h": timedelta(hours=1),
+    "1d": timedelta(days=1),
+}
+
+
+def truncate(ts: datetime, resolution: str) -> datetime:
+    if resolution == "1m":
+        return ts.replace(second=0, microsecond=0)
+    if resolution == "1h":
+        return ts.replace(minute=0, second=0, microsecond=0)
+    return ts.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def naive_utc(ts: datetime) -> datetime:
+    """Naive UTC, the convention of every other timestamp column."""
+    if ts.tzinfo is not None:
+        ts = ts.astimezone(timezone.utc).replace(tzinfo=None)
+    return ts
+
+
+def parse_timestamp(value: Optional[str]) -> datetime:
+    if not value:
+        return datetime.utcnow()
+    return naive_utc(datetime.fromisoformat(value.replace("Z", "+00:00")))
+
+
+def rollup_rows(points: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Aggregate a batch of points into one row per (project, metric, resolution, bucket)."""
+    acc: Dict[Tuple, List[float]] = {}
+    for p in points:
+        for resolution in RESOLUTIONS:
+            key = (p["project_id"], p["metric"], resolution, truncate(p["ts"], resolution))
+            cur = acc.get(key)
+            if cur is None:
+                acc[key] = [1, p["value"], p["value"], p["value"]]
+            else:
+                cur[0] += 1
+                cur[1] += p["value"]
+                cur[2] = min(cur[2], p["value"])
+                cur[3] = max(cur[3], p["value"])
+    return [
+        {"project_id": k[0], "metric": k[1], "resolution": k[2], "bucket": k[3], "count": c, "sum": s, "min": lo, "max": hi}
+        for k, (c, s, lo, hi) in acc.items()
+    ]
+
+
+async def write_points(session: AsyncSession, points: List[Dict[str, Any]]) -> None:
+    """Insert raw points and fold them into the rollups; the caller commits."""
+    if not points:
+        return
+    await session.execute(sa_insert(TrendPoint), points)
+
+    stmt = insert(TrendRollup)
+    table = TrendRollup.__table__
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.c.project_id, table.c.metric, table.c.resolution, table.c.bucket],
+        set_={
+            "count": table.c.count + stmt.excluded.count,
+            "sum": table.c.sum + stmt.excluded.sum,
+            "min": func.least(table.c.min, stmt.excluded.min),
+            "max": func.greatest(table.c.max, stmt.excluded.max),
+        },
+    )
+    # Sorted so concurrent flushes from several workers lock rows in the same order
+    rows = sorted(rollup_rows(points), key=lambda r: (r["project_id"], r["metric"], r["resolution"], r["bucket"]))
+    await session.execute(stmt, rows)
+
+
+class TrendBuffer:
+    """
+    In-process write buffer for trend points. Points are flushed in one
+    batch when the buffer fills up or on the periodic flush (see
+    app.main startup), so a burst of logging costs a handful of INSERTs.
+    Points still buffered when a worker is killed are lost; graceful
+    shutdown flushes them.
+    """
+
+    def __init__(self, max_points: int):
+        self.max_points = max_points
+        self._points: List[Dict[str, Any]] = []
+        self._lock = asyncio.Lock()
+
+    def __len__(self) -> int:
+        return len(self._points)
+
+    async def add(self, project_id: int, metric: str, value: float, ts: datetime) -> int:
+        self._points.append({"project_id": project_id, "metric": metric, "value": float(value), "ts": ts})
+        if len(self._points) >= self.max_points:
+            try:
+                await self.flush()
+            except Exception:
+                # The point stays buffered; the periodic flush retries
+                logger.exception("Trend flush failed | pending=%s", len(self._points))
+        return len(self._points)
+
+    async def flush(self) -> int:
+        async with self._lock:
+            batch, self._points = self._points, []
+            if not batch:
+                return 0
+            try:
+                async with AsyncSessionLocal() as session:
+                    await write_points(session, batch)
+                    await session.commit()
+            except (IntegrityError, DataError):
+                # Some points will never insert (e.g. a deleted project); write the
+                # batch per series so only those are dropped
+                return await self._flush_by_series(batch)
+            except Exception:
+                self._requeue(batch)
+                raise
+            logger.debug("Flushed trend points | points=%s", len(batch))
+            return len(batch)
+
+    def _requeue(self, points: List[Dict[str, Any]]) -> None:
+        # Keep the points for the next attempt (bounded so a dead DB can't exhaust memory)
+        self._points = (points + self._points)[-self.max_points * 10:]
+
+    async def _flush_by_series(self, batch: List[Dict[str, Any]]) -> int:
+        series: Dict[Tuple[int, str], List[Dict[str, Any]]] = {}
+        for p in batch:
+            series.setdefault((p["project_id"], p["metric"]), []).append(p)
+
+        written = 0
+        pending = list(series.items())
+        while pending:
+            (project_id, metric), points = pending.pop(0)
+            try:
+                async with AsyncSessionLocal() as session:
+                    await write_points(session, points)
+                    await session.commit()
+                written += len(points)
+            except (IntegrityError, DataError) as e:
+                logger.warning(
+                    "Dropping trend points the database rejects | project_id=%s | metric=%s | points=%s | error=%s",
+                    project_id, metric[:64], len(points), type(e.orig).__name__ if e.orig else e,
+                )
+            except Exception:
+                self._requeue(points + [p for _, rest in pending for p in rest])
+                raise
+        return written
+
+
+trend_buffer = TrendBuffer(settings.TREND_BUFFER_MAX_POINTS)
+
+
+async def log_trend(project_id: int, metric: str, value: float, timestamp: Optional[str] = None) -> Dict[str, Any]:
+    ts = parse_timestamp(timestamp)
+    pending = await trend_buffer.add(project_id, metric, value, ts)
+    return {"ok": True, "ts": ts.isoformat(), "pending": pending}
+
+
+def choose_resolution(start: datetime, end: datetime, max_points: int) -> str:
+    """
+    Finest resolution whose bucket count over [start, end) fits max_points.
+    Short windows (at most one point per second on average) read raw points.
+    """
+    span = end - start
+    if span <= timedelta(seconds=max_points):
+        return "raw"
+    for resolution, step in RESOLUTIONS.items():
+        if span / step <= max_points:
+            return resolution
+    return "1d"
+
+
+async def query_trend(
+    session: AsyncSession,
+    project_id: int,
+    metric: str,
+    start: datetime,
+    end: datetime,
+    resolution: str = "auto",
+    max_points: Optional[int] = None,
+) -> Dict[str, Any]:
+    max_points = max_points or settings.TREND_MAX_POINTS_PER_QUERY
+    start, end = naive_utc(start), naive_utc(end)
+    if resolution == "auto":
+        resolution = choose_resolution(start, end, max_points)
+
+    if resolution == "raw":
+        rows = (await session.execute(
+            select(TrendPoint.ts, TrendPoint.value)
+            .where(TrendPoint.project_id == project_id, TrendPoint.metric == metric, TrendPoint.ts >= start, TrendPoint.ts < end)
+            .order_by(TrendPoint.ts)
+            .limit(max_points)
+        )).all()
+        points = [{"ts": ts, "count": 1, "avg": v, "min": v, "max": v} for ts, v in rows]
+    else:
+        rows = (await session.execute(
+            select(TrendRollup.bucket, TrendRollup.count, TrendRollup.sum, TrendRollup.min, TrendRollup.max)
+            .where(
+                TrendRollup.project_id == project_id,
+                TrendRollup.metric == metric,
+                TrendRollup.resolution == resolution,
+                TrendRollup.bucket >= truncate(start, resolution),
+                TrendRollup.bucket < end,
+            )
+            .order_by(TrendRollup.bucket)
+        )).all()
+        points = [
+            {"ts": bucket, "count": count, "avg": total / count if count else None, "min": lo, "max": hi}
+            for bucket, count, total, lo, hi in rows
+        ]
+
+    return {
+        "project_id": project_id,
+        "metric": metric,
+        "resolution": resolution,
+        "start": start,
+        "end": end,
+        "points": points,
+    }
@@ -0,0 +1,192 @@
+# app/services/video_segmentation.py
+
+import asyncio
+import json
+import logging
+import re
+import shutil
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+
+RISK_RANK = {
+    "": 0,
+    "low": 1,
+    "medium": 2,
+    "high": 3,
+    "critical": 4,
+}
+
+
+def plan_segments(
+    duration_seconds: Optional[float],
+    segment_seconds: int,
+) -> List[Tuple[float, Optional[float]]]:
+    """
+    Split a video of the given duration into (start, end) windows.
+
+    When the duration is unknown a single open-ended window is returned,
+    which the caller treats as "analyze the whole video".
+    """
+    if not duration_seconds or duration_seconds <= 0 or segment_seconds <= 0:
+        return [(0.0, None)]
+
+    segments = []
+    start = 0.0
+    while start < duration_seconds:
+        end = min(start + segment_seconds, duration_seconds)
+        segments.append((start, end))
+        start = end
+    return segments
+
+
+async def probe_video_duration(video: Union[bytes, str]) -> Optional[float]:
+    """
+    Best-effort duration probe using ffprobe, given the video bytes (piped
+    on stdin) or a file path. Returns None when ffprobe is not installed or
+    cannot read the stream.
+    """
+    ffprobe = shutil.which("ffprobe")
+    if not ffprobe:
+        return None
+
+    from_path = isinstance(video, str)
+    try:
+        proc = await asyncio.create_subprocess_exec(
+            ffprobe,
+            "-v", "error",
+            "-show_entries", "format=duration",
+            "-of", "default=noprint_wrappers=1:nokey=1",
+            "-i", video if from_path else "pipe:0",
+            stdin=asyncio.subprocess.DEVNULL if from_path else asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.DEVNULL,
+        )
+        stdout, _ = await proc.communicate(None if from_path else video)
+        return float(stdout.decode().strip())
+    except Exception as exc:
+        logger.debug("ffprobe duration probe failed: %s", exc)
+        return None
+
+
+def parse_segment_findings(
+    text: str,
+    start: float,
+    end: Optional[float],
+) -> List[Dict[str, Any]]:
+    """
+    Parse the JSON hazard list returned for one segment.
+
+    Timestamps are absolute (seconds from the start of the full video, as
+    VIDEO_SEGMENT_PROMPT asks) and are clamped to the segment window, so a
+    model that drifts past either edge still lands inside its segment.
+    """
+    if not text:
+        return []
+
+    # Tolerate fenced code blocks around the JSON payload
+    match = re.search(r"\[.*\]", text, re.DOTALL)
+    if not match:
+        return []
+
+    try:
+        items = json.loads(match.group(0))
+    except ValueError:
+        return []
+
+    findings = []
+    for item in items:
+        if not isinstance(item, dict) or not item.get("hazard_type"):
+            continue
+
+        f_start = _to_seconds(item.get("start_seconds"), start)
+        f_end = _to_seconds(item.get("end_seconds"), f_start)
+
+        upper = end if end is not None else max(f_end, f_start)
+        f_start = min(max(f_start, start), upper)
+        f_end = min(max(f_end, f_start), upper)
+
+        recs = item.get("recommendations") or []
+        if isinstance(recs, str):
+            recs = [recs]
+
+        findings.append({
+            "hazard_type": str(item["hazard_type"]).strip(),
+            "location": str(item.get("location") or "").strip(),
+            "risk_level": str(item.get("risk_level") or "").strip().lower(),
+            "start_seconds": round(f_start, 2),
+            "end_seconds": round(f_end, 2),
+            "recommendations": [str(r) for r in recs],
+        })
+
+    return findings
+
+
+def merge_timeline(
+    findings: List[Dict[str, Any]],
+    gap_seconds: float = 5.0,
+) -> List[Dict[str, Any]]:
+    """
+    Merge per-segment findings into one deduplicated hazard timeline.
+
+    Findings of the same hazard type whose intervals overlap or sit within
+    `gap_seconds` of each other (typically the same hazard straddling a
+    segment boundary) collapse into a single entry keeping the highest risk
+    level and the union of recommendations.
+    """
+    by_type: Dict[str, List[Dict[str, Any]]] = {}
+    for f in findings:
+        key = " ".join(f["hazard_type"].lower().split())
+        by_type.setdefault(key, []).append(f)
+
+    merged = []
+    for items in by_type.values():
+        items.sort(key=lambda f: f["start_seconds"])
+        current = None
+        for f in items:
+            if current and f["start_seconds"] <= current["end_seconds"] + gap_seconds:
+                current["end_seconds"] = max(current["end_seconds"], f["end_seconds"])
+                if RISK_RANK.get(f["risk_level"], 0) > RISK_RANK.get(current["risk_level"], 0):
+                    current["risk_level"] = f["risk_level"]
+                if f["location"] and f["location"] not in current["locations"]:
+                    current["locations"].append(f["location"])
+                for r in f["recommendations"]:
+                    if r not in current["recommendations"]:
+                        current["recommendations"].append(r)
+                current["occurrences"] += 1
+                continue
+
+            if current:
+                merged.append(current)
+            current = {
+                "hazard_type": f["hazard_type"],
+                "risk_level": f["risk_level"],
+                "locations": [f["location"]] if f["location"] else [],
+                "start_seconds": f["start_seconds"],
+                "end_seconds": f["end_seconds"],
+                "recommendations": list(f["recommendations"]),
+                "occurrences": 1,
+            }
+        if current:
+            merged.append(current)
+
+    merged.sort(key=lambda h: (h["start_seconds"], h["hazard_type"]))
+    return merged
+
+
+def _to_seconds(value: Any, default: float) -> float:
+    if value is None:
+        return default
+    if isinstance(value, (int, float)):
+        return float(value)
+
+    # Accept "mm:ss" / "hh:mm:ss" as well as plain numbers
+    try:
+        parts = [float(p) for p in str(value).strip().rstrip("s").split(":")]
+    except ValueError:
+        return default
+    seconds = 0.0
+    for p in parts:
+        seconds = seconds * 60 + p
+    return seconds
@@ -0,0 +1,81 @@
+"""
+Lightweight storage endpoint for signed-URL transfers.
+
+Runs as its own process so bulk uploads/downloads never occupy the API
+workers:
+
+    uvicorn app.storage_server:app --host 0.0.0.0 --port 8081
+
+Every request must carry the `exp`/`sig` query parameters minted by
+app.core.signing (see project_service.generate_presigned_url). It has no
+database access: uploads land in the shared blob store and are bound to
+their storage key, and the API registers the ProjectDocument when the
+client calls the completion endpoint.
+"""
+import asyncio
+import logging
+import mimetypes
+
+from fastapi import FastAPI, HTTPException, Request
+
+from app.core.config import settings
+from app.core.logging import configure_logging
+from app.core.signing import verify_storage_signature
+from app.services.blob_download import build_blob_response
+from app.services.blob_store import get_blob_store
+
+configure_logging()
+logger = logging.getLogger(__name__)
+
+app = FastAPI(title=f"{settings.APP_NAME}-storage")
+
+
+def _require_signature(method: str, path: str, exp: int, sig: str) -> None:
+    if not verify_storage_signature(method, path, exp, sig):
+        raise HTTPException(status_code=403, detail="Invalid or expired signature")
+
+
+@app.put("/objects/{storage_key:path}")
+async def put_object(storage_key: str, exp: int, sig: str, request: Request):
+    _require_signature("PUT", f"/objects/{storage_key}", exp, sig)
+
+    store = get_blob_store()
+    writer = store.writer(request.headers.get("content-type"))
+    total = 0
+    try:
+        async for chunk in request.stream():
+            total += len(chunk)
+            if total > settings.MAX_FILE_SIZE:
+                raise HTTPException(status_code=413, detail="File too large")
+            await asyncio.to_thread(writer.write, chunk)
+    except Exception:
+        writer.abort()
+        raise
+
+    if total == 0:
+        writer.abort()
+        raise HTTPException(status_code=400, detail="Empty upload")
+
+    ref = await asyncio.to_thread(writer.commit)
+    await asyncio.to_thread(store.bind_key, storage_key, ref, request.headers.get("content-type"))
+
+    logger.info("Signed upload stored | storage_key=%s | sha256=%s | size=%s", storage_key, ref.sha256, ref.size)
+    return {"storage_key": storage_key, "sha256": ref.sha256, "size": ref.size}
+
+
+@app.get("/objects/{storage_key:path}")
+async def get_object(storage_key: str, exp: int, sig: str, request: Request):
+    _require_signature("GET", f"/objects/{storage_key}", exp, sig)
+
+    meta = get_blob_store().resolve_key(storage_key)
+    if not meta:
+        raise HTTPException(status_code=404, detail="Object not found")
+    return build_blob_response(request, get_blob_store(), meta["sha256"], meta["size"], meta.get("content_type"))
+
+
+@app.get("/blobs/{sha256}/{filename}")
+async def get_blob(sha256: str, filename: str, exp: int, sig: str, request: Request):
+    # The filename is part of the signed path, so the media type derived from it is trusted
+    _require_signature("GET", f"/blobs/{sha256}/{filename}", exp, sig)
+    media_type, _ = mimetypes.guess_type(filename)
+    return build_blob_response(request, get_blob_store(), sha256, None, media_type, filename=filename)
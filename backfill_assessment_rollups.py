@@ -0,0 +1,36 @@
+"""
+Rebuild ProjectAssessmentRollup rows from the AssessmentResult history.
+
+Aggregates the stored critical/compliant labels in a single INSERT ...
+SELECT and overwrites the rollup rows in one transaction. Assessments
+that predate ingest-time classification must be labelled first with
+reclassify_assessments.py (which rebuilds the rollups it touches itself).
+Inserts that land while this runs are counted by the live path; run it
+during a quiet period so they aren't overwritten.
+
+    python backfill_assessment_rollups.py
+    python backfill_assessment_rollups.py --project-id 12
+"""
+import argparse
+import asyncio
+import logging
+
+from app.core.database import AsyncSessionLocal
+from app.services.assessment_service import rebuild_rollups
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s | %(levelname)s | %(message)s")
+logger = logging.getLogger("backfill_assessment_rollups")
+
+
+async def backfill(project_id: int | None) -> None:
+    async with AsyncSessionLocal() as session:
+        written = await rebuild_rollups(session, None if project_id is None else [project_id])
+        await session.commit()
+    logger.info("Rollups rebuilt | projects=%s", written)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--project-id", type=int, default=None)
+    args = parser.parse_args()
+    asyncio.run(backfill(args.project_id))
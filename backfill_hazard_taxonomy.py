@@ -0,0 +1,71 @@
+"""
+Normalize existing AssessmentHazard rows into the hazard taxonomy.
+
+Sets hazard_type_id, risk and project_id on hazards stored before
+ingest-time normalization, one id-ordered batch per transaction. Rows that
+already have a type are skipped unless --all is given (e.g. after
+extending hazard_taxonomy.TAXONOMY).
+
+    python backfill_hazard_taxonomy.py --batch-size 1000
+"""
+import argparse
+import asyncio
+import logging
+
+from sqlalchemy import select, update
+
+from app.core.database import AsyncSessionLocal
+from app.models.assessment_hazard import AssessmentHazard
+from app.models.assessment_result import AssessmentResult
+from app.services.hazard_taxonomy import canonical_risk, canonical_type, resolve_type_ids
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s | %(levelname)s | %(message)s")
+logger = logging.getLogger("backfill_hazard_taxonomy")
+
+
+async def backfill(batch_size: int, everything: bool) -> None:
+    last_id = 0
+    done = 0
+
+    while True:
+        async with AsyncSessionLocal() as session:
+            stmt = (
+                select(AssessmentHazard.id, AssessmentHazard.hazard_type, AssessmentHazard.risk_level, AssessmentResult.project_id)
+                .join(AssessmentResult, AssessmentHazard.assessment_id == AssessmentResult.id)
+                .where(AssessmentHazard.id > last_id)
+                .order_by(AssessmentHazard.id)
+                .limit(batch_size)
+            )
+            if not everything:
+                stmt = stmt.where(AssessmentHazard.hazard_type_id.is_(None))
+            rows = (await session.execute(stmt)).all()
+            if not rows:
+                break
+
+            slugs = [canonical_type(hazard_type) for _, hazard_type, _, _ in rows]
+            type_ids = await resolve_type_ids(session, slugs)
+            params = [
+                {
+                    "id": hazard_id,
+                    "project_id": project_id,
+                    "hazard_type_id": type_ids[slug],
+                    "risk": canonical_risk(risk_level, slug, hazard_type),
+                }
+                for (hazard_id, hazard_type, risk_level, project_id), slug in zip(rows, slugs)
+            ]
+            await session.execute(update(AssessmentHazard), params)
+            await session.commit()
+
+            last_id = rows[-1][0]
+            done += len(rows)
+        logger.info("Normalized hazards up to id=%s | rows=%s", last_id, done)
+
+    logger.info("Hazard taxonomy backfill finished | rows=%s", done)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--all", action="store_true", help="Re-normalize rows that already have a type")
+    args = parser.parse_args()
+    asyncio.run(backfill(args.batch_size, args.all))
@@ -0,0 +1,73 @@
+"""
+Benchmark: micro-batched FL inference vs one forward pass per request.
+
+Run from the repo root:
+
+    python benchmarks/bench_fl_inference_batching.py
+
+Each case fires N concurrent requests of 1-4 rows at the construction
+model on one event loop, the way api_infer sees a burst of small calls.
+"unbatched" is the old path (a forward pass per request);
+"batched" goes through fl_inference_batcher.InferenceBatcher with the
+given max wait. Both produce the same predictions.
+"""
+import asyncio
+import random
+import sys
+import time
+from pathlib import Path
+
+import torch
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.services.fl_inference_batcher import InferenceBatcher  # noqa: E402
+from app.services.fl_training import ConstructionLinearModel  # noqa: E402
+
+
+async def unbatched(module, inputs):
+    async def one(x):
+        with torch.inference_mode():
+            return module(x)
+    return await asyncio.gather(*(one(x) for x in inputs))
+
+
+async def batched(batcher, module, inputs):
+    return await asyncio.gather(*(batcher.predict(module, x) for x in inputs))
+
+
+def bench(make_coro, repeat: int = 5) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        asyncio.run(make_coro())
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    torch.set_num_threads(1)
+    module = ConstructionLinearModel().eval().requires_grad_(False)
+
+    for concurrency in (10, 100, 1000):
+        rng = random.Random(concurrency)
+        inputs = [torch.randn(rng.randint(1, 4), 6) for _ in range(concurrency)]
+
+        # Same result up to float rounding
+        batcher = InferenceBatcher(max_wait_ms=2.0, max_rows=256)
+        expected = asyncio.run(unbatched(module, inputs))
+        got = asyncio.run(batched(batcher, module, inputs))
+        drift = max((a - b).abs().max().item() for a, b in zip(expected, got))
+
+        print(f"\n{concurrency} concurrent requests ({sum(x.shape[0] for x in inputs)} rows, max diff {drift:.2e})")
+        base_t = bench(lambda: unbatched(module, inputs))
+        print(f"  {'unbatched':<28} {concurrency / base_t:>12.0f} req/s")
+        for wait_ms, max_rows in ((1.0, 64), (2.0, 256), (5.0, 1024)):
+            batcher = InferenceBatcher(max_wait_ms=wait_ms, max_rows=max_rows)
+            t = bench(lambda: batched(batcher, module, inputs))
+            label = f"batched {wait_ms:g} ms / {max_rows} rows"
+            print(f"  {label:<28} {concurrency / t:>12.0f} req/s  {base_t / t:>6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
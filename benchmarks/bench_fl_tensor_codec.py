@@ -0,0 +1,68 @@
+"""
+Benchmark: binary FL weight blobs vs the nested JSON lists they replace.
+
+Run from the repo root:
+
+    python benchmarks/bench_fl_tensor_codec.py
+
+For each state dict it reports the stored size and the time to turn the
+stored value back into tensors: json.loads + torch.tensor for the legacy
+column, decode_state (torch.frombuffer views) for the blob.
+"""
+import json
+import sys
+import timeit
+from pathlib import Path
+
+import torch
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.services.fl_service import default_model_state_dict  # noqa: E402
+from app.services.fl_tensor_codec import decode_state, encode_state  # noqa: E402
+
+
+def make_state(widths):
+    state = {}
+    for i, (n_in, n_out) in enumerate(zip(widths, widths[1:])):
+        state[f"net.{i * 2}.weight"] = torch.randn(n_out, n_in)
+        state[f"net.{i * 2}.bias"] = torch.randn(n_out)
+    return state
+
+
+def load_json(data: str):
+    return {k: torch.tensor(v, dtype=torch.float32) for k, v in json.loads(data).items()}
+
+
+def bench(label: str, fn, arg, number: int) -> float:
+    seconds = min(timeit.repeat(lambda: fn(arg), number=number, repeat=5)) / number
+    print(f"  {label:<28} {seconds * 1e6:>12.1f} us/load")
+    return seconds
+
+
+def main():
+    cases = [
+        ("construction-mlp (6-16-8-1)", default_model_state_dict(), 2000),
+        ("mlp 64-256-256-1", make_state([64, 256, 256, 1]), 50),
+        ("mlp 512-1024-1024-10", make_state([512, 1024, 1024, 10]), 3),
+    ]
+
+    for name, state, number in cases:
+        params = sum(t.numel() for t in state.values())
+        as_json = json.dumps({k: v.tolist() for k, v in state.items()})
+        blob32 = encode_state(state)
+        blob16 = encode_state(state, dtype="float16")
+
+        print(f"\n{name}: {params} params")
+        print(f"  {'json':<28} {len(as_json):>12} bytes")
+        print(f"  {'blob float32':<28} {len(blob32):>12} bytes ({len(as_json) / len(blob32):.1f}x smaller)")
+        print(f"  {'blob float16':<28} {len(blob16):>12} bytes ({len(as_json) / len(blob16):.1f}x smaller)")
+
+        old = bench("json.loads + torch.tensor", load_json, as_json, number)
+        new = bench("decode_state float32", decode_state, blob32, number)
+        print(f"  {'':<28} {old / new:>12.1f}x json/blob time")
+        bench("decode_state float16", decode_state, blob16, number)
+
+
+if __name__ == "__main__":
+    main()
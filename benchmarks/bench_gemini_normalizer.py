@@ -0,0 +1,181 @@
+"""
+Benchmark: normalize_gemini_response vs the serializers it replaced.
+
+Run from the repo root:
+
+    python benchmarks/bench_gemini_normalizer.py
+
+The legacy implementations are copied from the endpoints (video_upload,
+video_live, doc_assessment), lightly condensed, so the numbers stay
+comparable after those copies were removed from the app.
+"""
+import json
+import sys
+import timeit
+from enum import Enum
+from pathlib import Path
+from typing import Any
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.services.gemini_response import normalize_gemini_response  # noqa: E402
+
+
+# -----------------------------
+# Mock GenerateContentResponse
+# -----------------------------
+
+class FinishReason(Enum):
+    STOP = "STOP"
+
+
+class Obj:
+    def __init__(self, **kwargs):
+        self.__dict__.update(kwargs)
+
+
+def make_response(candidates: int, parts: int, depth: int) -> Obj:
+    def nested(level: int):
+        if level == 0:
+            return {"score": 0.5, "label": "x" * 16}
+        return Obj(child=nested(level - 1), items=[nested(level - 1)] if level < 3 else [])
+
+    return Obj(
+        candidates=[
+            Obj(
+                content=Obj(parts=[Obj(text=f"hazard {c}.{p} " * 8) for p in range(parts)], role="model"),
+                finish_reason=FinishReason.STOP,
+                safety_ratings=[nested(depth) for _ in range(4)],
+            )
+            for c in range(candidates)
+        ],
+        usage_metadata=Obj(prompt_token_count=1200, candidates_token_count=800, total_token_count=2000),
+        model_version="gemini-3-pro-preview",
+        prompt_feedback=nested(depth),
+    )
+
+
+# -----------------------------
+# Legacy implementations
+# -----------------------------
+
+def legacy_force_json_safe(value: Any):
+    try:
+        json.dumps(value)
+        return value
+    except TypeError:
+        pass
+
+    if isinstance(value, dict):
+        return {k: legacy_force_json_safe(v) for k, v in value.items()}
+
+    if isinstance(value, list):
+        return [legacy_force_json_safe(v) for v in value]
+
+    if hasattr(value, "__dict__"):
+        return legacy_force_json_safe(vars(value))
+
+    return str(value)
+
+
+def legacy_video_upload(response) -> dict:
+    if hasattr(response, "text") and isinstance(response.text, str):
+        return {"text": response.text}
+    if hasattr(response, "output_text") and isinstance(response.output_text, str):
+        return {"text": response.output_text}
+    payload = {}
+    if hasattr(response, "candidates"):
+        payload["candidates"] = []
+        for c in response.candidates:
+            parts = []
+            if hasattr(c, "content") and hasattr(c.content, "parts"):
+                for p in c.content.parts:
+                    if hasattr(p, "text"):
+                        parts.append(p.text)
+            payload["candidates"].append({"text": "\n".join(parts)})
+    if hasattr(response, "usage_metadata"):
+        payload["usage"] = {
+            "prompt_tokens": getattr(response.usage_metadata, "prompt_token_count", None),
+            "candidates_tokens": getattr(response.usage_metadata, "candidates_token_count", None),
+            "total_tokens": getattr(response.usage_metadata, "total_token_count", None),
+        }
+    if not payload:
+        payload["raw"] = str(response)
+    return legacy_force_json_safe(payload)
+
+
+def legacy_video_live(response) -> dict:
+    if isinstance(response, dict):
+        return response
+    if hasattr(response, "text") and isinstance(response.text, str):
+        return {"text": response.text}
+    if hasattr(response, "output_text"):
+        return {"text": response.output_text}
+    extracted = {}
+    if hasattr(response, "model_version"):
+        extracted["model_version"] = response.model_version
+    if hasattr(response, "candidates"):
+        extracted["candidates"] = []
+        for c in response.candidates:
+            if hasattr(c, "content") and hasattr(c.content, "parts"):
+                text_parts = [p.text for p in c.content.parts if hasattr(p, "text")]
+                extracted["candidates"].append({"text": "\n".join(text_parts)})
+    if hasattr(response, "usage_metadata"):
+        extracted["usage"] = {
+            "prompt_tokens": getattr(response.usage_metadata, "prompt_token_count", None),
+            "candidates_tokens": getattr(response.usage_metadata, "candidates_token_count", None),
+            "total_tokens": getattr(response.usage_metadata, "total_token_count", None),
+        }
+    return extracted
+
+
+def legacy_doc_assessment(response) -> dict:
+    if isinstance(response, dict):
+        return response
+    if hasattr(response, "output_text"):
+        return {"text": response.output_text}
+    result = {}
+    for attr in dir(response):
+        if attr.startswith("_"):
+            continue
+        try:
+            value = getattr(response, attr)
+            json.dumps(value)
+            result[attr] = value
+        except Exception:
+            result[attr] = str(value)
+    return result
+
+
+# -----------------------------
+# Runner
+# -----------------------------
+
+def bench(label: str, fn, arg, number: int) -> float:
+    seconds = min(timeit.repeat(lambda: fn(arg), number=number, repeat=5)) / number
+    print(f"  {label:<28} {seconds * 1e6:>12.1f} us/call")
+    return seconds
+
+
+def main():
+    cases = [
+        ("small (1 cand, 3 parts)", make_response(1, 3, 2), 2000),
+        ("wide (4 cand, 50 parts)", make_response(4, 50, 3), 500),
+        ("deep (2 cand, depth 8)", make_response(2, 10, 8), 50),
+    ]
+
+    for name, response, number in cases:
+        print(f"\n{name}")
+        new = bench("normalize_gemini_response", normalize_gemini_response, response, number)
+        for label, fn in [
+            ("legacy video_upload", legacy_video_upload),
+            ("legacy video_live", legacy_video_live),
+            ("legacy doc_assessment", legacy_doc_assessment),
+            ("legacy force_json_safe", legacy_force_json_safe),
+        ]:
+            old = bench(label, fn, response, number)
+            print(f"  {'':<28} {old / new:>12.2f}x legacy/new time")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Move legacy ProjectDocument.content bytes into the blob store.
+
+Processes documents in id order, one batch per transaction: each blob is
+written to the store (deduplicated by SHA-256), then the row gets its
+hash/size (plus at-rest compression info for text-heavy types) and the
+inline content is cleared. Safe to re-run; rows that already have a hash
+are skipped.
+
+    python migrate_document_blobs.py --batch-size 50
+"""
+import argparse
+import asyncio
+import logging
+
+from sqlalchemy import select, update
+
+from app.core.database import AsyncSessionLocal
+from app.models.project_document import ProjectDocument
+from app.services.blob_store import get_blob_store
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s | %(levelname)s | %(message)s")
+logger = logging.getLogger("migrate_document_blobs")
+
+
+async def migrate(batch_size: int, max_batches: int | None) -> None:
+    store = get_blob_store()
+    last_id = 0
+    batches = 0
+    moved = 0
+    moved_bytes = 0
+
+    while max_batches is None or batches < max_batches:
+        async with AsyncSessionLocal() as session:
+            rows = (await session.execute(
+                select(ProjectDocument.id, ProjectDocument.content, ProjectDocument.content_type)
+                .where(
+                    ProjectDocument.id > last_id,
+                    ProjectDocument.content_sha256.is_(None),
+                    ProjectDocument.content.is_not(None),
+                )
+                .order_by(ProjectDocument.id)
+                .limit(batch_size)
+            )).all()
+
+            if not rows:
+                break
+
+            for doc_id, content, content_type in rows:
+                ref = await asyncio.to_thread(store.put_bytes, content, content_type)
+                await session.execute(
+                    update(ProjectDocument)
+                    .where(ProjectDocument.id == doc_id)
+                    .values(
+                        content_sha256=ref.sha256,
+                        size_bytes=ref.size,
+                        stored_size=ref.stored_size,
+                        compression=ref.codec,
+                        content=None,
+                    )
+                )
+                moved += 1
+                moved_bytes += ref.size
+
+            await session.commit()
+            last_id = rows[-1][0]
+
+        batches += 1
+        logger.info("Batch %s done | last_id=%s | documents=%s | bytes=%s", batches, last_id, moved, moved_bytes)
+
+    logger.info("Migration finished | documents=%s | bytes=%s", moved, moved_bytes)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--batch-size", type=int, default=50)
+    parser.add_argument("--max-batches", type=int, default=None)
+    args = parser.parse_args()
+    asyncio.run(migrate(args.batch_size, args.max_batches))
@@ -0,0 +1,95 @@
+"""
+Convert legacy FL weights (nested JSON lists) to the binary tensor format.
+
+Walks fl_global_model and fl_weights_upload in id order, one batch per
+transaction: rows with JSON weights and no weights_blob get the encoded
+blob (see app/services/fl_tensor_codec.py) and their JSON column cleared.
+Readers accept both formats, so this can run while the API is up and is
+safe to re-run.
+
+    python migrate_fl_weights.py --batch-size 100
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import logging
+
+from sqlalchemy import select, update
+
+from app.core.database import AsyncSessionLocal
+from app.models.fl_global_model import FLGlobalModel
+from app.models.fl_weights_upload import FLWeightsUpload
+from app.services.fl_tensor_codec import encode_state
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s | %(levelname)s | %(message)s")
+logger = logging.getLogger("migrate_fl_weights")
+
+TABLES = {
+    "global": FLGlobalModel,
+    "uploads": FLWeightsUpload,
+}
+
+
+async def migrate_table(model, batch_size: int, dtype: str) -> None:
+    last_id = 0
+    converted = json_bytes = blob_bytes = skipped = 0
+
+    while True:
+        async with AsyncSessionLocal() as session:
+            rows = (await session.execute(
+                select(model.id, model.weights)
+                .where(
+                    model.id > last_id,
+                    model.weights_blob.is_(None),
+                    model.weights.is_not(None),
+                )
+                .order_by(model.id)
+                .limit(batch_size)
+            )).all()
+
+            if not rows:
+                break
+
+            for row_id, weights in rows:
+                if not isinstance(weights, dict):
+                    skipped += 1
+                    continue
+                blob = encode_state(weights, dtype=dtype)
+                values = {"weights_blob": blob, "weights": None}
+                if model is FLGlobalModel:
+                    values["checksum"] = hashlib.sha256(blob).hexdigest()
+                await session.execute(
+                    update(model)
+                    .where(model.id == row_id)
+                    .values(**values)
+                )
+                converted += 1
+                json_bytes += len(json.dumps(weights))
+                blob_bytes += len(blob)
+
+            await session.commit()
+            last_id = rows[-1][0]
+
+        logger.info("%s | last_id=%s | converted=%s | skipped=%s", model.__tablename__, last_id, converted, skipped)
+
+    logger.info(
+        "%s done | converted=%s | skipped=%s | json %s bytes -> blob %s bytes",
+        model.__tablename__, converted, skipped, json_bytes, blob_bytes,
+    )
+
+
+async def migrate(batch_size: int, only: str | None, dtype: str) -> None:
+    for name, model in TABLES.items():
+        if only and name != only:
+            continue
+        await migrate_table(model, batch_size, dtype)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--batch-size", type=int, default=100)
+    parser.add_argument("--only", choices=sorted(TABLES), default=None)
+    parser.add_argument("--dtype", choices=["float32", "float16"], default="float32")
+    args = parser.parse_args()
+    asyncio.run(migrate(args.batch_size, args.only, args.dtype))
@@ -0,0 +1,74 @@
+"""
+Re-label AssessmentResult.critical / compliant after the keyword lists
+(CRITICAL_KEYWORDS / NON_COMPLIANT_KEYWORDS) change, and label legacy rows
+that were stored before ingest-time classification.
+
+Only rows whose classifier_version differs from the current keyword set
+are touched, one batch per transaction, so the job can be interrupted and
+re-run. Rollups of projects whose labels changed are rebuilt at the end.
+
+    python reclassify_assessments.py --batch-size 500
+"""
+import argparse
+import asyncio
+import logging
+
+from sqlalchemy import or_, select, update
+
+from app.core.database import AsyncSessionLocal
+from app.models.assessment_result import AssessmentResult
+from app.services.assessment_service import rebuild_rollups
+from app.services.gemini_classifier import extract_gemini_text, get_matcher
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s | %(levelname)s | %(message)s")
+logger = logging.getLogger("reclassify_assessments")
+
+
+async def reclassify(batch_size: int) -> None:
+    matcher = get_matcher()
+    last_id = 0
+    scanned = 0
+    changed_projects = set()
+
+    while True:
+        async with AsyncSessionLocal() as session:
+            rows = (await session.execute(
+                select(AssessmentResult.id, AssessmentResult.project_id, AssessmentResult.gemini_response, AssessmentResult.critical, AssessmentResult.compliant)
+                .where(
+                    AssessmentResult.id > last_id,
+                    or_(AssessmentResult.classifier_version.is_(None), AssessmentResult.classifier_version != matcher.version),
+                )
+                .order_by(AssessmentResult.id)
+                .limit(batch_size)
+            )).all()
+            if not rows:
+                break
+
+            params = []
+            for assessment_id, project_id, gemini_response, critical, compliant in rows:
+                labels = matcher.classify(extract_gemini_text(gemini_response))
+                if (labels["critical"], labels["compliant"]) != (critical, compliant):
+                    changed_projects.add(project_id)
+                params.append({"id": assessment_id, **labels, "classifier_version": matcher.version})
+
+            # Bulk UPDATE by primary key (executemany)
+            await session.execute(update(AssessmentResult), params)
+            await session.commit()
+
+            last_id = rows[-1][0]
+            scanned += len(rows)
+        logger.info("Reclassified up to id=%s | rows=%s | projects changed=%s", last_id, scanned, len(changed_projects))
+
+    if changed_projects:
+        async with AsyncSessionLocal() as session:
+            await rebuild_rollups(session, sorted(changed_projects))
+            await session.commit()
+
+    logger.info("Reclassification finished | version=%s | rows=%s | rollups rebuilt=%s", matcher.version, scanned, len(changed_projects))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--batch-size", type=int, default=500)
+    args = parser.parse_args()
+    asyncio.run(reclassify(args.batch_size))
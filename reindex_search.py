@@ -0,0 +1,90 @@
+"""
+Backfill (or rebuild) the search_entry full-text index.
+
+Walks each source table in id order, one batch per transaction, and
+upserts its search entries. New rows are indexed on write, so this is only
+needed once after the migration or after changing what gets indexed.
+
+    python reindex_search.py --batch-size 200
+    python reindex_search.py --only document --only hazard
+"""
+import argparse
+import asyncio
+import logging
+
+from sqlalchemy import select
+from sqlalchemy.orm import defer, selectinload
+
+from app.core.database import AsyncSessionLocal
+from app.models.assessment_result import AssessmentResult
+from app.models.project_document import ProjectDocument
+from app.models.research_log import ResearchLog
+from app.models.transcript import Transcript
+from app.services.project_service import read_document_bytes
+from app.services.search_service import index_assessment, index_document, index_research_log, index_transcript
+from app.services.text_extraction import is_extractable
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s | %(levelname)s | %(message)s")
+logger = logging.getLogger("reindex_search")
+
+
+async def _index_document(session, doc):
+    # Legacy rows still hold inline bytes; blob-backed rows are read from the store
+    data = await read_document_bytes(doc) if is_extractable(doc.content_type) else b""
+    await index_document(session, doc, data)
+
+
+async def _index_assessment(session, assessment):
+    await index_assessment(session, assessment, assessment.hazards)
+
+
+SOURCES = {
+    "document": (ProjectDocument, _index_document),
+    "transcript": (Transcript, index_transcript),
+    "research_log": (ResearchLog, index_research_log),
+    "assessment": (AssessmentResult, _index_assessment),
+}
+
+
+def _options(model):
+    if model is AssessmentResult:
+        return [defer(AssessmentResult.gemini_response), selectinload(AssessmentResult.hazards)]
+    return []
+
+
+async def reindex(source: str, batch_size: int) -> None:
+    model, index_row = SOURCES[source]
+    last_id = 0
+    indexed = 0
+
+    while True:
+        async with AsyncSessionLocal() as session:
+            rows = (await session.execute(
+                select(model).options(*_options(model)).where(model.id > last_id).order_by(model.id).limit(batch_size)
+            )).scalars().all()
+            if not rows:
+                break
+
+            for row in rows:
+                await index_row(session, row)
+            await session.commit()
+
+            last_id = rows[-1].id
+            indexed += len(rows)
+        logger.info("Indexed %s | last_id=%s | rows=%s", source, last_id, indexed)
+
+    logger.info("Finished %s | rows=%s", source, indexed)
+
+
+async def main(sources, batch_size: int) -> None:
+    for source in sources:
+        await reindex(source, batch_size)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--batch-size", type=int, default=200)
+    parser.add_argument("--only", action="append", choices=list(SOURCES) + ["hazard"], help="Limit to these sources (hazards are indexed with their assessment)")
+    args = parser.parse_args()
+    only = {"assessment" if s == "hazard" else s for s in (args.only or SOURCES)}
+    asyncio.run(main([s for s in SOURCES if s in only], args.batch_size))